@@ -0,0 +1,181 @@
+import gzip
+import json
+import os
+import threading
+import time
+import argparse
+
+try:  # Optional: zstd compresses small JSON better and faster than gzip
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Where raw API answers are kept unless RAW_ARCHIVE_DIR says otherwise
+DEFAULT_ARCHIVE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "raw_archive"
+)
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_SUFFIX = ".seg"
+
+
+def _compress(codec, content):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(content)
+    return gzip.compress(content, compresslevel=6)
+
+
+def _decompress(codec, blob):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("This archive entry is zstd-compressed (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+def observations(data):
+    """
+    The (city_id, dt) pairs a weather answer contains.
+
+    A single-city answer has one; a group answer has one per item of "list".
+    """
+    items = data.get("list") if isinstance(data.get("list"), list) else [data]
+    return [(item.get("id"), item.get("dt")) for item in items if item.get("id") is not None]
+
+
+class RawArchive:
+    """
+    Append-only, compressed archive of raw OpenWeather response bodies.
+
+    Each response is stored exactly as it came off the wire (no parse and
+    re-encode), compressed on its own into the current segment file, so any
+    entry can be read back with one seek and one small decompress. An
+    append-only JSONL index maps every observation (city_id, dt) in the
+    body to its segment, byte offset and length; a group answer is stored
+    once and indexed once per city. Segments roll over at `segment_bytes`.
+
+    Args:
+        directory (str): Folder holding the segments and the index.
+        segment_bytes (int): Size after which a new segment is started.
+        codec (str): "zstd" or "gzip". Defaults to zstd when the zstandard
+            package is installed, gzip otherwise.
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR, segment_bytes=64 * 1024 * 1024, codec=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.codec = codec or ("zstd" if zstandard is not None else "gzip")
+        if self.codec == "zstd" and zstandard is None:
+            raise ImportError("The zstd codec needs zstandard (pip install zstandard)")
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None  # (city_id, dt) -> index entry, loaded on first lookup
+        os.makedirs(directory, exist_ok=True)
+
+    def _current_segment(self):
+        """The segment to append to, starting a new one when it is full."""
+        if self._segment is not None:
+            path = os.path.join(self.directory, self._segment)
+            if os.path.getsize(path) < self.segment_bytes:
+                return self._segment
+        self._segment = f"raw-{time.time_ns():020d}{SEGMENT_SUFFIX}"
+        open(os.path.join(self.directory, self._segment), "ab").close()
+        return self._segment
+
+    def put(self, content, data):
+        """
+        Archives one response body.
+
+        Args:
+            content (bytes): The body exactly as received (response.content).
+            data (dict): The same body, already parsed by the caller, used
+                only to find which observations it holds.
+
+        Returns:
+            int: Number of observations indexed for this body.
+        """
+        keys = observations(data)
+        if not keys:
+            return 0
+        blob = _compress(self.codec, content)
+        fetched_at = time.time()
+
+        with self._lock:
+            segment = self._current_segment()
+            with open(os.path.join(self.directory, segment), "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            entries = [
+                {"city_id": city_id, "dt": dt, "segment": segment, "offset": offset,
+                 "length": len(blob), "codec": self.codec, "fetched_at": fetched_at}
+                for city_id, dt in keys
+            ]
+            # The body is written before its index lines, so the index never points at nothing
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            if self._index is not None:
+                for entry in entries:
+                    self._index[(entry["city_id"], entry["dt"])] = entry
+        return len(entries)
+
+    def entries(self):
+        """Every index entry, oldest first."""
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _lookup(self, city_id, dt):
+        with self._lock:
+            if self._index is None:
+                # Later entries win, e.g. if the same observation was fetched twice
+                self._index = {(e["city_id"], e["dt"]): e for e in self.entries()}
+            return self._index.get((city_id, dt))
+
+    def read_entry(self, entry):
+        """The archived response body an index entry points to, decompressed."""
+        with open(os.path.join(self.directory, entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            blob = f.read(entry["length"])
+        return _decompress(entry["codec"], blob)
+
+    def get_bytes(self, city_id, dt):
+        """The raw response body that held an observation, or None."""
+        entry = self._lookup(city_id, dt)
+        return None if entry is None else self.read_entry(entry)
+
+    def get(self, city_id, dt):
+        """
+        Looks up one raw observation.
+
+        Args:
+            city_id (int): OpenWeather city ID.
+            dt (int): Observation time in Unix seconds.
+
+        Returns:
+            dict: That city's payload (its item, for group answers), or None.
+        """
+        content = self.get_bytes(city_id, dt)
+        if content is None:
+            return None
+        data = json.loads(content)
+        items = data.get("list") if isinstance(data.get("list"), list) else [data]
+        return next((item for item in items if item.get("id") == city_id), None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the raw response archive.")
+    parser.add_argument("--dir", default=os.getenv("RAW_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+    parser.add_argument("--get", nargs=2, type=int, metavar=("CITY_ID", "DT"),
+                        help="Print the raw payload of one observation.")
+    args = parser.parse_args()
+
+    archive = RawArchive(args.dir)
+    if args.get:
+        print(json.dumps(archive.get(*args.get), indent=2))
+    else:
+        entries = archive.entries()
+        segments = {e["segment"] for e in entries}
+        size = sum(os.path.getsize(os.path.join(archive.directory, s)) for s in segments)
+        print(f"{len(entries)} observations in {len(segments)} segments ({size:,} bytes compressed)")
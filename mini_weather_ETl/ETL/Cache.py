@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Remembers recent OpenWeather answers so re-runs skip the network.
+
+    OpenWeather only publishes a new observation every ~10 minutes, so an
+    answer stays "fresh" until `ttl` seconds after the observation time
+    (`dt` in the payload). If an observation was already old when we fetched
+    it, the entry is still kept for at least `min_ttl` seconds so we don't
+    ask again in a tight loop.
+
+    Entries live in memory, in least-recently-used order, and at most
+    `max_entries` are kept. When `path` is given they are also loaded from
+    and saved to a JSON file, so a re-run after a partial failure (or an
+    overlapping schedule) can reuse them.
+
+    Args:
+        ttl (float): Seconds an observation stays fresh after its `dt`.
+        max_entries (int): Upper bound on cached answers (LRU eviction).
+        path (str): Optional JSON file for the on-disk copy.
+        min_ttl (float): Minimum seconds an entry is kept after fetching.
+        clock (callable): Returns the current time in seconds (for tests).
+    """
+
+    def __init__(self, ttl=600, max_entries=5000, path=None, min_ttl=60, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.min_ttl = min_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> {"expires_at": float, "payload": dict}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expires_at(self, payload):
+        """When an answer stops being fresh, based on its observation time."""
+        fetched_at = self.clock()
+        observed_at = payload.get("dt") or fetched_at
+        return max(observed_at + self.ttl, fetched_at + self.min_ttl)
+
+    def get(self, key):
+        """
+        Returns the cached payload for key if it is still fresh, else None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["payload"]
+
+    def put(self, key, payload):
+        """Stores a freshly fetched payload, evicting the oldest entries if full."""
+        with self._lock:
+            self._entries[key] = {"expires_at": self._expires_at(payload), "payload": payload}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Forgets every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, evictions, current size and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def load(self):
+        """Reads still-fresh entries from the on-disk copy, if there is one."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable response cache {self.path}: {e}")
+            return
+
+        now = self.clock()
+        with self._lock:
+            for key, entry in stored.get("entries", []):
+                if entry["expires_at"] > now:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        """Writes fresh entries to the on-disk copy atomically (temp file + rename)."""
+        if not self.path:
+            return
+        now = self.clock()
+        with self._lock:
+            # A list keeps the LRU order when it is read back
+            entries = [[k, v] for k, v in self._entries.items() if v["expires_at"] > now]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,119 @@
+import os
+import zlib
+import argparse
+
+# Column names accepted for the city and its country, first match wins
+CITY_COLUMNS = ("query", "city", "city_name", "name")
+COUNTRY_COLUMNS = ("country_code", "country")
+
+
+def _first_column(df, names):
+    return next((name for name in names if name in df.columns), None)
+
+
+def load_catalog(path):
+    """
+    Reads a city catalog from a CSV or Parquet file.
+
+    The file needs either a "query" column ("Toronto,CA") or a city column
+    ("city", "city_name" or "name") plus an optional country column
+    ("country_code" or "country"), which are joined into queries. Blank
+    rows are skipped and repeated queries are kept once, in file order.
+
+    Args:
+        path (str): A .csv or .parquet file (Parquet needs pyarrow).
+
+    Returns:
+        list: City queries such as "Toronto,CA".
+    """
+    # Imported here so parse_shard and friends stay cheap for the CLI
+    import pandas as pd
+
+    if path.lower().endswith((".parquet", ".pq")):
+        df = pd.read_parquet(path)
+    else:
+        # Read everything as text, so codes like "NA" (Namibia) are not turned into NaN
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    city_column = _first_column(df, CITY_COLUMNS)
+    if city_column is None:
+        raise ValueError(f"{path} needs one of the columns {list(CITY_COLUMNS)}")
+
+    queries = df[city_column].fillna("").astype(str).str.strip()
+    country_column = _first_column(df, COUNTRY_COLUMNS)
+    if city_column != "query" and country_column is not None:
+        countries = df[country_column].fillna("").astype(str).str.strip().str.upper()
+        queries = queries.where(countries == "", queries + "," + countries)
+
+    # dict.fromkeys drops repeats but keeps the first position of each
+    return list(dict.fromkeys(q for q in queries if q))
+
+
+def shard_of(query, shard_count):
+    """
+    The shard (0 .. shard_count - 1) a city query belongs to.
+
+    Uses crc32 rather than hash(), which is randomized per process, so every
+    process and every machine puts a city in the same shard.
+    """
+    return zlib.crc32(query.encode("utf-8")) % shard_count
+
+
+def shard_cities(cities, shard_index, shard_count):
+    """
+    The part of a city list owned by one shard.
+
+    Shards are disjoint and together cover every city, and a city stays in
+    its shard when others are added to or removed from the catalog.
+
+    Args:
+        cities (list): City queries.
+        shard_index (int): This shard, from 0 to shard_count - 1.
+        shard_count (int): Total number of shards.
+
+    Returns:
+        list: The shard's cities, in catalog order.
+    """
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index}/{shard_count}")
+    if shard_count == 1:
+        return list(cities)
+    return [city for city in cities if shard_of(city, shard_count) == shard_index]
+
+
+def parse_shard(text):
+    """Parses "INDEX/COUNT" (e.g. "2/8") into (index, count)."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Expected a shard like 2/8, got {text!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {text!r}: INDEX must be between 0 and COUNT - 1")
+    return index, count
+
+
+def shard_path(path, shard_index, shard_count):
+    """
+    Gives each shard its own copy of a per-run state file or folder.
+
+    "city_registry.json" becomes "city_registry.shard-2-of-8.json", so shard
+    processes never overwrite each other's files. Unsharded runs keep the
+    plain path.
+    """
+    if not path or shard_count <= 1:
+        return path
+    root, extension = os.path.splitext(path.rstrip(os.sep))
+    return f"{root}.shard-{shard_index}-of-{shard_count}{extension}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show how a city catalog splits into shards.")
+    parser.add_argument("path", help="CSV or Parquet catalog.")
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args()
+
+    cities = load_catalog(args.path)
+    print(f"{len(cities)} cities in {args.path}")
+    for index in range(args.shards):
+        print(f"  shard {index}/{args.shards}: {len(shard_cities(cities, index, args.shards))} cities")
@@ -0,0 +1,185 @@
+import json
+import os
+import argparse
+import pandas as pd
+
+# Where the registry lives unless CITY_REGISTRY_PATH says otherwise
+DEFAULT_REGISTRY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "city_registry.json"
+)
+
+
+class CityRegistry:
+    """
+    On-disk mapping from free-text city queries to stable OpenWeather IDs.
+
+    Each query (e.g. "Quebec,CA") is resolved once by asking the API for its
+    current weather, and the `city_id`, name, country and coordinates from
+    the answer are remembered in a small JSON file. Later runs look the
+    query up locally and can use ID-based (bulk) or coordinate-based
+    requests instead of making OpenWeather guess which city we meant.
+
+    Args:
+        path (str): JSON file used to persist the registry.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH):
+        self.path = path
+        self.entries = {}   # query -> {"city_id", "city_name", "country_code", "latitude", "longitude", "resolved_at"}
+        self.failures = {}  # query -> reason it could not be resolved
+        self.load()
+
+    def load(self):
+        """Reads the registry file, starting empty if it does not exist yet."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.entries = data.get("cities", {})
+        self.failures = data.get("unresolved", {})
+
+    def save(self):
+        """Writes the registry atomically (temp file + rename)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"cities": self.entries, "unresolved": self.failures}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, query):
+        """Returns the stored entry for a query, or None if it is unresolved."""
+        return self.entries.get(query)
+
+    def coordinates(self, query):
+        """Returns (latitude, longitude) for a resolved query, or None."""
+        entry = self.get(query)
+        if entry is None:
+            return None
+        return entry["latitude"], entry["longitude"]
+
+    def city_ids(self, cities):
+        """
+        Splits a city list into resolved IDs and still-unresolved queries.
+
+        Two queries can name the same OpenWeather city (e.g. "Montreal,CA"
+        and "Montréal,CA"), so each ID keeps every query that resolved to it.
+
+        Returns:
+            tuple: ({city_id: [queries]} in input order, [unresolved queries]).
+        """
+        ids, missing = {}, []
+        for query in cities:
+            entry = self.get(query)
+            if entry is None:
+                missing.append(query)
+            else:
+                ids.setdefault(entry["city_id"], []).append(query)
+        return ids, missing
+
+    def record(self, query, record):
+        """
+        Remembers a query's identity from an extracted weather record.
+
+        Args:
+            query (str): The city query that was looked up.
+            record (dict): A record from the extractor, or None on failure.
+
+        Returns:
+            bool: True if the record contained a usable city ID.
+        """
+        if not record or record.get("city_id") in ("", None):
+            self.failures[query] = "no data returned by the API"
+            return False
+
+        self.entries[query] = {
+            "city_id": int(record["city_id"]),
+            "city_name": record.get("city_name", ""),
+            "country_code": record.get("country_code", ""),
+            "latitude": record.get("latitude"),
+            "longitude": record.get("longitude"),
+            "resolved_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        }
+        self.failures.pop(query, None)
+        return True
+
+    def resolve(self, cities, extractor, max_workers=8):
+        """
+        Resolves every query that is not in the registry yet, then saves.
+
+        The lookups are ordinary name-based requests, so the records they
+        return are real observations; they are handed back so the caller
+        does not have to fetch those cities a second time.
+
+        Args:
+            cities (list): City queries such as "Toronto,CA".
+            extractor (WeatherExtractor): Used for the name-based lookups.
+            max_workers (int): Concurrency for the lookups.
+
+        Returns:
+            dict: query -> record for every city resolved in this call.
+        """
+        _, missing = self.city_ids(cities)
+        if not missing:
+            return {}
+
+        print(f"Resolving {len(missing)} new cities to OpenWeather IDs...")
+        records = extractor.extract_records(missing, max_workers=max_workers)
+        resolved = {}
+        for query, record in zip(missing, records):
+            if self.record(query, record):
+                resolved[query] = record
+        self.save()
+        return resolved
+
+    def invalidate(self, queries=None):
+        """
+        Forgets some (or all) resolved queries so they are looked up again.
+
+        Args:
+            queries (list): Queries to forget. None forgets everything.
+        """
+        if queries is None:
+            self.entries.clear()
+            self.failures.clear()
+        else:
+            for query in queries:
+                self.entries.pop(query, None)
+                self.failures.pop(query, None)
+        self.save()
+
+    def unresolved(self, cities=None):
+        """
+        Reports which queries could not be resolved and why.
+
+        Args:
+            cities (list): Limit the report to these queries. When given,
+                queries never attempted are reported as "not resolved yet".
+
+        Returns:
+            dict: query -> reason.
+        """
+        if cities is None:
+            return dict(self.failures)
+        return {
+            query: self.failures.get(query, "not resolved yet")
+            for query in cities
+            if query not in self.entries
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or reset the city ID registry.")
+    parser.add_argument("--path", default=os.getenv("CITY_REGISTRY_PATH", DEFAULT_REGISTRY_PATH))
+    parser.add_argument("--invalidate", nargs="*", metavar="CITY",
+                        help="Forget these cities (or every city if none are given).")
+    args = parser.parse_args()
+
+    registry = CityRegistry(args.path)
+    if args.invalidate is not None:
+        registry.invalidate(args.invalidate or None)
+        print("Registry entries invalidated.")
+
+    print(f"{len(registry.entries)} resolved cities in {registry.path}")
+    for query, reason in registry.unresolved().items():
+        print(f"  unresolved: {query} ({reason})")
@@ -1,11 +1,138 @@
 # These are like tools we need to use
 import requests  # This helps us talk to websites on the internet
 import pandas as pd  # This helps us organize data like a spreadsheet
-import json  # This helps us work with JSON data structures
 import urllib3  # This helps us handle SSL certificate warnings
+import random  # This adds a little jitter so retries don't all fire at once
+import time  # This lets us wait between retries
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # This lets us ask about many cities at once
+from requests.adapters import HTTPAdapter  # This lets us keep a pool of open connections
+from Latency import Deadline, LatencyTracker  # This keeps track of how long answers take
+
+# This is the website address where we ask about the current weather
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+# The "group" endpoint answers for several city IDs in one request...
+GROUP_URL = "https://api.openweathermap.org/data/2.5/group"
+# ...but only up to this many IDs per call
+GROUP_MAX_IDS = 20
+
+# Columns that _build_record leaves as Unix seconds
+TIMESTAMP_COLUMNS = ("sunrise", "sunset", "data_timestamp", "extraction_timestamp")
+
+# Answers that usually mean "try again in a moment" rather than "you asked wrong"
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when a request's deadline passes before it could be answered."""
+
+
+def _allow_unverified_ssl():
+    """
+    Silences urllib3's warning about unverified HTTPS requests.
+
+    Called when a request is about to be made with verify=False (safe for
+    trusted APIs like OpenWeather), rather than as a side effect of
+    importing this module.
+    """
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def _build_record(data, city):
+    """
+    Flattens one OpenWeather "current weather" payload into a flat record.
+
+    Args:
+        data (dict): Parsed JSON body returned by the API.
+        city (str): The query we asked for (kept for reference).
+
+    Returns:
+        dict: One row of weather data, keyed by column name. Time columns
+        are still Unix seconds here; records_to_frame converts them.
+    """
+    # Extract ALL available data from the API response
+    record = {
+        # Basic info
+        "city_name": data.get("name", ""),
+        "country_code": data.get("sys", {}).get("country", ""),
+        "city_id": data.get("id", ""),
+        "timezone": data.get("timezone", 0),
+        "query_city": city,  # Original query for reference
+
+        # Coordinates
+        "longitude": data.get("coord", {}).get("lon", None),
+        "latitude": data.get("coord", {}).get("lat", None),
+
+        # Main weather data
+        "temperature": data.get("main", {}).get("temp", None),
+        "feels_like": data.get("main", {}).get("feels_like", None),
+        "temp_min": data.get("main", {}).get("temp_min", None),
+        "temp_max": data.get("main", {}).get("temp_max", None),
+        "pressure": data.get("main", {}).get("pressure", None),  # hPa
+        "humidity": data.get("main", {}).get("humidity", None),  # %
+        "sea_level_pressure": data.get("main", {}).get("sea_level", None),  # hPa
+        "ground_level_pressure": data.get("main", {}).get("grnd_level", None),  # hPa
+
+        # Weather description
+        "weather_main": data.get("weather", [{}])[0].get("main", "") if data.get("weather") else "",
+        "weather_description": data.get("weather", [{}])[0].get("description", "") if data.get("weather") else "",
+        "weather_icon": data.get("weather", [{}])[0].get("icon", "") if data.get("weather") else "",
+        "weather_id": data.get("weather", [{}])[0].get("id", None) if data.get("weather") else None,
+
+        # Wind data
+        "wind_speed": data.get("wind", {}).get("speed", None),  # m/s
+        "wind_direction": data.get("wind", {}).get("deg", None),  # degrees
+        "wind_gust": data.get("wind", {}).get("gust", None),  # m/s
+
+        # Clouds
+        "cloudiness": data.get("clouds", {}).get("all", None),  # %
+
+        # Rain data (if available)
+        "rain_1h": data.get("rain", {}).get("1h", None) if data.get("rain") else None,  # mm
+        "rain_3h": data.get("rain", {}).get("3h", None) if data.get("rain") else None,  # mm
+
+        # Snow data (if available)
+        "snow_1h": data.get("snow", {}).get("1h", None) if data.get("snow") else None,  # mm
+        "snow_3h": data.get("snow", {}).get("3h", None) if data.get("snow") else None,  # mm
+
+        # Visibility
+        "visibility": data.get("visibility", None),  # meters
+
+        # System data (Unix seconds; records_to_frame turns them into timestamps)
+        "sunrise": data.get("sys", {}).get("sunrise") or None,
+        "sunset": data.get("sys", {}).get("sunset") or None,
+
+        # Timestamp data (Unix seconds, converted once per batch)
+        "data_timestamp": data.get("dt") or None,
+        "extraction_timestamp": time.time(),
+    }
+
+    return record
+
+
+def records_to_frame(records):
+    """
+    Assembles many flat records into one DataFrame.
+
+    Building a single frame per batch (instead of one per city) and
+    converting the time columns once per column keeps the per-city cost to
+    a dict, which matters for large city lists.
+
+    Args:
+        records (list): Records from _build_record.
+
+    Returns:
+        pd.DataFrame: One row per record, or an empty frame if there are none.
+    """
+    if not records:
+        return pd.DataFrame()
+
+    df = pd.DataFrame.from_records(records)
+    for col in TIMESTAMP_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], unit='s', utc=True)
+    return df
 
-# Disable SSL warnings (safe for trusted APIs like OpenWeather)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 def extract(api_key, city):
     """
@@ -14,7 +141,7 @@ def extract(api_key, city):
     """
     
     # This is the website address where we ask about weather
-    url = "https://api.openweathermap.org/data/2.5/weather"
+    url = WEATHER_URL
     
     # These are the questions we're asking the weather website:
     # "q" = which city do you want to know about?
@@ -27,6 +154,7 @@ def extract(api_key, city):
         # Go to the weather website and ask our questions
         # timeout=10 means "if it takes more than 10 seconds, give up"
         # verify=False bypasses SSL certificate issues (safe for OpenWeather API)
+        _allow_unverified_ssl()
         response = requests.get(url, params=params, timeout=10, verify=False)
         
         # Check if the website gave us a good answer (not an error)
@@ -36,67 +164,10 @@ def extract(api_key, city):
         data = response.json()
 
         # Extract ALL available data from the API response
-        record = {
-            # Basic info
-            "city_name": data.get("name", ""),
-            "country_code": data.get("sys", {}).get("country", ""),
-            "city_id": data.get("id", ""),
-            "timezone": data.get("timezone", 0),
-            "query_city": city,  # Original query for reference
-            
-            # Coordinates
-            "longitude": data.get("coord", {}).get("lon", None),
-            "latitude": data.get("coord", {}).get("lat", None),
-            
-            # Main weather data
-            "temperature": data.get("main", {}).get("temp", None),
-            "feels_like": data.get("main", {}).get("feels_like", None),
-            "temp_min": data.get("main", {}).get("temp_min", None),
-            "temp_max": data.get("main", {}).get("temp_max", None),
-            "pressure": data.get("main", {}).get("pressure", None),  # hPa
-            "humidity": data.get("main", {}).get("humidity", None),  # %
-            "sea_level_pressure": data.get("main", {}).get("sea_level", None),  # hPa
-            "ground_level_pressure": data.get("main", {}).get("grnd_level", None),  # hPa
-            
-            # Weather description
-            "weather_main": data.get("weather", [{}])[0].get("main", "") if data.get("weather") else "",
-            "weather_description": data.get("weather", [{}])[0].get("description", "") if data.get("weather") else "",
-            "weather_icon": data.get("weather", [{}])[0].get("icon", "") if data.get("weather") else "",
-            "weather_id": data.get("weather", [{}])[0].get("id", None) if data.get("weather") else None,
-            
-            # Wind data
-            "wind_speed": data.get("wind", {}).get("speed", None),  # m/s
-            "wind_direction": data.get("wind", {}).get("deg", None),  # degrees
-            "wind_gust": data.get("wind", {}).get("gust", None),  # m/s
-            
-            # Clouds
-            "cloudiness": data.get("clouds", {}).get("all", None),  # %
-            
-            # Rain data (if available)
-            "rain_1h": data.get("rain", {}).get("1h", None) if data.get("rain") else None,  # mm
-            "rain_3h": data.get("rain", {}).get("3h", None) if data.get("rain") else None,  # mm
-            
-            # Snow data (if available)
-            "snow_1h": data.get("snow", {}).get("1h", None) if data.get("snow") else None,  # mm
-            "snow_3h": data.get("snow", {}).get("3h", None) if data.get("snow") else None,  # mm
-            
-            # Visibility
-            "visibility": data.get("visibility", None),  # meters
-            
-            # System data
-            "sunrise": pd.to_datetime(data.get("sys", {}).get("sunrise", 0), unit='s', utc=True) if data.get("sys", {}).get("sunrise") else None,
-            "sunset": pd.to_datetime(data.get("sys", {}).get("sunset", 0), unit='s', utc=True) if data.get("sys", {}).get("sunset") else None,
-            
-            # Timestamp data
-            "data_timestamp": pd.to_datetime(data.get("dt", 0), unit='s', utc=True) if data.get("dt") else None,
-            "extraction_timestamp": pd.Timestamp.now(tz='UTC'),
-            
-            # Raw data for reference (as JSON string)
-            "raw_api_response": json.dumps(data)
-        }
+        record = _build_record(data, city)
 
         # Turn our organized notes into a nice table (like a spreadsheet row)
-        df = pd.DataFrame([record])
+        df = records_to_frame([record])
         return df  # Give back the table with weather information
 
     except requests.RequestException as e:  # Oops! Something went wrong
@@ -104,3 +175,473 @@ def extract(api_key, city):
         print(f"Error fetching weather data for {city}: {e}")
         # Give back an empty table instead of breaking everything
         return pd.DataFrame()
+
+
+def _fan_out(func, items, max_workers):
+    """
+    Calls func on every item using a bounded thread pool.
+
+    Returns the results in the same order as `items`, whatever order the
+    calls finish in.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    # Never start more threads than there are items to work on
+    workers = max(1, min(int(max_workers), len(items)))
+    if workers == 1:
+        return [func(item) for item in items]
+
+    # executor.map hands results back in input order
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+        return list(executor.map(func, items))
+
+
+def extract_many(api_key, cities, max_workers=8):
+    """
+    Extracts weather data for many cities at the same time.
+
+    Each city is still fetched with extract(), but up to max_workers requests
+    are in flight at once, so a run takes roughly as long as its slowest
+    batch instead of the sum of every request.
+
+    Args:
+        api_key (str): OpenWeather API key.
+        cities (list): City queries such as "Toronto,CA".
+        max_workers (int): Maximum number of concurrent requests.
+
+    Returns:
+        list: One DataFrame per city, in the same order as `cities`
+        (empty DataFrames for cities that failed).
+    """
+    return _fan_out(lambda city: extract(api_key, city), cities, max_workers)
+
+
+class WeatherExtractor:
+    """
+    A reusable OpenWeather client that keeps its connections open.
+
+    All requests go through one requests.Session, so cities fetched one after
+    another (or from several threads) reuse pooled keep-alive connections
+    instead of paying for a new TCP/TLS handshake every time. Timeouts,
+    connection errors and retryable statuses (429 and 5xx) are retried with
+    exponential backoff and full jitter before a city is given up on.
+
+    Args:
+        api_key (str): OpenWeather API key.
+        pool_size (int): Keep-alive connections kept open per host. Should be
+            at least the number of threads sharing the extractor.
+        pool_hosts (int): Number of hosts to keep connection pools for.
+        max_retries (int): Extra attempts after the first failed one.
+        backoff_factor (float): Base delay in seconds; attempt n waits a
+            random time between 0 and backoff_factor * 2**n.
+        backoff_max (float): Upper bound for a single backoff delay.
+        timeout (float): Per-request timeout in seconds.
+        verify (bool): Whether to verify SSL certificates.
+        cache (ResponseCache): Optional cache of recent answers. Cities
+            with a still-fresh cached observation skip the network.
+        archive (RawArchive): Optional archive that every response body
+            fetched over the network is written to, byte for byte.
+        rate_limiter (TokenBucket): Optional quota shared by every request
+            (retries included) made through this extractor.
+        concurrency (AdaptiveConcurrency): Optional cap on requests in
+            flight, lowered on 429s, failures and slow answers and raised
+            again while responses stay healthy.
+        hedge (bool): If True, a request still unanswered after the recent
+            p95 latency gets a duplicate, and whichever answers first wins.
+            Duplicates only go out while the rate limiter has a spare token.
+        hedge_min_delay (float): Never hedge sooner than this (seconds).
+        hedge_initial_delay (float): Hedge delay used until enough latencies
+            have been seen to trust the p95.
+        deadline (Deadline): Optional run deadline; once it passes, requests
+            are no longer sent or retried and those in flight are cut short.
+        call_deadline (float): Optional seconds one call may take in total,
+            retries and backoff included.
+        metrics (Metrics): Optional run metrics; receives request latencies,
+            statuses, bytes fetched, retries, hedges, rate-limit waits and
+            cache hits.
+    """
+
+    # Latencies needed before the hedge delay follows the measured p95
+    HEDGE_MIN_SAMPLES = 20
+
+    def __init__(self, api_key, pool_size=10, pool_hosts=4, max_retries=3,
+                 backoff_factor=0.5, backoff_max=10.0, timeout=10, verify=False,
+                 cache=None, archive=None, rate_limiter=None, concurrency=None,
+                 hedge=False, hedge_min_delay=0.05, hedge_initial_delay=1.0,
+                 deadline=None, call_deadline=None, metrics=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.archive = archive
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.verify = verify
+        if not verify:
+            _allow_unverified_ssl()
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_initial_delay = hedge_initial_delay
+        self.deadline = deadline
+        self.call_deadline = call_deadline
+        self.metrics = metrics
+        self.latency = LatencyTracker()
+        # Hedged requests run on their own threads, so the caller can wait for either copy
+        self._hedge_pool = (ThreadPoolExecutor(max_workers=2 * pool_size, thread_name_prefix="hedge")
+                            if hedge else None)
+
+        # Retries are handled by _get_json so we can add jitter and log them
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size,
+                              max_retries=0, pool_block=False)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        """Closes every pooled connection."""
+        if self._hedge_pool is not None:
+            # Losing duplicates may still be running; nobody waits for them
+            self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _backoff_delay(self, attempt, response=None, deadline=None):
+        """How long to wait before retry number `attempt` (0-based)."""
+        delay = None
+        # Respect the server if it told us exactly how long to wait
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = min(self.backoff_max, float(retry_after))
+        if delay is None:
+            ceiling = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+            delay = random.uniform(0, ceiling)
+        # Never sleep past the deadline; the next attempt then fails fast
+        return delay if deadline is None else min(delay, deadline.remaining())
+
+    def _count(self, name, value=1, **labels):
+        """Adds to a metrics counter, if metrics are being collected."""
+        if self.metrics is not None:
+            self.metrics.inc(name, value, **labels)
+
+    def _timed_get(self, url, params, timeout):
+        """One plain GET, with its latency recorded."""
+        start = time.perf_counter()
+        response = self.session.get(url, params=params, timeout=timeout, verify=self.verify)
+        latency = time.perf_counter() - start
+        self.latency.record(latency)
+        if self.metrics is not None:
+            # "weather" or "group", so the two kinds of request get separate histograms
+            self.metrics.observe("request_seconds", latency, endpoint=url.rstrip("/").rsplit("/", 1)[-1])
+            self.metrics.inc("responses", status=response.status_code)
+            self.metrics.inc("bytes_fetched", len(response.content or b""))
+        return response
+
+    def hedge_delay(self):
+        """How long a request may go unanswered before it gets a duplicate."""
+        if self.latency.count < self.HEDGE_MIN_SAMPLES:
+            return self.hedge_initial_delay
+        return max(self.hedge_min_delay, self.latency.percentile(95))
+
+    def _hedged_get(self, url, params, timeout):
+        """
+        GETs url, sending a duplicate if the first copy is slow.
+
+        Only about 5% of requests are slower than the p95, so hedging costs
+        a few extra calls while cutting off the slowest answers.
+        """
+        primary = self._hedge_pool.submit(self._timed_get, url, params, timeout)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done:
+            return primary.result()
+        # A duplicate is only worth it if it stays inside the quota
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            return primary.result()
+
+        backup = self._hedge_pool.submit(self._timed_get, url, params, timeout)
+        pending, error = {primary, backup}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.latency.record_hedge(won=future is backup)
+                    self._count("hedged_requests")
+                    self._count("hedge_wins", int(future is backup))
+                    return future.result()
+                error = future.exception()
+        # Both copies failed
+        self.latency.record_hedge(won=False)
+        self._count("hedged_requests")
+        raise error
+
+    def _get(self, url, params, timeout):
+        if self.hedge:
+            return self._hedged_get(url, params, timeout)
+        return self._timed_get(url, params, timeout)
+
+    def _send(self, url, params, deadline=None):
+        """One GET, after waiting for the rate limiter and a concurrency slot."""
+        # Checked before taking a token, so cities past the deadline don't queue for (and
+        # use up) the quota, and again before taking a slot, so a passed deadline is not
+        # mistaken for a slow server
+        timeout = self._timeout_within(deadline)
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(timeout=deadline.remaining() if deadline else None)
+            if waited is None:
+                raise DeadlineExceeded("The extract deadline passes before the rate limit allows a request")
+            if self.metrics is not None:
+                self.metrics.inc("rate_limit_wait_seconds", waited)
+            timeout = self._timeout_within(deadline)
+        if self.concurrency is None:
+            return self._get(url, params, timeout)
+        with self.concurrency.slot() as outcome:
+            response = self._get(url, params, timeout)
+            outcome(throttled=response.status_code == 429)
+            return response
+
+    def _timeout_within(self, deadline):
+        """The request timeout, shortened so it ends by the deadline."""
+        if deadline is None:
+            return self.timeout
+        if deadline.expired():
+            raise DeadlineExceeded("The extract deadline passed before the request was sent")
+        return min(self.timeout, deadline.remaining())
+
+    def _get_json(self, url, params):
+        """
+        GETs url and returns the parsed JSON body, retrying transient failures.
+
+        Raises:
+            requests.RequestException: If the request still fails after
+                every retry, or fails with a non-retryable error.
+        """
+        params = dict(params, appid=self.api_key, units="metric")
+        # Whichever passes first: the run deadline or this call's own budget
+        deadline = Deadline.earliest(
+            self.deadline, Deadline(self.call_deadline) if self.call_deadline else None
+        )
+        for attempt in range(self.max_retries + 1):
+            # No point retrying if the answer would arrive after the deadline
+            last_try = attempt == self.max_retries or (deadline is not None and deadline.expired())
+            try:
+                response = self._send(url, params, deadline)
+            except DeadlineExceeded:
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_try or (deadline is not None and deadline.expired()):
+                    raise
+                delay = self._backoff_delay(attempt, deadline=deadline)
+                self._count("retries", reason=type(e).__name__)
+                print(f"Request failed ({e}); retrying in {delay:.2f}s...")
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRYABLE_STATUSES and not last_try:
+                delay = self._backoff_delay(attempt, response, deadline)
+                self._count("retries", reason=f"http_{response.status_code}")
+                print(f"Got HTTP {response.status_code}; retrying in {delay:.2f}s...")
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            data = response.json()
+            if self.archive is not None:
+                # Keep the body exactly as received; no re-encoding of `data`
+                self.archive.put(response.content, data)
+            return data
+
+    def _get_cached_json(self, key, url, params):
+        """Like _get_json, but answers from the cache while it is fresh."""
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                self._count("cache_hits")
+                return data
+            self._count("cache_misses")
+        data = self._get_json(url, params)
+        if self.cache is not None:
+            self.cache.put(key, data)
+        return data
+
+    def fetch_record(self, city):
+        """
+        Fetches one city by name and returns its flat record.
+
+        Args:
+            city (str): City query such as "Toronto,CA".
+
+        Returns:
+            dict: The record from _build_record, or None if the city could
+            not be fetched.
+        """
+        try:
+            data = self._get_cached_json(city, WEATHER_URL, {"q": city})
+        except requests.RequestException as e:
+            print(f"Error fetching weather data for {city}: {e}")
+            return None
+        # Also file the answer under its ID, so later bulk (by-ID) runs can reuse it
+        if self.cache is not None and data.get("id"):
+            self.cache.put(f"id:{data['id']}", data)
+        return _build_record(data, city)
+
+    def extract(self, city):
+        """
+        Extracts the current weather for one city.
+
+        Args:
+            city (str): City query such as "Toronto,CA".
+
+        Returns:
+            pd.DataFrame: A one-row frame with the same columns as extract(),
+            or an empty frame if the city could not be fetched.
+        """
+        record = self.fetch_record(city)
+        return records_to_frame([record] if record else [])
+
+    def extract_coords(self, latitude, longitude, query=None):
+        """
+        Extracts the current weather at exact coordinates.
+
+        Coordinates from the city registry are unambiguous, unlike names.
+
+        Args:
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+            query (str): Optional original query, used to fill `query_city`.
+
+        Returns:
+            pd.DataFrame: A one-row frame, or an empty frame on failure.
+        """
+        query = query or f"{latitude},{longitude}"
+        try:
+            data = self._get_cached_json(f"coord:{latitude},{longitude}", WEATHER_URL,
+                                         {"lat": latitude, "lon": longitude})
+        except requests.RequestException as e:
+            print(f"Error fetching weather data for {query}: {e}")
+            return pd.DataFrame()
+        return records_to_frame([_build_record(data, query)])
+
+    def fetch_group_records(self, city_ids, queries=None):
+        """
+        Fetches up to GROUP_MAX_IDS cities with a single group request.
+
+        Args:
+            city_ids (list): OpenWeather city IDs (ints, or digit strings
+                e.g. from a config file).
+            queries (dict): Optional city_id -> original query, used to fill
+                `query_city`. Defaults to the city ID as a string.
+
+        Returns:
+            list: One record per city the API answered for, in input order.
+        """
+        # The API answers with integer IDs, so compare everything as ints
+        city_ids = [int(city_id) for city_id in city_ids]
+        if len(city_ids) > GROUP_MAX_IDS:
+            raise ValueError(f"The group endpoint accepts at most {GROUP_MAX_IDS} IDs, got {len(city_ids)}")
+        if not city_ids:
+            return []
+
+        queries = {int(city_id): query for city_id, query in (queries or {}).items()}
+        payloads = {}  # city_id -> weather payload
+        if self.cache is not None:
+            for city_id in city_ids:
+                data = self.cache.get(f"id:{city_id}")
+                if data is not None:
+                    payloads[city_id] = data
+
+        # Only the cities without a fresh cached answer go over the network
+        to_fetch = [city_id for city_id in city_ids if city_id not in payloads]
+        if self.cache is not None:
+            self._count("cache_hits", len(payloads))
+            self._count("cache_misses", len(to_fetch))
+        if to_fetch:
+            try:
+                data = self._get_json(GROUP_URL, {"id": ",".join(str(i) for i in to_fetch)})
+            except requests.RequestException as e:
+                print(f"Error fetching weather data for city IDs {to_fetch}: {e}")
+                data = {}
+            # The combined answer keeps one normal weather payload per city in "list"
+            for item in data.get("list", []):
+                if item.get("id") is None:
+                    continue
+                payloads[int(item["id"])] = item
+                if self.cache is not None:
+                    self.cache.put(f"id:{int(item['id'])}", item)
+
+        return [
+            _build_record(payloads[city_id], queries.get(city_id, str(city_id)))
+            for city_id in city_ids
+            if city_id in payloads
+        ]
+
+    def extract_group(self, city_ids, queries=None):
+        """
+        Extracts up to GROUP_MAX_IDS cities with a single group request.
+
+        Returns:
+            pd.DataFrame: One row per city returned by the API, with the
+            same columns as extract(), or an empty frame on failure.
+        """
+        return records_to_frame(self.fetch_group_records(city_ids, queries))
+
+    def extract_bulk_records(self, city_ids, queries=None, max_workers=4):
+        """
+        Fetches any number of cities by ID, GROUP_MAX_IDS per request.
+
+        A run over N cities costs about N / GROUP_MAX_IDS requests instead
+        of N. Groups are fetched concurrently and combined in input order.
+
+        Returns:
+            list: Records for every city that was returned.
+        """
+        city_ids = list(city_ids)
+        groups = [city_ids[i:i + GROUP_MAX_IDS] for i in range(0, len(city_ids), GROUP_MAX_IDS)]
+        batches = _fan_out(lambda group: self.fetch_group_records(group, queries), groups, max_workers)
+        return [record for batch in batches for record in batch]
+
+    def extract_bulk(self, city_ids, queries=None, max_workers=4):
+        """
+        Extracts any number of cities by ID into a single frame.
+
+        Returns:
+            pd.DataFrame: All cities that were returned, in one frame.
+        """
+        return records_to_frame(self.extract_bulk_records(city_ids, queries, max_workers))
+
+    def extract_records(self, cities, max_workers=8):
+        """
+        Fetches many cities by name concurrently over the shared session.
+
+        Returns:
+            list: One record per city, in the same order as `cities`
+            (None for cities that failed).
+        """
+        return _fan_out(self.fetch_record, cities, max_workers)
+
+    def extract_frame(self, cities, max_workers=8):
+        """
+        Extracts many cities by name into one DataFrame, built once.
+
+        Returns:
+            pd.DataFrame: One row per city that was fetched, in input order.
+        """
+        records = self.extract_records(cities, max_workers)
+        return records_to_frame([record for record in records if record])
+
+    def extract_many(self, cities, max_workers=8):
+        """
+        Extracts many cities concurrently over the shared session.
+
+        Returns:
+            list: One DataFrame per city, in the same order as `cities`.
+        """
+        return _fan_out(self.extract, cities, max_workers)
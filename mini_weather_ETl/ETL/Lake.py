@@ -0,0 +1,233 @@
+import os
+import re
+import time
+import argparse
+import itertools
+import pandas as pd
+
+# Where the Parquet history lives unless LAKE_DIR says otherwise
+DEFAULT_LAKE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lake"
+)
+
+# Folder levels, outermost first: date=YYYY-MM-DD/country_code=CA/
+DEFAULT_PARTITION_COLS = ("date", "country_code")
+
+# Partition value used for rows with a missing value (the Hive convention)
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Rows in one file are sorted by these, so min/max statistics stay tight
+SORT_COLUMNS = ("city_name", "data_timestamp")
+
+# Key that identifies one observation; repeated keys are dropped when compacting
+OBSERVATION_KEY = ("city_id", "data_timestamp")
+
+
+def _require_pyarrow():
+    """Imports pyarrow on first use, so the ETL runs without it when the lake is off."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The Parquet lake needs pyarrow (pip install pyarrow)") from e
+
+
+def _partition_value(value):
+    """Turns a partition value into a safe folder name."""
+    if value is None or pd.isna(value) or str(value) == "":
+        return NULL_PARTITION
+    return re.sub(r"[^\w.\-]", "_", str(value))
+
+
+def _write_parquet(df, path):
+    """Writes one sorted Parquet file via temp file + rename, so readers never see half a file."""
+    sort_by = [c for c in SORT_COLUMNS if c in df.columns]
+    if sort_by:
+        df = df.sort_values(sort_by, kind="stable")
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, engine="pyarrow", index=False, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+class ParquetLake:
+    """
+    An append-only Parquet dataset of weather history, partitioned on disk.
+
+    Each run's frame is split by observation date and country into Hive-style
+    folders (date=2024-01-31/country_code=CA/), one small file per run and
+    partition. Query engines (pyarrow, DuckDB, Spark, pandas.read_parquet)
+    skip whole folders from the path alone and whole row groups from the
+    column statistics, and only read the columns a query asks for.
+    `compact` merges a partition's small per-run files into one.
+
+    Args:
+        root (str): Folder holding one sub-folder per table.
+        partition_cols (tuple): Partition columns, outermost first. "date"
+            is derived from data_timestamp (extraction time if missing).
+    """
+
+    def __init__(self, root=DEFAULT_LAKE_DIR, partition_cols=DEFAULT_PARTITION_COLS):
+        self.root = root
+        self.partition_cols = tuple(partition_cols)
+        self._sequence = itertools.count()
+
+    def table_path(self, table):
+        return os.path.join(self.root, table)
+
+    def _with_date(self, df):
+        """Adds the "date" partition column (UTC day of the observation)."""
+        if "date" not in self.partition_cols or "date" in df.columns:
+            return df
+        source = "data_timestamp" if "data_timestamp" in df.columns else "extraction_timestamp"
+        if source in df.columns:
+            stamps = pd.to_datetime(df[source], utc=True, errors="coerce")
+        else:
+            stamps = pd.Series(pd.Timestamp.now(tz="UTC"), index=df.index)
+        return df.assign(date=stamps.dt.strftime("%Y-%m-%d"))
+
+    def partition_frames(self, df):
+        """
+        Splits a frame into its partitions.
+
+        The partition columns are dropped from each part: their values live
+        in the folder names, as the Hive layout expects.
+
+        Returns:
+            dict: relative folder ("date=.../country_code=...") -> frame.
+        """
+        df = self._with_date(df)
+        missing = [c for c in self.partition_cols if c not in df.columns]
+        if missing:
+            raise ValueError(f"Cannot partition by missing columns {missing}")
+
+        keys = pd.DataFrame({c: df[c].map(_partition_value) for c in self.partition_cols})
+        parts = {}
+        for values, index in keys.groupby(list(self.partition_cols), sort=True).groups.items():
+            values = values if isinstance(values, tuple) else (values,)
+            folder = os.path.join(*(f"{c}={v}" for c, v in zip(self.partition_cols, values)))
+            parts[folder] = df.loc[index].drop(columns=list(self.partition_cols))
+        return parts
+
+    def append(self, df, table="weather"):
+        """
+        Writes one run's frame as a new file in every partition it touches.
+
+        Args:
+            df (pd.DataFrame): Transformed (or raw) weather rows.
+            table (str): Dataset name, e.g. "weather" or "raw".
+
+        Returns:
+            list: Paths of the files written.
+        """
+        if df is None or df.empty:
+            return []
+        _require_pyarrow()
+
+        # Nanosecond time + a counter keeps names unique across runs and threads
+        name = f"part-{time.time_ns():020d}-{next(self._sequence):06d}.parquet"
+        written = []
+        for folder, part in self.partition_frames(df).items():
+            directory = os.path.join(self.table_path(table), folder)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, name)
+            _write_parquet(part.reset_index(drop=True), path)
+            written.append(path)
+        print(f"Wrote {len(df)} rows to {len(written)} partition(s) of lake table '{table}'")
+        return written
+
+    def partitions(self, table="weather"):
+        """Relative folders of every partition of a table, with their Parquet files."""
+        base = self.table_path(table)
+        found = {}
+        for directory, _, files in os.walk(base):
+            parquet_files = sorted(f for f in files if f.endswith(".parquet"))
+            if parquet_files:
+                found[os.path.relpath(directory, base)] = parquet_files
+        return dict(sorted(found.items()))
+
+    def compact(self, table="weather", min_files=2):
+        """
+        Merges each partition's small files into one sorted file.
+
+        The merged file is written before the inputs are removed, so an
+        interrupted compaction never loses rows; at worst some rows exist
+        twice until the next compaction, which also drops repeated
+        observations (same city_id and data_timestamp).
+
+        Args:
+            table (str): Dataset to compact.
+            min_files (int): Only partitions with at least this many files
+                are rewritten.
+
+        Returns:
+            dict: {"partitions": partitions rewritten, "files_removed": n}.
+        """
+        _require_pyarrow()
+        rewritten, removed = 0, 0
+        for folder, files in self.partitions(table).items():
+            if len(files) < min_files:
+                continue
+            directory = os.path.join(self.table_path(table), folder)
+            paths = [os.path.join(directory, f) for f in files]
+            merged = pd.concat([pd.read_parquet(p, engine="pyarrow") for p in paths], ignore_index=True)
+            if all(c in merged.columns for c in OBSERVATION_KEY):
+                merged = merged.drop_duplicates(subset=list(OBSERVATION_KEY), keep="last")
+
+            _write_parquet(merged.reset_index(drop=True),
+                           os.path.join(directory, f"compacted-{time.time_ns():020d}.parquet"))
+            for path in paths:
+                os.remove(path)
+            rewritten += 1
+            removed += len(paths)
+        print(f"Compacted {rewritten} partition(s) of lake table '{table}' ({removed} files merged)")
+        return {"partitions": rewritten, "files_removed": removed}
+
+    def read(self, table="weather", columns=None, filters=None):
+        """
+        Reads a table back, with partition columns restored from the folders.
+
+        Files written by different runs may disagree on a column's type (a
+        column that was empty in one run is stored as null), so their
+        schemas are unified before scanning.
+
+        Args:
+            columns (list): Only read these columns.
+            filters (list): pyarrow filters, e.g. [("date", ">=", "2024-01-01")];
+                partition filters skip whole folders.
+
+        Returns:
+            pd.DataFrame: The matching rows.
+        """
+        _require_pyarrow()
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        path = self.table_path(table)
+        partitioning = ds.HivePartitioning(
+            pa.schema([(c, pa.string()) for c in self.partition_cols]),
+            null_fallback=NULL_PARTITION,
+        )
+        files = ds.dataset(path, format="parquet", partitioning=partitioning).files
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files] + [partitioning.schema],
+                                  promote_options="permissive")
+        dataset = ds.dataset(path, format="parquet", partitioning=partitioning, schema=schema)
+        expression = pq.filters_to_expression(filters) if filters else None
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or compact the Parquet lake.")
+    parser.add_argument("--dir", default=os.getenv("LAKE_DIR", DEFAULT_LAKE_DIR))
+    parser.add_argument("--table", default="weather")
+    parser.add_argument("--compact", action="store_true",
+                        help="Merge each partition's small files into one.")
+    parser.add_argument("--min-files", type=int, default=2)
+    args = parser.parse_args()
+
+    lake = ParquetLake(args.dir)
+    if args.compact:
+        lake.compact(args.table, min_files=args.min_files)
+
+    partitions = lake.partitions(args.table)
+    files = sum(len(f) for f in partitions.values())
+    print(f"{len(partitions)} partitions, {files} files in {lake.table_path(args.table)}")
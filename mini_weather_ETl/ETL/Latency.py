@@ -0,0 +1,96 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class Deadline:
+    """
+    A point in time after which work should stop.
+
+    Args:
+        seconds (float): Time from now until the deadline.
+        clock (callable): Monotonic time source (replaceable in tests).
+    """
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    @staticmethod
+    def earliest(*deadlines):
+        """The deadline that passes first, ignoring None (None if all are None)."""
+        deadlines = [d for d in deadlines if d is not None]
+        return min(deadlines, key=lambda d: d.expires_at) if deadlines else None
+
+
+class LatencyTracker:
+    """
+    Thread-safe record of request latencies with rolling percentiles.
+
+    Percentiles come from the last `window` samples, so they follow the
+    network as it gets faster or slower; counts cover the whole run.
+
+    Args:
+        window (int): Number of recent samples kept for percentiles.
+    """
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.max = 0.0
+        self.hedged = 0  # Requests that got a duplicate sent
+        self.hedge_wins = 0  # ...where the duplicate answered first
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.max = max(self.max, seconds)
+
+    def record_hedge(self, won):
+        with self._lock:
+            self.hedged += 1
+            self.hedge_wins += int(won)
+
+    def percentile(self, q):
+        """
+        The q-th percentile (0-100) of recent latencies, or None without samples.
+
+        Uses the nearest-rank method, so the answer is always a real sample.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(q / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def stats(self):
+        """Counts plus p50/p95/p99/max latency in seconds."""
+        return {
+            "requests": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+    def summary(self):
+        """One printable line of stats."""
+        stats = self.stats()
+        if not stats["requests"]:
+            return "no requests"
+        return (f"{stats['requests']} requests, p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, "
+                f"p99 {stats['p99']:.3f}s, max {stats['max']:.3f}s, "
+                f"{stats['hedged']} hedged ({stats['hedge_wins']} won by the duplicate)")
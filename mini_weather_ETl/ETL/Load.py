@@ -1,26 +1,62 @@
-from supabase import create_client, Client
 import pandas as pd
+import numpy as np
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-def load_to_supabase(df: pd.DataFrame, supabase_url: str, supabase_key: str, table_name: str):
-    """
-    Loads a transformed weather snapshot DataFrame to Supabase.
+from Transform import KEY_COLUMNS
 
-    Args:
-        df (pd.DataFrame): Transformed weather snapshot DataFrame.
-        supabase_url (str): Your Supabase project URL.
-        supabase_key (str): Your Supabase API key (service role key recommended).
-        table_name (str): Target table name in Supabase.
+if TYPE_CHECKING:  # Only for the type hints; supabase itself is imported on first use
+    from supabase import Client
 
-    Returns:
-        dict: Summary of the load operation with success/failure counts.
+try:  # Optional fast JSON encoder; the standard library is used without it
+    import orjson
+except ImportError:
+    orjson = None
+
+# How each load writes rows: plain inserts, or upserts on the conflict key
+# that either update ("upsert") or leave alone ("skip") rows already stored
+LOAD_MODES = ("insert", "upsert", "skip")
+
+# Columns that identify one observation: the same city reported at the same time
+DEFAULT_CONFLICT_KEY = ("city_id", "data_timestamp")
+
+# Postgres error classes (first two SQLSTATE characters) that blame a row's
+# data rather than the database: 22 = bad value, 23 = constraint violation
+ROW_ERROR_CLASSES = ("22", "23")
+
+# 4xx answers that are about the request or the server, not about a row
+_NON_ROW_STATUSES = (401, 403, 404, 408, 429)
+
+# Postgres: "there is no unique or exclusion constraint matching the ON CONFLICT specification"
+_NO_CONFLICT_CONSTRAINT = "42P10"
+
+
+class MissingConflictConstraint(ValueError):
+    """The table has no unique constraint on the conflict key, so upserts cannot work."""
+
+
+def create_client(supabase_url: str, supabase_key: str) -> "Client":
     """
-    if df.empty:
-        print("DataFrame is empty. Nothing to load.")
-        return {"status": "skipped", "loaded": 0, "failed": 0}
+    Creates a Supabase client.
 
-    # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    supabase pulls in a large dependency tree (about 0.75 s to import), so
+    it is imported here on first use instead of at startup; runs that load
+    into another sink, replays with nothing to load and --check-config never
+    pay for it.
+    """
+    from supabase import create_client as supabase_create_client
+    return supabase_create_client(supabase_url, supabase_key)
 
+
+def _prepare_records_rowwise(df: pd.DataFrame):
+    """
+    Reference per-cell version of serialize_records.
+
+    Kept for equivalence tests and benchmarks; use serialize_records instead.
+    """
     # Create a copy to avoid mutating the original DataFrame
     df_copy = df.copy()
     
@@ -45,29 +81,400 @@ def load_to_supabase(df: pd.DataFrame, supabase_url: str, supabase_key: str, tab
             # Handle NaN/None
             elif pd.isna(value):
                 record[key] = None
+    return records
+
+
+def _datetime_values(series: pd.Series):
+    """A datetime column as ISO strings (None for NaT), formatted in one pass."""
+    utc_suffix = series.dt.tz is not None
+    if utc_suffix:
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    # numpy formats the whole array in C, unlike per-element strftime
+    text = np.datetime_as_string(series.to_numpy(dtype="datetime64[us]"), unit="us").astype(object)
+    if utc_suffix:
+        text = text + "+00:00"
+    text[series.isna().to_numpy()] = None
+    return text.tolist()
+
+
+def _column_values(series: pd.Series):
+    """
+    Converts one column to a list of JSON-friendly Python values.
+
+    The conversion is picked once per column from its dtype instead of
+    being rediscovered for every cell.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return _datetime_values(series)
+
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        # ndarray.tolist() yields native bool/int/float in C; then patch the nulls
+        values = series.to_numpy().tolist()
+        if series.dtype.kind == "f":
+            for i in np.flatnonzero(series.isna().to_numpy()):
+                values[i] = None
+        return values
+
+    values = series.to_numpy(dtype=object, na_value=None).tolist()
+    if series.dtype == object:
+        kind = pd.api.types.infer_dtype(series, skipna=True)
+        if kind.startswith("datetime"):
+            return _datetime_values(pd.to_datetime(series, utc=True))
+        if kind not in ("string", "empty"):
+            # Mixed object columns may still hold numpy scalars
+            values = [v.item() if isinstance(v, np.generic) else v for v in values]
+    return values
+
+
+def serialize_columns(df: pd.DataFrame):
+    """
+    Converts a transformed DataFrame into JSON-friendly value lists per column.
+
+    Adds the extraction timestamp (unless the rows already carry one, e.g.
+    when replayed from staging) and converts whole columns at a time:
+    datetime columns become ISO strings, numeric columns native Python
+    numbers and every kind of null (NaN, NaT, None, pd.NA) becomes None.
+
+    Args:
+        df (pd.DataFrame): Transformed weather snapshot DataFrame.
+
+    Returns:
+        dict: column name -> list of values, in column order.
+    """
+    columns = {col: _column_values(df[col]) for col in df.columns}
+
+    # Add a UTC timestamp for this extraction (the same for every row)
+    if "extraction_timestamp" not in columns:
+        columns["extraction_timestamp"] = [pd.Timestamp.now(tz='UTC').isoformat()] * len(df)
+    return columns
+
+
+def serialize_records(df: pd.DataFrame):
+    """
+    Converts a transformed DataFrame into JSON-friendly insert records.
+
+    See serialize_columns for how each column is converted.
+
+    Args:
+        df (pd.DataFrame): Transformed weather snapshot DataFrame.
+
+    Returns:
+        list: One dict per row, ready to be sent as JSON.
+    """
+    columns = serialize_columns(df)
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def payload_frame(df: pd.DataFrame, mode: str):
+    """
+    The columns a load actually sends for `mode`.
+
+    KEY_COLUMNS (city_id, data_timestamp) only exist so upserts can match
+    rows. A table made from the original schema does not have them, so
+    plain inserts leave them out; "upsert" and "skip" keep them.
+
+    Args:
+        df (pd.DataFrame): Transformed weather snapshot DataFrame.
+        mode (str): One of LOAD_MODES.
+
+    Returns:
+        pd.DataFrame: The frame to serialize.
+    """
+    if mode != "insert":
+        return df
+    return df.drop(columns=[c for c in KEY_COLUMNS if c in df.columns])
+
+
+def encode_records(records):
+    """
+    Encodes records to UTF-8 JSON bytes, using orjson when it is installed.
+
+    Returns:
+        bytes: A JSON array with one object per record.
+    """
+    if orjson is not None:
+        return orjson.dumps(records)
+    return json.dumps(records, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def is_row_error(error):
+    """
+    True if an insert error was caused by the rows sent, not by the database.
+
+    Only these are worth splitting a batch for: a bad value or a broken
+    constraint in one row fails the whole bulk insert, and the other rows
+    load fine on their own. Connection errors, timeouts, 5xx answers and
+    schema or permission problems would fail every half just the same.
+
+    Args:
+        error (Exception): Raised by an insert, e.g. postgrest's APIError,
+            which carries the Postgres SQLSTATE (or the HTTP status) in `code`.
+    """
+    code = getattr(error, "code", None)
+    if isinstance(code, str) and len(code) == 5 and code[:2].isdigit():
+        return code[:2] in ROW_ERROR_CLASSES
+    # An answer without a Postgres code: judge it by its HTTP status
+    status = code if isinstance(code, int) else None
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in _NON_ROW_STATUSES
+
+
+def drop_duplicate_keys(df: pd.DataFrame, keys):
+    """
+    Keeps only the last row for each conflict key within one batch.
+
+    Postgres rejects an upsert that touches the same row twice, and retries
+    or overlapping fetches can hand us the same observation more than once.
+    Rows with a missing key value can never conflict, so they are all kept.
+
+    Args:
+        df (pd.DataFrame): Rows about to be loaded.
+        keys (list): Conflict key columns.
+
+    Returns:
+        pd.DataFrame: df without the earlier copies of repeated keys.
+    """
+    keys = list(keys)
+    has_key = df[keys].notna().all(axis=1)
+    repeated = df.duplicated(subset=keys, keep="last") & has_key
+    return df[~repeated]
+
+
+class SupabaseLoader:
+    """
+    A long-lived loader that reuses one Supabase client for every load.
+
+    Records are split into chunks of `chunk_size` rows so no single request
+    grows without bound, and up to `max_workers` chunks are sent at the same
+    time. Every load reports each chunk's row count and latency.
+
+    In "upsert" and "skip" modes rows are written with one bulk upsert per
+    chunk on `conflict_key`, so re-running the ETL or retrying a chunk never
+    duplicates an observation: "upsert" overwrites the stored row and "skip"
+    keeps it. The table needs a unique constraint on the conflict key.
+
+    Args:
+        supabase_url (str): Your Supabase project URL.
+        supabase_key (str): Your Supabase API key (service role key recommended).
+        table_name (str): Target table name in Supabase.
+        chunk_size (int): Rows per insert request.
+        max_workers (int): Chunks sent in parallel.
+        client (Client): Optional ready-made client (e.g. for tests).
+        dead_letter_path (str): Optional JSONL file that rejected rows are
+            appended to, together with their error messages.
+        mode (str): One of LOAD_MODES.
+        conflict_key (tuple): Columns that identify a row for upserts.
+    """
+
+    def __init__(self, supabase_url: str, supabase_key: str, table_name: str,
+                 chunk_size: int = 500, max_workers: int = 4, client: "Client" = None,
+                 dead_letter_path: str = None, mode: str = "insert",
+                 conflict_key=DEFAULT_CONFLICT_KEY):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"mode must be one of {LOAD_MODES}, got {mode!r}")
+        self.table_name = table_name
+        self.mode = mode
+        self.conflict_key = tuple(conflict_key)
+        self.dead_letter_path = dead_letter_path
+        self._dead_letter_lock = threading.Lock()
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+        # Initialize the Supabase client once and keep it for every load
+        self.client: "Client" = client or create_client(supabase_url, supabase_key)
+
+    def close(self):
+        """Nothing to release; lets SupabaseLoader be closed like the sinks in Sinks.py."""
+
+    def _insert(self, records):
+        """
+        Sends one bulk insert (or upsert) request.
+
+        Raises:
+            MissingConflictConstraint: If an upsert's table lacks the unique
+                constraint; every row would fail, so the load stops at once.
+        """
+        table = self.client.table(self.table_name)
+        if self.mode == "insert":
+            table.insert(records).execute()
+            return
+        try:
+            table.upsert(records, on_conflict=",".join(self.conflict_key),
+                         ignore_duplicates=self.mode == "skip").execute()
+        except Exception as e:
+            if getattr(e, "code", None) == _NO_CONFLICT_CONSTRAINT:
+                raise MissingConflictConstraint(
+                    f"LOAD_MODE={self.mode} needs a unique constraint on ({', '.join(self.conflict_key)}) "
+                    f"in {self.table_name}; add it (see README) or set LOAD_MODE=insert"
+                ) from e
+            raise
+
+    def _insert_bisect(self, records, error=None):
+        """
+        Inserts records, splitting failed batches in half to isolate bad rows.
+
+        Good halves are still bulk-inserted, so k bad rows in n records cost
+        about O(k log n) requests instead of n single-row inserts. Only row
+        errors (see is_row_error) are split: once the database itself fails,
+        every half would fail the same way, so the rest is not sent.
+
+        Args:
+            records (list): Records to insert.
+            error (Exception): If given, the batch is already known to fail
+                with this row error and is split straight away.
 
-    try:
-        # Batch insert for efficiency
-        response = supabase.table(table_name).insert(records).execute()
-        print(f"Successfully loaded {len(records)} rows to Supabase table '{table_name}'.")
-        return {"status": "success", "loaded": len(records), "failed": 0}
-        
-    except Exception as e:
-        print(f"Error loading data to Supabase: {e}")
-        print("Attempting individual inserts as fallback...")
-        
-        # Fallback: try inserting one by one to identify problematic records
-        success_count = 0
-        failed_records = []
-        
-        for record in records:
+        Returns:
+            tuple: (rows loaded, dead letters for rows the database rejected,
+            failures for rows not loaded because the database failed), the
+            last two as {"record", "error"} dicts.
+        """
+        if error is None:
             try:
-                supabase.table(table_name).insert(record).execute()
-                print(f"✓ Inserted: {record.get('city_name', 'Unknown')} ({record.get('country_code', 'Unknown')})")
-                success_count += 1
+                self._insert(records)
+                return len(records), [], []
             except Exception as e:
-                print(f"✗ Failed to insert {record.get('city_name', 'Unknown')}: {e}")
-                failed_records.append(record)
-        
-        print(f"Loaded {success_count}/{len(records)} rows. {len(failed_records)} failed.")
-        return {"status": "partial", "loaded": success_count, "failed": len(failed_records), "failed_records": failed_records}
+                if not is_row_error(e):
+                    return 0, [], [{"record": r, "error": str(e)} for r in records]
+                error = e
+
+        if len(records) == 1:
+            record = records[0]
+            print(f"✗ Failed to insert {record.get('city_name', 'Unknown')}: {error}")
+            return 0, [{"record": record, "error": str(error)}], []
+
+        middle = len(records) // 2
+        loaded_left, dead_left, unsent_left = self._insert_bisect(records[:middle])
+        if unsent_left:
+            # The database went away; don't keep knocking for the other half
+            reason = unsent_left[0]["error"]
+            return loaded_left, dead_left, unsent_left + [{"record": r, "error": reason}
+                                                          for r in records[middle:]]
+        loaded_right, dead_right, unsent_right = self._insert_bisect(records[middle:])
+        return loaded_left + loaded_right, dead_left + dead_right, unsent_right
+
+    def _write_dead_letters(self, dead_letters):
+        """
+        Appends rejected rows and their errors to the dead-letter file, if any.
+
+        Rows written there are marked "dead_lettered", so callers holding a
+        copy (e.g. the staging area) know they are safe to drop.
+        """
+        if not self.dead_letter_path or not dead_letters:
+            return
+        failed_at = pd.Timestamp.now(tz='UTC').isoformat()
+        with self._dead_letter_lock:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for letter in dead_letters:
+                    f.write(json.dumps({"table": self.table_name, "failed_at": failed_at, **letter}) + "\n")
+        for letter in dead_letters:
+            letter["dead_lettered"] = True
+        print(f"Wrote {len(dead_letters)} rejected rows to {self.dead_letter_path}")
+
+    def _insert_chunk(self, index, records):
+        """Inserts one chunk and reports how it went and how long it took."""
+        start = time.perf_counter()
+        try:
+            # Batch insert for efficiency
+            self._insert(records)
+            loaded, dead_letters = len(records), []
+        except MissingConflictConstraint:
+            raise
+        except Exception as e:
+            print(f"Error loading chunk {index} to Supabase: {e}")
+            if is_row_error(e):
+                print("Splitting the chunk to isolate the failing rows...")
+                loaded, dead_letters, unsent = self._insert_bisect(records, error=e)
+            else:
+                # The database is down, slow or refusing every row: the rows themselves
+                # are fine, so the chunk fails as a whole and nothing is dead-lettered
+                loaded, dead_letters, unsent = 0, [], [{"record": r, "error": str(e)} for r in records]
+            self._write_dead_letters(dead_letters)
+            dead_letters = dead_letters + unsent
+
+        return {
+            "chunk": index,
+            "rows": len(records),
+            "loaded": loaded,
+            "failed": len(dead_letters),
+            "failed_records": dead_letters,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+
+    def load(self, df: pd.DataFrame):
+        """
+        Loads a transformed weather snapshot DataFrame in chunks.
+
+        Args:
+            df (pd.DataFrame): Transformed weather snapshot DataFrame.
+
+        Returns:
+            dict: Summary with status ("failed" when no row loaded),
+            loaded/failed counts, the number of repeated observations
+            dropped before loading, rows that did not load under
+            "failed_records" (each {"record", "error"}, plus
+            "dead_lettered": True once written to the dead-letter file) and
+            per-chunk stats under "batches".
+        """
+        if df.empty:
+            print("DataFrame is empty. Nothing to load.")
+            return {"status": "skipped", "loaded": 0, "failed": 0}
+
+        duplicates = 0
+        if self.mode != "insert":
+            missing = [c for c in self.conflict_key if c not in df.columns]
+            if missing:
+                raise ValueError(f"{self.mode} mode needs the conflict key columns {missing}")
+            deduplicated = drop_duplicate_keys(df, self.conflict_key)
+            duplicates = len(df) - len(deduplicated)
+            if duplicates:
+                print(f"Dropped {duplicates} repeated observations before loading.")
+            df = deduplicated
+
+        records = serialize_records(payload_frame(df, self.mode))
+        chunks = [records[i:i + self.chunk_size] for i in range(0, len(records), self.chunk_size)]
+
+        workers = min(self.max_workers, len(chunks))
+        if workers == 1:
+            batches = [self._insert_chunk(i, chunk) for i, chunk in enumerate(chunks, start=1)]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="load") as executor:
+                batches = list(executor.map(self._insert_chunk, range(1, len(chunks) + 1), chunks))
+
+        loaded = sum(b["loaded"] for b in batches)
+        failed_records = [r for b in batches for r in b.pop("failed_records")]
+        slowest = max(b["seconds"] for b in batches)
+
+        if not failed_records:
+            print(f"Successfully loaded {loaded} rows to Supabase table '{self.table_name}' "
+                  f"in {len(batches)} chunk(s) (slowest {slowest:.3f}s).")
+            return {"status": "success", "loaded": loaded, "failed": 0,
+                    "duplicates": duplicates, "batches": batches}
+
+        print(f"Loaded {loaded}/{len(records)} rows. {len(failed_records)} failed.")
+        return {"status": "partial" if loaded else "failed", "loaded": loaded, "failed": len(failed_records),
+                "duplicates": duplicates, "failed_records": failed_records, "batches": batches}
+
+
+def load_to_supabase(df: pd.DataFrame, supabase_url: str, supabase_key: str, table_name: str):
+    """
+    Loads a transformed weather snapshot DataFrame to Supabase.
+
+    This creates a new client on every call; use a SupabaseLoader to reuse
+    one client across loads.
+
+    Args:
+        df (pd.DataFrame): Transformed weather snapshot DataFrame.
+        supabase_url (str): Your Supabase project URL.
+        supabase_key (str): Your Supabase API key (service role key recommended).
+        table_name (str): Target table name in Supabase.
+
+    Returns:
+        dict: Summary of the load operation with success/failure counts.
+    """
+    if df.empty:
+        print("DataFrame is empty. Nothing to load.")
+        return {"status": "skipped", "loaded": 0, "failed": 0}
+
+    return SupabaseLoader(supabase_url, supabase_key, table_name).load(df)
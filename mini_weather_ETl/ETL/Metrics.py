@@ -0,0 +1,317 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+import datetime
+from contextlib import contextmanager, nullcontext
+
+# Histogram buckets (seconds) for request latencies, Prometheus-style upper bounds
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Raw samples kept per histogram series for exact percentiles in the JSON report
+MAX_SAMPLES = 100_000
+
+# Help text shown in the Prometheus output; other metrics get a generic line
+DESCRIPTIONS = {
+    "stage_seconds": "Busy time per pipeline stage (stages overlap when pipelined).",
+    "stage_calls": "Times each pipeline stage ran (one per chunk).",
+    "rows_in": "Rows (or cities) handed to each stage.",
+    "rows_out": "Rows produced by each stage.",
+    "rows_failed": "Rows a stage could not handle.",
+    "request_seconds": "OpenWeather request latency.",
+    "responses": "OpenWeather responses by HTTP status.",
+    "bytes_fetched": "Response body bytes received from OpenWeather.",
+    "retries": "Request retries by reason.",
+    "hedged_requests": "Requests that got a duplicate after the hedge delay.",
+    "hedge_wins": "Hedged requests answered first by the duplicate.",
+    "rate_limit_wait_seconds": "Time spent waiting for the rate limiter.",
+    "cache_hits": "Cities answered from the response cache.",
+    "cache_misses": "Cities that had to be fetched.",
+    "run_duration_seconds": "Wall time of the last run.",
+    "run_timestamp_seconds": "When the last run finished (Unix time).",
+    "run_success": "1 if the last run loaded everything, else 0.",
+}
+
+
+def _label_key(labels):
+    """Labels as a sorted tuple, usable as a dict key."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_text(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _series_name(key):
+    """A label key as readable text for the JSON report, e.g. 'status=200'."""
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+def _percentile(sorted_samples, q):
+    if not sorted_samples:
+        return None
+    return sorted_samples[max(1, math.ceil(q / 100 * len(sorted_samples))) - 1]
+
+
+def stage_timer(metrics, stage):
+    """metrics.stage(stage), or a do-nothing context when metrics is None."""
+    return metrics.stage(stage) if metrics is not None else nullcontext()
+
+
+class Metrics:
+    """
+    Counters, gauges and latency histograms for one ETL run.
+
+    Every stage and the extractor record into the same object, which can
+    then be written as a JSON run report (one line per run, so a file of
+    them shows trends) and as Prometheus text. It is thread-safe, since
+    extract workers and the background loader record at the same time.
+
+    Args:
+        prefix (str): Prepended to every Prometheus metric name.
+        buckets (tuple): Histogram upper bounds in seconds.
+        clock (callable): Wall-clock time source (replaceable in tests).
+    """
+
+    def __init__(self, prefix="etl", buckets=DEFAULT_BUCKETS, clock=time.time):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self.clock = clock
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = clock()
+        self.finished_at = None
+        self.status = None
+        self._counters = {}    # name -> {label key: value}
+        self._gauges = {}      # name -> {label key: value}
+        self._histograms = {}  # name -> {label key: {"counts", "sum", "count", "samples"}}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Adds to a counter."""
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Sets a gauge."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Records one sample (e.g. a latency in seconds) in a histogram."""
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.setdefault(_label_key(labels), {
+                "counts": [0] * len(self.buckets), "sum": 0.0, "count": 0, "samples": []
+            })
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["counts"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+            if len(histogram["samples"]) < MAX_SAMPLES:
+                histogram["samples"].append(value)
+
+    def record_stage(self, stage, seconds):
+        """Adds one call of a pipeline stage that took `seconds`."""
+        self.inc("stage_seconds", seconds, stage=stage)
+        self.inc("stage_calls", stage=stage)
+
+    @contextmanager
+    def stage(self, stage):
+        """Adds the time spent inside the block to a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def rows(self, stage, rows_in, rows_out, failed=0):
+        """Counts the rows a stage took in and produced."""
+        self.inc("rows_in", rows_in, stage=stage)
+        self.inc("rows_out", rows_out, stage=stage)
+        if failed:
+            self.inc("rows_failed", failed, stage=stage)
+
+    def counter(self, name, **labels):
+        """Current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def finish(self, result=None, failed=False):
+        """
+        Marks the run as done and records its outcome.
+
+        Args:
+            result (dict): The run's load result, if it got that far.
+            failed (bool): True if the run stopped with an exception.
+        """
+        self.finished_at = self.clock()
+        self.status = "error" if failed else ((result or {}).get("status") or "skipped")
+        self.set("run_duration_seconds", self.finished_at - self.started_at)
+        self.set("run_timestamp_seconds", self.finished_at)
+        self.set("run_success", 1 if self.status in ("success", "skipped", "staged") else 0)
+
+    def report(self):
+        """
+        The run as a JSON-ready dict.
+
+        Returns:
+            dict: run_id, start/finish times, status, one entry per stage
+            (seconds, calls, rows in/out/failed), latency summaries
+            (count, mean, p50/p95/p99, max) and every other counter.
+        """
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: dict(h, samples=sorted(h["samples"])) for key, h in series.items()}
+                          for name, series in self._histograms.items()}
+
+        stage_keys = ("stage_seconds", "stage_calls", "rows_in", "rows_out", "rows_failed")
+        stages = {}
+        for name in stage_keys:
+            for key, value in counters.pop(name, {}).items():
+                stage = dict(key)["stage"]
+                field = {"stage_seconds": "seconds", "stage_calls": "calls"}.get(name, name)
+                stages.setdefault(stage, {})[field] = round(value, 6) if field == "seconds" else value
+
+        latencies = {}
+        for name, series in histograms.items():
+            for key, histogram in series.items():
+                samples = histogram["samples"]
+                latencies[f"{name}{{{_series_name(key)}}}" if key else name] = {
+                    "count": histogram["count"],
+                    "mean": histogram["sum"] / histogram["count"] if histogram["count"] else None,
+                    "p50": _percentile(samples, 50),
+                    "p95": _percentile(samples, 95),
+                    "p99": _percentile(samples, 99),
+                    "max": samples[-1] if samples else None,
+                }
+
+        def iso(timestamp):
+            if timestamp is None:
+                return None
+            return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isoformat()
+
+        return {
+            "run_id": self.run_id,
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "duration_seconds": (self.finished_at - self.started_at) if self.finished_at else None,
+            "status": self.status,
+            "stages": stages,
+            "latency": latencies,
+            "counters": {
+                name: series.get((), 0) if list(series) == [()] else
+                {_series_name(key): value for key, value in series.items()}
+                for name, series in counters.items()
+            },
+        }
+
+    def to_prometheus(self, **labels):
+        """
+        The metrics in the Prometheus text exposition format.
+
+        Args:
+            **labels: Added to every series, e.g. shard="2/8" so the files
+                of several shard processes can be collected side by side.
+        """
+        common = _label_key(labels)
+        lines = []
+        with self._lock:
+            def header(name, kind, suffix=""):
+                # Counters are named ..._total everywhere, HELP and TYPE included
+                full = f"{self.prefix}_{name}{suffix}"
+                lines.append(f"# HELP {full} {DESCRIPTIONS.get(name, name.replace('_', ' ') + '.')}")
+                lines.append(f"# TYPE {full} {kind}")
+                return full
+
+            for name, series in sorted(self._counters.items()):
+                full = header(name, "counter", "_total")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_label_text(key + common)} {value:g}")
+            for name, series in sorted(self._gauges.items()):
+                full = header(name, "gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_label_text(key + common)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                full = header(name, "histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(self.buckets, histogram["counts"]):
+                        lines.append(f"{full}_bucket{_label_text(key + common, [('le', f'{bound:g}')])} {count}")
+                    lines.append(f"{full}_bucket{_label_text(key + common, [('le', '+Inf')])} {histogram['count']}")
+                    lines.append(f"{full}_sum{_label_text(key + common)} {histogram['sum']:g}")
+                    lines.append(f"{full}_count{_label_text(key + common)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def append_report(self, path):
+        """Appends the JSON report as one line, building a run history."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.report()) + "\n")
+
+    def write_prometheus(self, path, **labels):
+        """
+        Writes the Prometheus text to a file, e.g. for node_exporter's
+        textfile collector. Written via temp file + rename, so a scrape
+        never sees half a file. `labels` are passed on to to_prometheus.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(**labels))
+        os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """
+    Serves the latest run's metrics at http://host:port/metrics.
+
+    Meant for --serve mode, where one process runs for a long time and a
+    Prometheus server can scrape it. `publish` swaps in a finished run.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one).
+        host (str): Interface to bind; localhost by default.
+    """
+
+    def __init__(self, port, host="127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self._body = b""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = server._body
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the ETL output
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-http",
+                                        daemon=True)
+        self._thread.start()
+
+    def publish(self, metrics):
+        self._body = metrics.to_prometheus().encode("utf-8")
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
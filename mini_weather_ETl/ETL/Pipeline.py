@@ -0,0 +1,267 @@
+import queue
+import threading
+import time
+
+from Extract import records_to_frame
+from Transform import transform_data
+from Metrics import stage_timer
+from Profiling import profile_stage
+
+# Tells the background loader that no more chunks are coming
+_DONE = object()
+
+
+def chunked(items, size):
+    """
+    Splits any iterable into lists of at most `size` items.
+
+    Only one chunk is held at a time, so this also works on generators.
+    """
+    if size < 1:
+        raise ValueError(f"chunk size must be at least 1, got {size}")
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def extract_stage(city_chunks, fetch_records, metrics=None, profiler=None):
+    """
+    Extract stage: turns each chunk of city queries into a list of records.
+
+    Args:
+        city_chunks (iterable): Lists of city queries.
+        fetch_records (callable): Takes a list of queries and returns the
+            records that could be fetched for them.
+        metrics (Metrics): Optional; records time, cities in and records out.
+        profiler (StageProfiler): Optional; profiles each fetch.
+    """
+    for chunk in city_chunks:
+        # The profiler's own overhead stays outside the stage's timer
+        with profile_stage(profiler, "extract"), stage_timer(metrics, "extract"):
+            records = fetch_records(chunk)
+        if metrics is not None:
+            metrics.rows("extract", len(chunk), len(records))
+        yield records
+
+
+def transform_stage(record_batches, raw_fn=None, metrics=None, profiler=None):
+    """
+    Transform stage: builds one frame per batch and transforms it.
+
+    Batches that produced no rows are skipped.
+
+    Args:
+        record_batches (iterable): Lists of extracted records.
+        raw_fn (callable): Optional hook called with each raw frame before
+            it is transformed (e.g. to archive it).
+        metrics (Metrics): Optional; records time, rows in and rows out.
+        profiler (StageProfiler): Optional; profiles building and
+            transforming each frame.
+    """
+    for records in record_batches:
+        if not records:
+            continue
+        with profile_stage(profiler, "transform"):
+            start = time.perf_counter()
+            raw_df = records_to_frame(records)
+            build_seconds = time.perf_counter() - start
+        if raw_fn is not None:
+            raw_fn(raw_df)  # Not part of the transform's own time
+        with profile_stage(profiler, "transform"):
+            start = time.perf_counter()
+            transformed_df = transform_data(raw_df)
+            transform_seconds = time.perf_counter() - start
+        if metrics is not None:
+            metrics.record_stage("transform", build_seconds + transform_seconds)
+            out = 0 if transformed_df is None else len(transformed_df)
+            metrics.rows("transform", len(raw_df), out)
+        if transformed_df is not None and not transformed_df.empty:
+            yield transformed_df
+
+
+def load_chunk(load_fn, df, metrics=None, stage="load", profiler=None):
+    """
+    Calls load_fn on one transformed chunk, recording it under `stage`.
+
+    A profiler counts every kind of load (including replays) as "load".
+
+    Returns:
+        dict: load_fn's result.
+    """
+    with profile_stage(profiler, "load"), stage_timer(metrics, stage):
+        result = load_fn(df)
+    if metrics is not None:
+        # A staging area "loads" by writing rows locally, so staged rows count as out
+        rows_out = result.get("loaded", 0) + result.get("staged", 0)
+        metrics.rows(stage, len(df), rows_out, failed=result.get("failed", 0))
+    return result
+
+
+def merge_load_results(total, result):
+    """
+    Adds one load result into a running total for the whole run.
+
+    Args:
+        total (dict): Running summary with "loaded", "failed", "duplicates"
+            and "chunks".
+        result (dict): The dict returned by a load call for one chunk.
+
+    Returns:
+        dict: The updated running total.
+    """
+    total["chunks"] += 1
+    return _add_counts(total, result)
+
+
+def merge_run_results(total, result):
+    """
+    Adds a whole run's summary (e.g. one shard's) into a running total.
+
+    Unlike merge_load_results, the run's own chunk count is kept.
+    """
+    if result is None:
+        return total
+    total["chunks"] += result.get("chunks", 0)
+    return _add_counts(total, result)
+
+
+def _add_counts(total, result):
+    """Adds a result's row counts into the total and updates its status."""
+    total["loaded"] += result.get("loaded", 0)
+    total["failed"] += result.get("failed", 0)
+    total["duplicates"] += result.get("duplicates", 0)
+    if result.get("failed_records"):
+        total.setdefault("failed_records", []).extend(result["failed_records"])
+
+    if total["loaded"] == 0 and total["failed"] == 0:
+        total["status"] = "skipped"
+    elif total["failed"] == 0:
+        total["status"] = "success"
+    elif total["loaded"] == 0:
+        total["status"] = "failed"
+    else:
+        total["status"] = "partial"
+    return total
+
+
+def empty_load_result():
+    """The run summary before any chunk has been loaded."""
+    return {"status": "skipped", "loaded": 0, "failed": 0, "duplicates": 0, "chunks": 0}
+
+
+def run_streaming(cities, fetch_records, load_fn, chunk_size=500, raw_fn=None, metrics=None,
+                  profiler=None):
+    """
+    Streams cities through extract -> transform -> load in fixed-size chunks.
+
+    Each chunk is loaded as soon as it is transformed and then dropped, so
+    peak memory depends on `chunk_size`, not on how many cities there are,
+    and a failure late in the run keeps every chunk loaded before it.
+
+    Args:
+        cities (iterable): City queries (a list or any generator).
+        fetch_records (callable): Chunk of queries -> list of records.
+        load_fn (callable): Takes a transformed DataFrame and returns a load
+            result dict with "status", "loaded" and "failed".
+        chunk_size (int): Cities per chunk.
+        raw_fn (callable): Optional hook called with each raw frame.
+        metrics (Metrics): Optional; every stage records its time and rows.
+        profiler (StageProfiler): Optional; profiles the chosen stages.
+
+    Returns:
+        dict: Combined load result for the run, plus the number of chunks.
+    """
+    total = empty_load_result()
+    frames = transform_stage(extract_stage(chunked(cities, chunk_size), fetch_records, metrics,
+                                           profiler), raw_fn, metrics, profiler)
+    for index, transformed_df in enumerate(frames, start=1):
+        print(f"Loading chunk {index} ({len(transformed_df)} records)...")
+        merge_load_results(total, load_chunk(load_fn, transformed_df, metrics, profiler=profiler))
+    return total
+
+
+def run_pipelined(cities, fetch_records, load_fn, chunk_size=500, queue_depth=2, raw_fn=None,
+                  metrics=None, profiler=None):
+    """
+    Like run_streaming, but loading overlaps with extracting the next chunk.
+
+    A background loader thread drains a bounded queue of transformed chunks
+    while this thread extracts and transforms the next ones. When the queue
+    is full, extraction waits (backpressure), so at most `queue_depth`
+    chunks wait in memory and total time approaches max(extract, load)
+    instead of extract + load.
+
+    If extraction fails, chunks already queued are still loaded before the
+    error is raised. If loading fails, extraction stops and the load error
+    is raised.
+
+    Args:
+        cities (iterable): City queries (a list or any generator).
+        fetch_records (callable): Chunk of queries -> list of records.
+        load_fn (callable): Transformed DataFrame -> load result dict.
+        chunk_size (int): Cities per chunk.
+        queue_depth (int): Transformed chunks allowed to wait for the loader.
+        raw_fn (callable): Optional hook called with each raw frame.
+        metrics (Metrics): Optional; every stage records its time and rows.
+            Stages overlap here, so their times add up to more than the run.
+        profiler (StageProfiler): Optional; a stage is only profiled while
+            no other profiled stage is running, so prefer run_streaming
+            when profiling.
+
+    Returns:
+        dict: Combined load result for the run, plus the number of chunks.
+    """
+    total = empty_load_result()
+    pending = queue.Queue(maxsize=max(1, queue_depth))
+    load_errors = []
+
+    def loader():
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            index, transformed_df = item
+            try:
+                print(f"Loading chunk {index} ({len(transformed_df)} records)...")
+                merge_load_results(total, load_chunk(load_fn, transformed_df, metrics,
+                                                     profiler=profiler))
+            except Exception as e:  # handed back to the producing thread
+                load_errors.append(e)
+                return
+
+    def hand_over(item):
+        # Wait for room in the queue, but never on a loader that has died
+        while True:
+            if load_errors:
+                raise load_errors[0]
+            try:
+                pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    loader_thread = threading.Thread(target=loader, name="etl-loader", daemon=True)
+    loader_thread.start()
+    try:
+        frames = transform_stage(extract_stage(chunked(cities, chunk_size), fetch_records, metrics,
+                                               profiler), raw_fn, metrics, profiler)
+        for index, transformed_df in enumerate(frames, start=1):
+            hand_over((index, transformed_df))
+    finally:
+        # Let the loader finish whatever is already queued, then stop it
+        while loader_thread.is_alive():
+            try:
+                pending.put(_DONE, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        loader_thread.join()
+
+    if load_errors:
+        raise load_errors[0]
+    return total
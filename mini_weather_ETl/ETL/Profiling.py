@@ -0,0 +1,280 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import datetime
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Stages that can be profiled, in pipeline order
+PROFILE_STAGES = ("extract", "transform", "load")
+
+# Where profile files go unless PROFILE_DIR says otherwise
+DEFAULT_PROFILE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles"
+)
+
+# From Python 3.12 cProfile sits on sys.monitoring: one enabled profile sees
+# every thread, and a second one cannot be enabled while it runs
+_PROFILE_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+# Frames kept per allocation; reports group by the allocating line, so one is enough
+TRACEMALLOC_FRAMES = 1
+
+# Allocations by the profiler itself, left out of the memory report
+_IGNORED_FILES = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                  tracemalloc.__file__, "<unknown>")
+
+
+def parse_stages(text):
+    """
+    Parses a stage list such as "all", "transform" or "extract,load".
+
+    Returns:
+        tuple: The stages to profile, in pipeline order (empty for "" or "0").
+
+    Raises:
+        ValueError: If a stage is not one of PROFILE_STAGES.
+    """
+    names = {name.strip().lower() for name in str(text or "").split(",")} - {"", "0", "none"}
+    if names & {"all", "1"}:
+        return PROFILE_STAGES
+    unknown = names - set(PROFILE_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s) to profile {sorted(unknown)}; "
+                         f"use 'all' or any of {list(PROFILE_STAGES)}")
+    return tuple(stage for stage in PROFILE_STAGES if stage in names)
+
+
+def profile_stage(profiler, stage):
+    """profiler.stage(stage), or a do-nothing context when profiler is None."""
+    return profiler.stage(stage) if profiler is not None else nullcontext()
+
+
+class _Snapshot:
+    """Profile results as pstats.Stats reads them, taken without stopping the profile."""
+
+    def __init__(self, profile):
+        profile.snapshot_stats()
+        self.stats = profile.stats
+
+    def create_stats(self):
+        pass  # pstats calls this; the snapshot is already taken
+
+
+class StageProfiler:
+    """
+    CPU (cProfile) and memory (tracemalloc) profiles of chosen ETL stages.
+
+    Each stage gets its own profile, added up over every chunk of the run.
+    Threads started while a stage runs (parallel fetches, parallel inserts)
+    are profiled into that stage too, so keep stages from overlapping while
+    profiling (runETL loads chunks in line when a profiler is active). Before
+    Python 3.12 every such thread gets a profile of its own; from 3.12 on the
+    stage's single profile already sees all threads.
+
+    Memory tracing records each stage's peak (the most memory allocated
+    during the stage and alive at the same time) and the lines that
+    allocated the most memory still held when the stage ended. Traces are
+    cleared as each stage starts, so a snapshot only holds that stage's
+    allocations and stays cheap; memory is therefore only traced when no
+    one else is already using tracemalloc. Tracing still makes Python
+    noticeably slower, so leave it off (memory=False) when only CPU time
+    matters.
+
+    `write` saves, per profiled stage, a .prof file (open it with
+    `python -m pstats` or snakeviz) and a .txt report with the top
+    functions and allocators, all named after the run.
+
+    Args:
+        stages (iterable): Stages to profile (see PROFILE_STAGES).
+        output_dir (str): Folder for the profile files.
+        run_id (str): Identifies the run in file names.
+        memory (bool): Also trace memory allocations.
+        top (int): Functions and allocation sites listed per report.
+    """
+
+    def __init__(self, stages, output_dir=DEFAULT_PROFILE_DIR, run_id=None, memory=True, top=25):
+        self.stages = tuple(stages)
+        self.output_dir = output_dir
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.run_id = f"{stamp}-{run_id}" if run_id else stamp
+        self.memory = memory
+        self.top = top
+        self._profiles = {stage: [] for stage in self.stages}  # One per thread that ran the stage
+        self._seconds = dict.fromkeys(self.stages, 0.0)
+        self._calls = dict.fromkeys(self.stages, 0)
+        self._peaks = dict.fromkeys(self.stages, 0)
+        self._allocations = {stage: {} for stage in self.stages}  # site -> [bytes, blocks]
+        self._active = None  # Stage running right now, for threads it starts
+        self._lock = threading.Lock()
+        self._previous_thread_hook = None
+        self._started_tracemalloc = False
+        self._running = False
+
+    def start(self):
+        """Starts memory tracing and the hook that profiles new threads."""
+        if self._running:
+            return
+        self._running = True
+        if self.memory and tracemalloc.is_tracing():
+            print("tracemalloc is already in use; profiling CPU time only")
+            self.memory = False
+        elif self.memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        if not _PROFILE_SEES_ALL_THREADS:
+            self._previous_thread_hook = threading.getprofile()
+            threading.setprofile(self._profile_new_thread)
+
+    def stop(self):
+        """Stops memory tracing (if we started it) and the thread hook."""
+        if not self._running:
+            return
+        self._running = False
+        if not _PROFILE_SEES_ALL_THREADS:
+            threading.setprofile(self._previous_thread_hook)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _profile_new_thread(self, frame, event, arg):
+        # Runs once, on the first event in each new thread: swaps itself for
+        # a cProfile of the stage that was running when the thread started
+        sys.setprofile(None)
+        stage = self._active
+        if stage is None:
+            return
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles[stage].append(profile)
+        profile.enable()
+
+    @contextmanager
+    def stage(self, stage):
+        """Profiles the block as part of `stage` (does nothing for other stages)."""
+        if stage not in self._profiles or self._active is not None:
+            yield  # Not chosen, or nested inside a stage already being profiled
+            return
+
+        tracing = self._started_tracemalloc
+        if tracing:
+            # From here on only this stage's allocations are traced
+            tracemalloc.clear_traces()
+
+        with self._lock:
+            profiles = self._profiles[stage]
+            if _PROFILE_SEES_ALL_THREADS and profiles:
+                profile = profiles[0]  # Reused, so there is one profile per stage
+            else:
+                profile = cProfile.Profile()
+                profiles.append(profile)
+        self._active = stage
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active = None
+            self._seconds[stage] += time.perf_counter() - start
+            self._calls[stage] += 1
+            if tracing:
+                self._peaks[stage] = max(self._peaks[stage], tracemalloc.get_traced_memory()[1])
+                snapshot = tracemalloc.take_snapshot().filter_traces(
+                    [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+                )
+                self._add_allocations(stage, snapshot.statistics("lineno"))
+
+    def _add_allocations(self, stage, statistics):
+        # Keep a running total per source line over every chunk of the stage
+        totals = self._allocations[stage]
+        for statistic in statistics:
+            frame = statistic.traceback[0]
+            site = totals.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+            site[0] += statistic.size
+            site[1] += statistic.count
+
+    def stats(self, stage):
+        """The stage's CPU profile as pstats.Stats (None if it never ran)."""
+        with self._lock:
+            profiles = list(self._profiles.get(stage, []))
+        if not self._calls.get(stage):
+            return None
+        stats = pstats.Stats(_Snapshot(profiles[0]))
+        for profile in profiles[1:]:
+            stats.add(_Snapshot(profile))
+        return stats
+
+    def top_allocations(self, stage):
+        """[(source line, bytes, blocks)] held at the end of the stage, largest first."""
+        sites = sorted(self._allocations.get(stage, {}).items(), key=lambda item: -item[1][0])
+        return [(site, size, count) for site, (size, count) in sites[:self.top]]
+
+    def report(self, stage):
+        """A readable report of one stage: top functions, then memory."""
+        lines = [f"Profile of the {stage} stage, run {self.run_id}",
+                 f"{self._calls[stage]} profiled block(s), {self._seconds[stage]:.3f}s wall time, "
+                 f"{len(self._profiles[stage])} thread profile(s)", ""]
+
+        stats = self.stats(stage)
+        if stats is not None:
+            for sort_key in ("cumulative", "tottime"):
+                text = io.StringIO()
+                stats.stream = text
+                stats.sort_stats(sort_key).print_stats(self.top)
+                lines += [f"== Top {self.top} functions by {sort_key} time ==", text.getvalue()]
+
+        if self.memory:
+            lines.append(f"== Memory: peak {_size(self._peaks[stage])} allocated during the stage ==")
+            lines.append(f"Top {self.top} allocation sites still held when the stage ended:")
+            for site, size, count in self.top_allocations(stage):
+                lines.append(f"  {_size(size):>12}  {count:>9} blocks  {site}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """
+        Writes <run>-<stage>.prof and <run>-<stage>.txt for every stage that ran.
+
+        Returns:
+            list: Paths of the .txt reports.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        reports = []
+        for stage in self.stages:
+            if not self._calls[stage]:
+                continue
+            base = os.path.join(self.output_dir, f"{self.run_id}-{stage}")
+            self.stats(stage).dump_stats(f"{base}.prof")
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(self.report(stage))
+            reports.append(f"{base}.txt")
+        return reports
+
+    def summary(self):
+        """One printable line per profiled stage."""
+        lines = []
+        for stage in self.stages:
+            if not self._calls[stage]:
+                continue
+            memory = f", peak +{_size(self._peaks[stage])}" if self.memory else ""
+            lines.append(f"Profiled {stage}: {self._seconds[stage]:.2f}s over "
+                         f"{self._calls[stage]} profiled block(s){memory}")
+        return lines
+
+
+def _size(size):
+    """Bytes as readable KiB or MiB."""
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / (1024 * 1024):.2f} MiB"
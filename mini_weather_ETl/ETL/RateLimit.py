@@ -0,0 +1,177 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Refill arithmetic is floating point; a token this close to whole counts as whole
+_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that keeps calls under a per-minute quota.
+
+    Tokens refill continuously at `calls_per_minute / 60` per second up to
+    `burst`; every call takes one, waiting if the bucket is empty. Over any
+    minute at most `burst + calls_per_minute` calls get through, so keep
+    that sum at or below the plan's quota.
+
+    Args:
+        calls_per_minute (float): Sustained call rate.
+        burst (int): Calls allowed back to back after a quiet period.
+        clock (callable): Monotonic time source (replaceable in tests).
+        sleep (callable): Used to wait for the next token.
+    """
+
+    def __init__(self, calls_per_minute, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if calls_per_minute <= 0:
+            raise ValueError(f"calls_per_minute must be positive, got {calls_per_minute}")
+        self.rate = calls_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Takes a token if one is available right now; never waits."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1 - _EPSILON:
+                self._tokens = max(0.0, self._tokens - 1)
+                return True
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Takes a token, waiting until one is available.
+
+        Args:
+            timeout (float): Give up (without a token) rather than wait
+                longer than this many seconds; None waits as long as needed.
+
+        Returns:
+            float: Seconds spent waiting, or None if no token came in time.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1 - _EPSILON:
+                    self._tokens = max(0.0, self._tokens - 1)
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            if timeout is not None and waited + delay > timeout + _EPSILON:
+                return None
+            # Sleep outside the lock so other threads can check in meanwhile
+            self.sleep(delay)
+            waited += delay
+
+
+class AdaptiveConcurrency:
+    """
+    Caps how many requests are in flight, adapting the cap as we go (AIMD).
+
+    Every healthy response raises the limit by 1/limit, so it grows by about
+    one per round of requests. A throttled response (HTTP 429) halves it,
+    and a failed request (timeout, dropped connection) or a response much
+    slower than the best latency seen recently (`latency_tolerance` times
+    the baseline) trims it by 10%. Decreases happen at most once per
+    `cooldown` seconds, so one burst of bad answers counts as one signal.
+
+    Args:
+        initial (int): Starting limit.
+        min_limit (int): The limit never drops below this.
+        max_limit (int): The limit never grows above this (e.g. the number
+            of worker threads).
+        latency_tolerance (float): Slowdown factor treated as congestion.
+        cooldown (float): Minimum seconds between two decreases.
+        clock (callable): Monotonic time source (replaceable in tests).
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=32, latency_tolerance=2.0,
+                 cooldown=1.0, clock=time.monotonic):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.clock = clock
+        self.in_flight = 0
+        self.baseline = None  # Slowly rising minimum latency (seconds)
+        self._last_decrease = None
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Waits for a free slot."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def _decrease(self, factor):
+        now = self.clock()
+        if self._last_decrease is not None and now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def release(self, latency=None, throttled=False):
+        """
+        Frees a slot and adapts the limit from how the request went.
+
+        Args:
+            latency (float): Seconds the request took, or None if it failed
+                without an answer.
+            throttled (bool): True if the server answered 429.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self._decrease(0.5)
+            elif latency is None:
+                self._decrease(0.9)
+            else:
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    # Let the baseline drift up slowly, so it follows a slower network
+                    self.baseline += 0.01 * (latency - self.baseline)
+                if latency > self.baseline * self.latency_tolerance:
+                    self._decrease(0.9)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds a slot for one request; call outcome(...) to report how it went.
+
+            with concurrency.slot() as outcome:
+                response = session.get(...)
+                outcome(throttled=response.status_code == 429)
+        """
+        self.acquire()
+        start = time.perf_counter()
+        report = {"throttled": False, "completed": False}
+
+        def outcome(throttled=False):
+            report["throttled"] = throttled
+            report["completed"] = True
+
+        try:
+            yield outcome
+        finally:
+            latency = time.perf_counter() - start if report["completed"] else None
+            self.release(latency, report["throttled"])
+
+    def stats(self):
+        """Current limit, requests in flight and latency baseline."""
+        with self._condition:
+            return {"limit": int(self.limit), "in_flight": self.in_flight, "baseline": self.baseline}
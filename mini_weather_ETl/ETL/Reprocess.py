@@ -0,0 +1,129 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from Archive import RawArchive
+from Extract import _build_record, records_to_frame
+from Transform import transform_data
+from Pipeline import merge_load_results, empty_load_result
+
+# Archived bodies handed to one worker at a time; bounds the frames sent back
+TASK_ENTRIES = 5000
+
+
+def plan_tasks(archive, since=None, until=None, task_entries=TASK_ENTRIES):
+    """
+    Splits the archive into independent reprocessing tasks.
+
+    Only the newest archived copy of each observation (city_id, dt) is kept,
+    optionally limited to since <= dt < until. Tasks never span segments,
+    so each worker reads one file sequentially.
+
+    Returns:
+        list: (archive directory, segment, [index entries]) tuples, oldest
+        segment first.
+    """
+    latest = {}
+    for entry in archive.entries():
+        dt = entry["dt"] or 0
+        if (since is None or dt >= since) and (until is None or dt < until):
+            latest[(entry["city_id"], entry["dt"])] = entry
+
+    by_segment = {}
+    for entry in latest.values():
+        by_segment.setdefault(entry["segment"], []).append(entry)
+
+    tasks = []
+    for segment in sorted(by_segment):
+        entries = sorted(by_segment[segment], key=lambda e: e["offset"])
+        for i in range(0, len(entries), task_entries):
+            tasks.append((archive.directory, segment, entries[i:i + task_entries]))
+    return tasks
+
+
+def reprocess_task(task):
+    """
+    Parses and transforms one task's archived bodies (runs in a worker process).
+
+    Each body is decompressed and parsed once, even when a group answer
+    holds several of the task's observations. Rows keep the time they were
+    originally fetched as their extraction_timestamp.
+
+    Returns:
+        pd.DataFrame: Transformed rows, or None if nothing could be parsed.
+    """
+    directory, _, entries = task
+    archive = RawArchive(directory, codec="gzip")  # Codec only matters for writing
+    wanted = {}  # (offset, length) -> [entries in that body]
+    for entry in entries:
+        wanted.setdefault((entry["offset"], entry["length"]), []).append(entry)
+
+    records = []
+    for body_entries in wanted.values():
+        data = json.loads(archive.read_entry(body_entries[0]))
+        items = data.get("list") if isinstance(data.get("list"), list) else [data]
+        by_id = {item.get("id"): item for item in items}
+        for entry in body_entries:
+            item = by_id.get(entry["city_id"])
+            if item is None:
+                continue
+            record = _build_record(item, str(entry["city_id"]))
+            record["extraction_timestamp"] = entry["fetched_at"]
+            records.append(record)
+
+    if not records:
+        return None
+    raw_df = records_to_frame(records)
+    transformed_df = transform_data(raw_df)
+    # transform_data keeps only display columns; restore when each row was fetched
+    transformed_df["extraction_timestamp"] = raw_df["extraction_timestamp"]
+    return transformed_df
+
+
+def reprocess_archive(archive, load_fn, max_workers=None, since=None, until=None,
+                      task_entries=TASK_ENTRIES):
+    """
+    Recomputes history from archived raw responses, without the API.
+
+    Archive segments are parsed and transformed in parallel worker
+    processes (the work is CPU-bound, so threads would not help), and each
+    transformed task is loaded from this process as soon as it is ready.
+    With an upsert sink, reprocessing replaces the stored rows instead of
+    duplicating them, so it is safe to run again after changing
+    transform_data.
+
+    Args:
+        archive (RawArchive): The archive to replay.
+        load_fn (callable): Transformed DataFrame -> load result dict.
+        max_workers (int): Worker processes (default: one per CPU). 1 runs
+            everything in this process.
+        since (int): Only observations with dt >= since (Unix seconds).
+        until (int): Only observations with dt < until (Unix seconds).
+        task_entries (int): Observations per task.
+
+    Returns:
+        dict: Combined load result, plus the number of chunks.
+    """
+    tasks = plan_tasks(archive, since, until, task_entries)
+    total = empty_load_result()
+    if not tasks:
+        print("Nothing to reprocess in the raw archive.")
+        return total
+
+    observations = sum(len(task[2]) for task in tasks)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    print(f"Reprocessing {observations} archived observations in {len(tasks)} tasks "
+          f"({workers} worker processes)...")
+
+    # One worker runs in this process; more fan out over a process pool
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # Both maps keep task order, so history is loaded oldest segment first
+        frames = executor.map(reprocess_task, tasks) if executor else map(reprocess_task, tasks)
+        for transformed_df in frames:
+            if transformed_df is not None:
+                merge_load_results(total, load_fn(transformed_df))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return total
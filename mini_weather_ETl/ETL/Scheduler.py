@@ -0,0 +1,202 @@
+import os
+import re
+import time
+import random
+import signal
+import threading
+import traceback
+
+try:  # File locks: fcntl on Linux/macOS, msvcrt on Windows
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Lock file that keeps two runs (daemon, scheduled task, manual) from overlapping
+DEFAULT_LOCK_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "etl.lock"
+)
+
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(text):
+    """
+    Parses a duration such as "90", "30s", "10m", "1h" or "1h30m" into seconds.
+
+    Raises:
+        ValueError: If the text is not a duration.
+    """
+    text = str(text).strip().lower()
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([smhd]?)", text)
+    if not parts or re.sub(r"[\d.\s]+[smhd]?", "", text):
+        raise ValueError(f"Expected a duration like 10m or 90s, got {text!r}")
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+class RunLock:
+    """
+    A cross-process lock held for the length of one ETL run.
+
+    The lock is an OS file lock, so it is released automatically if the
+    process dies and a crash never leaves a stale lock behind.
+
+    Args:
+        path (str): Lock file; every process that should not overlap must
+            use the same one.
+    """
+
+    def __init__(self, path=DEFAULT_LOCK_PATH):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """Takes the lock if it is free. Returns False if another run holds it."""
+        self._file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+        # Note who holds it, to help whoever finds the run blocked
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(f"{os.getpid()}\n")
+        self._file.flush()
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class WarmContext:
+    """
+    Keeps expensive objects alive between runs of a long-running process.
+
+    Sessions, database clients, caches and rate limiters are built on first
+    use and handed back unchanged to every later run, so only the first run
+    pays for connecting and warming up. `close` closes everything once, at
+    shutdown.
+    """
+
+    def __init__(self):
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, factory):
+        """The object stored under `name`, built with factory() the first time."""
+        with self._lock:
+            if name not in self._objects:
+                self._objects[name] = factory()
+            return self._objects[name]
+
+    def close(self):
+        """Closes every stored object that has a close() method, newest first."""
+        with self._lock:
+            objects, self._objects = list(self._objects.values()), {}
+        for obj in reversed(objects):
+            if hasattr(obj, "close"):
+                try:
+                    obj.close()
+                except Exception as e:
+                    print(f"Error while closing {type(obj).__name__}: {e}")
+
+
+def serve(run_fn, interval, jitter=0.0, lock_path=DEFAULT_LOCK_PATH, max_runs=None,
+          stop_event=None, handle_signals=True):
+    """
+    Calls run_fn every `interval` seconds until asked to stop.
+
+    Runs start on a fixed schedule (start + k * interval) plus a random
+    delay of up to `jitter` seconds, so many daemons do not hit the API at
+    the same moment. A run that takes longer than the interval is never
+    overlapped: the ticks it missed are skipped. A run is also skipped while
+    another process (e.g. a scheduled task) holds the run lock. A failed run
+    is logged and the schedule carries on.
+
+    SIGINT/SIGTERM (Ctrl+C) stop the loop after the current run finishes;
+    a second Ctrl+C stops immediately.
+
+    Args:
+        run_fn (callable): One ETL run.
+        interval (float): Seconds between scheduled starts.
+        jitter (float): Maximum random delay added to each start.
+        lock_path (str): Run lock shared with other ETL processes (None
+            disables it).
+        max_runs (int): Stop after this many runs (None = forever).
+        stop_event (threading.Event): Set it to stop the loop.
+        handle_signals (bool): Install the SIGINT/SIGTERM handlers (only
+            possible from the main thread).
+
+    Returns:
+        int: Number of runs completed.
+    """
+    if interval <= 0:
+        raise ValueError(f"interval must be positive, got {interval}")
+    stop_event = stop_event or threading.Event()
+    previous_handlers = {}
+
+    def request_stop(signum, frame):
+        if stop_event.is_set():
+            raise KeyboardInterrupt  # Second signal: stop right now
+        print("Stopping after the current run (press Ctrl+C again to stop now)...")
+        stop_event.set()
+
+    if handle_signals and threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[signum] = signal.signal(signum, request_stop)
+
+    runs = 0
+    start = time.monotonic()
+    tick = 0
+    try:
+        while not stop_event.is_set() and (max_runs is None or runs < max_runs):
+            # Sleep until this tick's start plus its jitter, waking early on stop
+            start_at = start + tick * interval + random.uniform(0, jitter)
+            if stop_event.wait(max(0.0, start_at - time.monotonic())):
+                break
+
+            lock = RunLock(lock_path) if lock_path else None
+            if lock is not None and not lock.acquire():
+                print(f"Another ETL run holds {lock_path}; skipping this one.")
+            else:
+                began = time.monotonic()
+                try:
+                    run_fn()
+                except Exception:
+                    print("ETL run failed; will try again at the next interval.")
+                    traceback.print_exc()
+                finally:
+                    if lock is not None:
+                        lock.release()
+                runs += 1
+                print(f"Run {runs} took {time.monotonic() - began:.1f}s")
+
+            # Next tick still in the future; ticks a slow run overlapped are skipped
+            next_tick = int((time.monotonic() - start) // interval) + 1
+            if next_tick > tick + 1:
+                print(f"Run overran the interval; skipped {next_tick - tick - 1} scheduled start(s)")
+            tick = next_tick
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    return runs
@@ -0,0 +1,348 @@
+import csv
+import io
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+
+from Load import (SupabaseLoader, serialize_columns, drop_duplicate_keys, payload_frame,
+                  LOAD_MODES, DEFAULT_CONFLICT_KEY)
+
+# Sink names accepted by create_sink (and the LOAD_SINK environment variable)
+SINK_KINDS = ("supabase", "sqlite", "postgres", "duckdb")
+
+# NULL marker written into COPY buffers, so None and "" stay different
+COPY_NULL = "\\N"
+
+
+def _quote(name):
+    """Quotes an SQL identifier (table names like "Weather_data" are case-sensitive)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def copy_buffer(rows):
+    """
+    Writes rows into an in-memory CSV buffer for Postgres COPY.
+
+    Args:
+        rows (iterable): Tuples of JSON-friendly values, one per row.
+
+    Returns:
+        io.StringIO: Buffer positioned at the start, None written as COPY_NULL.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow([COPY_NULL if value is None else value for value in row])
+    buffer.seek(0)
+    return buffer
+
+
+class Sink(ABC):
+    """
+    Where transformed weather rows end up.
+
+    A sink takes a transformed DataFrame in `load` and returns the same
+    summary dict as SupabaseLoader.load ("status", "loaded", "failed",
+    "duplicates" and per-chunk "batches"), so the pipeline, the staging
+    replay and the benchmarks can use any backend. Sinks are context
+    managers; `close` releases their connection. Subclasses implement
+    `_write`.
+
+    Args:
+        table_name (str): Target table.
+        mode (str): One of LOAD_MODES ("insert", "upsert" or "skip").
+        conflict_key (tuple): Columns that identify a row for upserts.
+    """
+
+    # Column types by pandas dtype kind; subclasses override for their dialect
+    TYPES = {"b": "BOOLEAN", "i": "BIGINT", "u": "BIGINT", "f": "DOUBLE PRECISION",
+             "M": "TIMESTAMPTZ", "O": "TEXT"}
+
+    def __init__(self, table_name, mode="insert", conflict_key=DEFAULT_CONFLICT_KEY):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"mode must be one of {LOAD_MODES}, got {mode!r}")
+        self.table_name = table_name
+        self.mode = mode
+        self.conflict_key = tuple(conflict_key)
+        self._table_ready = False
+
+    def close(self):
+        """Releases the sink's connection (nothing to do by default)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _column_type(self, name, series):
+        # extraction_timestamp is added while serializing, so it has no series yet
+        if series is None or pd.api.types.is_datetime64_any_dtype(series):
+            return self.TYPES["M"]
+        # Extension dtypes (pandas strings, nullable ints) are stored as text
+        kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else "O"
+        return self.TYPES.get(kind, self.TYPES["O"])
+
+    def create_table_sql(self, df):
+        """CREATE TABLE IF NOT EXISTS matching the frame, with the conflict key unique."""
+        columns = list(df.columns)
+        if "extraction_timestamp" not in columns:
+            columns.append("extraction_timestamp")
+        definitions = [
+            f"{_quote(name)} {self._column_type(name, df[name] if name in df.columns else None)}"
+            for name in columns
+        ]
+        if self.mode != "insert":
+            definitions.append(f"UNIQUE ({', '.join(_quote(c) for c in self.conflict_key)})")
+        return f"CREATE TABLE IF NOT EXISTS {_quote(self.table_name)} ({', '.join(definitions)})"
+
+    def insert_sql(self, names, source):
+        """
+        INSERT ... from `source` (a VALUES list or a SELECT), with the
+        conflict handling that matches the mode.
+        """
+        column_list = ", ".join(_quote(n) for n in names)
+        sql = f"INSERT INTO {_quote(self.table_name)} ({column_list}) {source}"
+        if self.mode == "insert":
+            return sql
+        key = ", ".join(_quote(c) for c in self.conflict_key)
+        if self.mode == "skip":
+            return f"{sql} ON CONFLICT ({key}) DO NOTHING"
+        updates = ", ".join(f"{_quote(n)} = excluded.{_quote(n)}" for n in names
+                            if n not in self.conflict_key)
+        return f"{sql} ON CONFLICT ({key}) DO UPDATE SET {updates}"
+
+    @abstractmethod
+    def _write(self, df):
+        """Writes one deduplicated frame in a single transaction."""
+
+    def load(self, df: pd.DataFrame):
+        """
+        Loads a transformed weather snapshot DataFrame in one bulk write.
+
+        Args:
+            df (pd.DataFrame): Transformed weather snapshot DataFrame.
+
+        Returns:
+            dict: Summary with status, loaded/failed counts, repeated
+            observations dropped before loading and one entry in "batches".
+        """
+        if df.empty:
+            print("DataFrame is empty. Nothing to load.")
+            return {"status": "skipped", "loaded": 0, "failed": 0}
+
+        duplicates = 0
+        if self.mode != "insert":
+            missing = [c for c in self.conflict_key if c not in df.columns]
+            if missing:
+                raise ValueError(f"{self.mode} mode needs the conflict key columns {missing}")
+            deduplicated = drop_duplicate_keys(df, self.conflict_key)
+            duplicates = len(df) - len(deduplicated)
+            df = deduplicated
+        df = payload_frame(df, self.mode)
+
+        start = time.perf_counter()
+        try:
+            self._write(df)
+        except Exception as e:
+            # The write is one transaction, so nothing from this frame was stored
+            print(f"Error loading {len(df)} rows to {type(self).__name__} table '{self.table_name}': {e}")
+            return {"status": "failed", "loaded": 0, "failed": len(df), "duplicates": duplicates,
+                    "error": str(e)}
+        seconds = round(time.perf_counter() - start, 4)
+
+        print(f"Successfully loaded {len(df)} rows to {type(self).__name__} table "
+              f"'{self.table_name}' in {seconds:.3f}s.")
+        return {"status": "success", "loaded": len(df), "failed": 0, "duplicates": duplicates,
+                "batches": [{"chunk": 1, "rows": len(df), "loaded": len(df), "seconds": seconds}]}
+
+
+class SQLiteSink(Sink):
+    """
+    Loads into a local SQLite file with one executemany per frame.
+
+    Needs nothing beyond the standard library, so tests and benchmarks can
+    run the whole load path offline.
+
+    Args:
+        path (str): Database file (":memory:" for a throwaway database).
+        table_name (str): Target table; created from the first frame if missing.
+        mode (str): One of LOAD_MODES.
+        conflict_key (tuple): Columns that identify a row for upserts.
+    """
+
+    TYPES = {"b": "INTEGER", "i": "INTEGER", "u": "INTEGER", "f": "REAL",
+             "M": "TEXT", "O": "TEXT"}
+
+    def __init__(self, path, table_name, mode="insert", conflict_key=DEFAULT_CONFLICT_KEY):
+        super().__init__(table_name, mode, conflict_key)
+        # The pipeline's loader thread may not be the thread that built the sink
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+    def close(self):
+        self.connection.close()
+
+    def _write(self, df):
+        columns = serialize_columns(df)
+        names = list(columns)
+        placeholders = ", ".join("?" for _ in names)
+        with self.connection:  # One transaction: committed on success, rolled back on error
+            if not self._table_ready:
+                self.connection.execute(self.create_table_sql(df))
+                self._table_ready = True
+            self.connection.executemany(self.insert_sql(names, f"VALUES ({placeholders})"),
+                                        zip(*columns.values()))
+
+
+class PostgresCopySink(Sink):
+    """
+    Bulk-loads into Postgres with COPY from an in-memory CSV buffer.
+
+    COPY streams the whole frame in one round trip instead of sending JSON
+    through the REST API. Inserts copy straight into the table; upserts copy
+    into a temporary table first and merge it with one INSERT ... SELECT ...
+    ON CONFLICT. Works with psycopg (3) or psycopg2, whichever is installed.
+
+    Args:
+        dsn (str): Postgres connection string (Supabase's direct connection works).
+        table_name (str): Target table; created from the first frame if missing.
+        mode (str): One of LOAD_MODES.
+        conflict_key (tuple): Columns that identify a row for upserts.
+    """
+
+    def __init__(self, dsn, table_name, mode="insert", conflict_key=DEFAULT_CONFLICT_KEY):
+        super().__init__(table_name, mode, conflict_key)
+        try:
+            import psycopg
+            self._copy = self._copy_psycopg
+        except ImportError:
+            try:
+                import psycopg2 as psycopg
+                self._copy = self._copy_psycopg2
+            except ImportError as e:
+                raise ImportError("PostgresCopySink needs psycopg or psycopg2 "
+                                  "(pip install psycopg)") from e
+        self.connection = psycopg.connect(dsn)
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _copy_psycopg(cursor, sql, buffer):
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+    @staticmethod
+    def _copy_psycopg2(cursor, sql, buffer):
+        cursor.copy_expert(sql, buffer)
+
+    def _write(self, df):
+        columns = serialize_columns(df)
+        names = list(columns)
+        buffer = copy_buffer(zip(*columns.values()))
+        column_list = ", ".join(_quote(n) for n in names)
+        copy_options = f"(FORMAT csv, NULL '{COPY_NULL}')"
+
+        try:
+            with self.connection.cursor() as cursor:
+                if not self._table_ready:
+                    cursor.execute(self.create_table_sql(df))
+                    self._table_ready = True
+                if self.mode == "insert":
+                    self._copy(cursor, f"COPY {_quote(self.table_name)} ({column_list}) "
+                                       f"FROM STDIN WITH {copy_options}", buffer)
+                else:
+                    cursor.execute(f"CREATE TEMP TABLE weather_incoming "
+                                   f"(LIKE {_quote(self.table_name)} INCLUDING DEFAULTS) ON COMMIT DROP")
+                    self._copy(cursor, f"COPY weather_incoming ({column_list}) "
+                                       f"FROM STDIN WITH {copy_options}", buffer)
+                    cursor.execute(self.insert_sql(names, f"SELECT {column_list} FROM weather_incoming"))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+
+class DuckDBSink(Sink):
+    """
+    Appends into a local DuckDB file straight from the DataFrame.
+
+    DuckDB reads the frame's columns natively (no per-row conversion), which
+    makes it the fastest offline backend for large reprocessing runs.
+
+    Args:
+        path (str): Database file (":memory:" for a throwaway database).
+        table_name (str): Target table; created from the first frame if missing.
+        mode (str): One of LOAD_MODES.
+        conflict_key (tuple): Columns that identify a row for upserts.
+    """
+
+    TYPES = {"b": "BOOLEAN", "i": "BIGINT", "u": "UBIGINT", "f": "DOUBLE",
+             "M": "TIMESTAMPTZ", "O": "VARCHAR"}
+
+    def __init__(self, path, table_name, mode="insert", conflict_key=DEFAULT_CONFLICT_KEY):
+        super().__init__(table_name, mode, conflict_key)
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("DuckDBSink needs duckdb (pip install duckdb)") from e
+        self.connection = duckdb.connect(path)
+
+    def close(self):
+        self.connection.close()
+
+    def _write(self, df):
+        if "extraction_timestamp" not in df.columns:
+            df = df.assign(extraction_timestamp=pd.Timestamp.now(tz="UTC"))
+        names = list(df.columns)
+        self.connection.register("weather_incoming", df)
+        try:
+            self.connection.begin()
+            if not self._table_ready:
+                self.connection.execute(self.create_table_sql(df))
+                self._table_ready = True
+            column_list = ", ".join(_quote(n) for n in names)
+            self.connection.execute(self.insert_sql(names, f"SELECT {column_list} FROM weather_incoming"))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self.connection.unregister("weather_incoming")
+
+
+def create_sink(kind, table_name, supabase_url=None, supabase_key=None, dsn=None, path=None,
+                mode="insert", conflict_key=DEFAULT_CONFLICT_KEY, **supabase_options):
+    """
+    Builds the sink named by `kind` (one of SINK_KINDS).
+
+    Args:
+        kind (str): "supabase", "sqlite", "postgres" or "duckdb".
+        table_name (str): Target table.
+        supabase_url (str): Supabase project URL ("supabase" only).
+        supabase_key (str): Supabase API key ("supabase" only).
+        dsn (str): Postgres connection string ("postgres" only).
+        path (str): Database file ("sqlite" and "duckdb" only).
+        mode (str): One of LOAD_MODES.
+        conflict_key (tuple): Columns that identify a row for upserts.
+        **supabase_options: Extra SupabaseLoader arguments (chunk_size, ...).
+
+    Returns:
+        An object with load(df) -> result dict.
+    """
+    if kind == "supabase":
+        if not supabase_url or not supabase_key:
+            raise ValueError("Please set SUPABASE_URL and SUPABASE_KEY in .env")
+        return SupabaseLoader(supabase_url, supabase_key, table_name, mode=mode,
+                              conflict_key=conflict_key, **supabase_options)
+    if kind == "sqlite":
+        return SQLiteSink(path or "weather.db", table_name, mode, conflict_key)
+    if kind == "postgres":
+        if not dsn:
+            raise ValueError("Please set POSTGRES_DSN in .env")
+        return PostgresCopySink(dsn, table_name, mode, conflict_key)
+    if kind == "duckdb":
+        return DuckDBSink(path or "weather.duckdb", table_name, mode, conflict_key)
+    raise ValueError(f"sink must be one of {SINK_KINDS}, got {kind!r}")
@@ -0,0 +1,196 @@
+import json
+import os
+import time
+import argparse
+import itertools
+import pandas as pd
+
+from Load import serialize_records
+from Pipeline import merge_load_results, empty_load_result
+
+# Where staged rows wait for the database unless STAGING_DIR says otherwise
+DEFAULT_STAGING_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "staging"
+)
+
+CHECKPOINT_FILE = "checkpoint.json"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+def _write_atomically(path, text):
+    """Writes a file via temp file + fsync + rename, so it is never half-written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class StagingArea:
+    """
+    A local write-ahead buffer between transform and the database.
+
+    Every transformed batch is written to its own append-only JSONL segment
+    before anything is sent to Supabase, so a slow or unavailable database
+    never loses a run's data. `replay` later drains pending segments in the
+    order they were written, in bulk batches that may span several segments
+    (and several runs), and records its progress in a checkpoint file after
+    every successful batch. A replay that stops halfway resumes from the
+    checkpoint; with an upsert loader, rows sent again are not duplicated.
+
+    Args:
+        directory (str): Folder holding the segments and the checkpoint.
+    """
+
+    def __init__(self, directory=DEFAULT_STAGING_DIR):
+        self.directory = directory
+        self.checkpoint_path = os.path.join(directory, CHECKPOINT_FILE)
+        self._sequence = itertools.count()
+        os.makedirs(directory, exist_ok=True)
+
+    def _load_checkpoint(self):
+        """segment name -> rows of it already loaded."""
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, checkpoint):
+        _write_atomically(self.checkpoint_path, json.dumps(checkpoint, indent=2, sort_keys=True))
+
+    def _read_segment(self, name):
+        with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def stage(self, df: pd.DataFrame):
+        """
+        Writes one transformed batch to a new segment.
+
+        Rows are serialized exactly as they would be sent to the database,
+        including their extraction timestamp, so replaying them later keeps
+        the time they were really extracted.
+
+        Args:
+            df (pd.DataFrame): Transformed weather snapshot DataFrame.
+
+        Returns:
+            dict: Load-style summary with the number of rows "staged".
+        """
+        if df.empty:
+            return {"status": "skipped", "loaded": 0, "failed": 0, "staged": 0}
+
+        records = serialize_records(df)
+        name = self._write_segment(records)
+        print(f"Staged {len(records)} rows in {name}")
+        return {"status": "staged", "loaded": 0, "failed": 0, "staged": len(records)}
+
+    def _write_segment(self, records):
+        """Writes serialized records to a new segment and returns its name."""
+        # Nanosecond time + a counter keeps names unique and in write order
+        name = f"{time.time_ns():020d}-{next(self._sequence):06d}{SEGMENT_SUFFIX}"
+        _write_atomically(
+            os.path.join(self.directory, name),
+            "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records),
+        )
+        return name
+
+    def pending(self):
+        """Names of the segments not fully loaded yet, oldest first."""
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def pending_rows(self):
+        """How many staged rows are still waiting to be loaded."""
+        checkpoint = self._load_checkpoint()
+        return sum(len(self._read_segment(name)) - checkpoint.get(name, 0) for name in self.pending())
+
+    def replay(self, load_fn, batch_rows=5000):
+        """
+        Drains pending segments into the database in bulk batches.
+
+        Rows only leave the staging area once the database has taken them
+        or the loader has written them to its dead-letter file. After each
+        batch the checkpoint moves forward and fully loaded segments are
+        deleted. Rows of a batch that did not load (the database was down,
+        or rejected them without dead-lettering) are written back to a new
+        segment, and the replay stops there, to try again next time. When
+        the loader does not say which rows failed (no "failed_records"),
+        the whole batch stays pending. If load_fn raises, the checkpoint
+        keeps every batch loaded before it and the error is raised.
+
+        Args:
+            load_fn (callable): Takes a DataFrame and returns a load result
+                dict, e.g. SupabaseLoader.load.
+            batch_rows (int): Rows sent to load_fn per call.
+
+        Returns:
+            dict: Combined load result, plus the rows still "pending".
+        """
+        checkpoint = self._load_checkpoint()
+        total = empty_load_result()
+        batch, spans = [], []  # spans: (segment, rows loaded once the batch lands, segment rows)
+
+        def flush():
+            result = load_fn(pd.DataFrame.from_records(batch))
+            merge_load_results(total, result)
+            letters = result.get("failed_records") or []
+            if len(letters) < result.get("failed", 0):
+                return False  # We can't tell which rows failed, so keep them all
+            kept = [letter["record"] for letter in letters if not letter.get("dead_lettered")]
+            if kept and not result.get("loaded") and len(kept) == len(letters):
+                return False  # Nothing landed: leave the batch where it is
+            if kept:
+                # Put the refused rows back before the checkpoint moves past them
+                self._write_segment(kept)
+                print(f"Kept {len(kept)} rows the database did not take for the next replay")
+            for name, end, length in spans:
+                if end == length:
+                    os.remove(os.path.join(self.directory, name))
+                    checkpoint.pop(name, None)
+                else:
+                    checkpoint[name] = end
+            self._save_checkpoint(checkpoint)
+            batch.clear()
+            spans.clear()
+            return not kept
+
+        for name in self.pending():
+            records = self._read_segment(name)
+            position = checkpoint.get(name, 0)
+            if position >= len(records):
+                spans.append((name, len(records), len(records)))  # Nothing left but the file
+            while position < len(records):
+                take = min(batch_rows - len(batch), len(records) - position)
+                batch.extend(records[position:position + take])
+                position += take
+                spans.append((name, position, len(records)))
+                if len(batch) >= batch_rows and not flush():
+                    return self._replay_summary(total)
+
+        if batch:
+            flush()
+        elif spans:  # Only already-loaded leftovers: clean them up
+            for name, _, _ in spans:
+                os.remove(os.path.join(self.directory, name))
+                checkpoint.pop(name, None)
+            self._save_checkpoint(checkpoint)
+        return self._replay_summary(total)
+
+    def _replay_summary(self, total):
+        total["pending"] = self.pending_rows()
+        if total["pending"]:
+            print(f"{total['pending']} staged rows are still pending in {self.directory}")
+        return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the local staging area.")
+    parser.add_argument("--dir", default=os.getenv("STAGING_DIR", DEFAULT_STAGING_DIR))
+    args = parser.parse_args()
+
+    staging = StagingArea(args.dir)
+    print(f"{len(staging.pending())} pending segments, "
+          f"{staging.pending_rows()} rows waiting in {staging.directory}")
@@ -1,26 +1,52 @@
+import numpy as np
 import pandas as pd
 
-def transform_data(df):
+# Relevant base columns kept from the raw extract
+COLUMNS_TO_KEEP = [
+    "city_name", "country_code",
+    "temperature", "feels_like",
+    "humidity", "weather_description",
+    "rain_1h", "rain_3h", "snow_1h", "snow_3h",
+    "wind_speed", "wind_direction",
+    "cloudiness", "visibility"
+]
+
+# Identify one observation; carried through untouched so loads can upsert on them
+KEY_COLUMNS = ["city_id", "data_timestamp"]
+
+# The essentials returned for a clean display
+OUTPUT_COLUMNS = [
+    "city_name", "country_code",
+    "temperature", "feels_like",
+    "humidity_label", "precip_type", "precip_chance",
+    "wind_label", "snapshot"
+]
+
+
+def transform_data_rowwise(df):
+    """
+    Reference implementation of transform_data using per-row callbacks.
+
+    Kept for equivalence tests and benchmarks; use transform_data instead.
+    """
     if df.empty:
         return None
 
     df.columns = [col.lower() for col in df.columns]
 
-    # Keep only relevant base columns
-    columns_to_keep = [
-        "city_name", "country_code",
-        "temperature", "feels_like",
-        "humidity", "weather_description",
-        "rain_1h", "rain_3h", "snow_1h", "snow_3h",
-        "wind_speed", "wind_direction",
-        "cloudiness", "visibility"
-    ]
+    # Keep only relevant base columns (plus the observation key, when present)
+    columns_to_keep = KEY_COLUMNS + COLUMNS_TO_KEEP
     df = df[[c for c in columns_to_keep if c in df.columns]]
 
     # --- Precipitation logic ---
+    def amount(row, col):
+        # Missing amounts can be None (one-row frames) or NaN (multi-row frames)
+        value = row.get(col, 0)
+        return 0 if pd.isna(value) else value
+
     def precip_info(row):
-        rain = (row.get("rain_1h", 0) or 0) + (row.get("rain_3h", 0) or 0)
-        snow = (row.get("snow_1h", 0) or 0) + (row.get("snow_3h", 0) or 0)
+        rain = amount(row, "rain_1h") + amount(row, "rain_3h")
+        snow = amount(row, "snow_1h") + amount(row, "snow_3h")
         total = rain + snow
 
         if total == 0:
@@ -81,9 +107,96 @@ def transform_data(df):
     df["snapshot"] = df.apply(concise_summary, axis=1)
 
     # Return only the essentials for a clean display
-    return df[[
-        "city_name", "country_code",
-        "temperature", "feels_like",
-        "humidity_label", "precip_type", "precip_chance",
-        "wind_label", "snapshot"
-    ]]
+    return df[_output_columns(df)]
+
+
+def _output_columns(df):
+    """OUTPUT_COLUMNS, preceded by whichever KEY_COLUMNS the frame carries."""
+    return [c for c in KEY_COLUMNS if c in df.columns] + OUTPUT_COLUMNS
+
+
+def _amount(df, col):
+    """A precipitation column as numbers, with missing values (None/NaN) as 0."""
+    if col not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+
+def _labels(conditions, choices, default, index):
+    """np.select over whole columns, returned as a Series of labels."""
+    return pd.Series(np.select(conditions, choices, default), index=index)
+
+
+def _text(series):
+    """A column as an object array of Python strings, ready for concatenation."""
+    return series.astype(str).to_numpy(dtype=object)
+
+
+def transform_data(df):
+    """
+    Cleans raw weather rows and adds labels and a one-line snapshot.
+
+    Every step works on whole columns (arithmetic, np.select binning and
+    string concatenation), so the cost grows linearly with a small constant
+    and large frames (e.g. reprocessed history) transform quickly. The output
+    matches transform_data_rowwise; a missing wind speed yields a None
+    wind_label and "unknown winds" in the snapshot instead of an error.
+
+    Args:
+        df (pd.DataFrame): Raw rows as produced by Extract.
+
+    Returns:
+        pd.DataFrame: The OUTPUT_COLUMNS for every row, preceded by the
+        KEY_COLUMNS (city_id, data_timestamp) when the input has them, or
+        None if df is empty.
+    """
+    if df.empty:
+        return None
+
+    df = df.rename(columns=str.lower)
+    df = df[[c for c in KEY_COLUMNS + COLUMNS_TO_KEEP if c in df.columns]].copy()
+    index = df.index
+
+    # --- Precipitation logic ---
+    rain = _amount(df, "rain_1h") + _amount(df, "rain_3h")
+    snow = _amount(df, "snow_1h") + _amount(df, "snow_3h")
+    total = rain + snow
+    no_precip = total == 0
+    df["precip_type"] = _labels(
+        [no_precip, (rain > 0) & (snow > 0), rain > 0], ["None", "Mixed", "Rain"], "Snow", index
+    )
+    df["precip_chance"] = _labels([no_precip, total < 1], ["Low", "Medium"], "High", index)
+
+    # --- Derived metrics ---
+    df["weather_description"] = df["weather_description"].str.title()
+    df["temperature"] = df["temperature"].round(1)
+    df["feels_like"] = df["feels_like"].round(1)
+
+    humidity = pd.to_numeric(df["humidity"], errors="coerce")
+    df["humidity_label"] = _labels([humidity < 30, humidity < 60], ["Dry", "Comfortable"], "Humid", index)
+
+    # --- Wind ---
+    wind = pd.to_numeric(df["wind_speed"], errors="coerce")
+    wind_label = _labels([wind < 2, wind < 6, wind < 10], ["Calm", "Light breeze", "Windy"], "Strong", index)
+    df["wind_label"] = wind_label.where(wind.notna(), None)
+
+    # --- Concise summary ---
+    # Built on plain object arrays: element-wise str concatenation in numpy
+    # is much cheaper than the validation pandas' string arrays do per "+"
+    precip_text = np.where(
+        no_precip.to_numpy(),
+        "No precipitation expected",
+        _text(df["precip_chance"]) + " chance of " + _text(df["precip_type"].str.lower()),
+    ).astype(object)
+    wind_text = _text(df["wind_label"].fillna("unknown").str.lower())
+
+    snapshot = (
+        _text(df["city_name"]) + " (" + _text(df["country_code"]) + "): "
+        + _text(df["temperature"]) + "°C (feels " + _text(df["feels_like"]) + "°C), "
+        + _text(df["weather_description"]) + ". "
+        + precip_text + ". " + _text(df["humidity_label"]) + ", " + wind_text + " winds."
+    )
+    df["snapshot"] = pd.Series(snapshot, index=index)
+
+    # Return only the essentials for a clean display
+    return df[_output_columns(df)]
@@ -1,20 +1,203 @@
-from dotenv import load_dotenv
 import os
 import sys
-import pandas as pd
+import argparse
+import datetime
+from contextlib import nullcontext
 
 # Add parent directory to path to import cities
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from Extract import extract
-from Transform import transform_data
-from Load import load_to_supabase
+# Only light modules are imported at startup. The pipeline stages (pandas,
+# requests, supabase...) are imported inside run_etl when a run starts, so
+# --help and --check-config answer in a fraction of a second.
+from Catalog import load_catalog, shard_cities, shard_path, parse_shard
+from Scheduler import WarmContext, RunLock, serve, parse_interval, DEFAULT_LOCK_PATH
 from cities import CANADIAN_CITIES
 
-def run_etl():
-    # Load .env from parent directory
-    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-    load_dotenv(env_path, override=True)
+# Where .env is read from
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+
+# Numeric settings run_etl reads, checked by --check-config without starting a run
+NUMERIC_SETTINGS = {
+    "EXTRACT_MAX_WORKERS": int, "EXTRACT_MAX_RETRIES": int, "OPENWEATHER_CALLS_PER_MINUTE": float,
+    "OPENWEATHER_BURST": int, "EXTRACT_DEADLINE": float, "EXTRACT_CALL_DEADLINE": float,
+    "EXTRACT_FINAL_PASS_SECONDS": float, "RESPONSE_CACHE_TTL": float, "ETL_CHUNK_SIZE": int,
+    "ETL_LOAD_QUEUE_DEPTH": int, "LOAD_CHUNK_SIZE": int, "LOAD_MAX_WORKERS": int,
+    "STAGING_REPLAY_BATCH_ROWS": int, "REPROCESS_WORKERS": int, "ETL_SHARDS": int,
+    "METRICS_PORT": int, "PROFILE_TOP": int,
+}
+
+# Copies of Sinks.SINK_KINDS and Load.LOAD_MODES, so checking them needs no pandas
+# (test_startup.py keeps them in sync)
+SINK_KINDS = ("supabase", "sqlite", "postgres", "duckdb")
+LOAD_MODES = ("insert", "upsert", "skip")
+
+def fetch_city_records(cities, extractor, registry, max_workers=8):
+    """
+    Fetches the current weather for a list of city queries.
+
+    New cities are looked up by name once (that lookup is also their reading
+    for this run); cities resolved on earlier runs are fetched by ID, 20 per
+    request.
+
+    Returns:
+        list: Records for every city that could be fetched, in input order.
+    """
+    records_by_city = registry.resolve(cities, extractor, max_workers=max_workers)
+
+    known_ids = {}  # city_id -> queries still to fetch
+    for city_id, queries in registry.city_ids(cities)[0].items():
+        queries = [city for city in queries if city not in records_by_city]
+        if queries:
+            known_ids[city_id] = queries
+    if known_ids:
+        first_query = {city_id: queries[0] for city_id, queries in known_ids.items()}
+        for record in extractor.extract_bulk_records(list(known_ids), queries=first_query,
+                                                     max_workers=max_workers):
+            # Each ID is fetched once; queries sharing it get their own copy of the record
+            for city in known_ids[int(record["city_id"])]:
+                records_by_city[city] = dict(record, query_city=city)
+
+    return [records_by_city[city] for city in cities if city in records_by_city]
+
+def run_etl(replay_only=False, stage_only=False, reprocess=False, since=None, until=None,
+            catalog=None, shard=None, context=None, profile=None):
+    """
+    Runs the whole ETL once.
+
+    When STAGING_DIR is set (or either flag is given), transformed chunks are
+    written to the local staging area first and then drained to Supabase, so
+    rows that cannot be loaded now are kept for a later replay.
+
+    Args:
+        replay_only (bool): Skip extraction and only drain staged rows.
+        stage_only (bool): Extract and stage, leaving the load for a later replay.
+        reprocess (bool): Skip the API and rebuild rows from the raw archive.
+        since (int): With reprocess, only observations from this Unix time on.
+        until (int): With reprocess, only observations before this Unix time.
+        catalog (str): CSV or Parquet city catalog (default: CITY_CATALOG,
+            or the list in cities.py).
+        shard (tuple): (index, count) to only run one shard of the cities
+            (default: CITY_SHARD, e.g. "2/8").
+        context (WarmContext): In serve mode, keeps the settings, HTTP
+            session, sink, caches and limiters from the first run for every
+            later one. Without it everything is built and closed per run.
+        profile (str): Stages to profile, e.g. "all" or "transform,load"
+            (default: ETL_PROFILE; empty = no profiling).
+
+    Returns:
+        dict: Combined load result for the run.
+    """
+    from Metrics import Metrics
+
+    # Every run records its stage times, latencies and counts, and reports them
+    # even if it fails halfway
+    metrics = Metrics()
+    shard = shard or parse_shard(os.getenv("CITY_SHARD", "0/1"))
+    profiler = create_profiler(profile, metrics.run_id)
+    result, failed = None, True
+    try:
+        with profiler if profiler is not None else nullcontext():
+            result = _run_etl(replay_only, stage_only, reprocess, since, until, catalog, shard,
+                              context, metrics, profiler)
+        failed = False
+        return result
+    finally:
+        metrics.finish(result, failed=failed)
+        export_metrics(metrics, context, shard)
+        if profiler is not None:
+            export_profiles(profiler)
+
+
+def create_profiler(profile, run_id):
+    """
+    The StageProfiler for this run, or None when no stage is profiled.
+
+    ETL_PROFILE (or `profile`) picks the stages, PROFILE_DIR where the
+    files go, PROFILE_MEMORY=0 turns off memory tracing and PROFILE_TOP
+    sets how many functions and allocators each report lists.
+    """
+    from Profiling import StageProfiler, parse_stages, DEFAULT_PROFILE_DIR
+
+    stages = parse_stages(profile if profile is not None else os.getenv("ETL_PROFILE", ""))
+    if not stages:
+        return None
+    return StageProfiler(stages, output_dir=os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR),
+                         run_id=run_id, memory=os.getenv("PROFILE_MEMORY", "1") == "1",
+                         top=int(os.getenv("PROFILE_TOP", "25")))
+
+
+def export_profiles(profiler):
+    """Writes the run's profile files and prints where they are."""
+    # Like metrics, profiles are a side output: failing to write them must not fail the run
+    try:
+        reports = profiler.write()
+    except Exception as e:
+        print(f"Could not write profiles: {e}")
+        return
+    for line in profiler.summary():
+        print(line)
+    if reports:
+        print(f"Profiles written to {profiler.output_dir} ({len(reports)} report(s), run {profiler.run_id})")
+
+
+def export_metrics(metrics, context=None, shard=(0, 1)):
+    """
+    Prints a one-line stage summary and writes the run's metrics.
+
+    METRICS_REPORT_PATH appends the JSON run report (one line per run),
+    METRICS_PROM_PATH writes Prometheus text for node_exporter's textfile
+    collector, and in serve mode METRICS_PORT serves it at /metrics.
+    A sharded run writes its own Prometheus file (see shard_path), with a
+    shard label on every series, so shards never overwrite each other.
+    """
+    stages = metrics.report()["stages"]
+    if stages:
+        print("Stage times: " + ", ".join(f"{name} {stage.get('seconds', 0):.2f}s"
+                                          for name, stage in stages.items())
+              + f" (run {metrics.finished_at - metrics.started_at:.2f}s)")
+
+    shard_index, shard_count = shard
+    report_path = os.getenv("METRICS_REPORT_PATH")
+    prom_path = shard_path(os.getenv("METRICS_PROM_PATH"), shard_index, shard_count)
+    labels = {"shard": f"{shard_index}/{shard_count}"} if shard_count > 1 else {}
+    port = int(os.getenv("METRICS_PORT", "0"))
+    # Metrics are a side output: failing to write them must not fail the run
+    try:
+        if report_path:
+            metrics.append_report(report_path)
+        if prom_path:
+            metrics.write_prometheus(prom_path, **labels)
+        if port and context is not None:
+            from Metrics import MetricsServer
+            server = context.get("metrics_server", lambda: MetricsServer(port))
+            server.publish(metrics)
+    except Exception as e:
+        print(f"Could not export metrics: {e}")
+
+
+def _run_etl(replay_only, stage_only, reprocess, since, until, catalog, shard, context, metrics,
+             profiler=None):
+    """The body of run_etl; everything it measures goes into `metrics` (and `profiler`)."""
+    from dotenv import load_dotenv
+    from Extract import WeatherExtractor
+    from Pipeline import run_streaming, run_pipelined, merge_load_results, load_chunk
+    from Sinks import create_sink
+    from CityRegistry import CityRegistry, DEFAULT_REGISTRY_PATH
+    from Cache import ResponseCache
+    from RateLimit import TokenBucket, AdaptiveConcurrency
+    from Latency import Deadline
+    from Staging import StagingArea, DEFAULT_STAGING_DIR
+    from Lake import ParquetLake
+    from Archive import RawArchive, DEFAULT_ARCHIVE_DIR
+    from Reprocess import reprocess_archive
+
+    def warm(name, factory):
+        # Built once and reused in serve mode, built fresh for a one-off run
+        return context.get(name, factory) if context is not None else factory()
+
+    # Load .env from parent directory (once per process in serve mode)
+    warm("dotenv", lambda: load_dotenv(ENV_PATH, override=True))
     
     # Load environment variables
     api_key = os.getenv("WEATHER_API_KEY")
@@ -22,39 +205,429 @@ def run_etl():
     supabase_key = os.getenv("SUPABASE_KEY")
     # Use the exact table name as it appears in Supabase (case-sensitive!)
     table_name = "Weather_data"
+    # How many OpenWeather requests may be in flight at the same time
+    max_workers = int(os.getenv("EXTRACT_MAX_WORKERS", "8"))
+    # How many times a failed request is retried before a city is skipped
+    max_retries = int(os.getenv("EXTRACT_MAX_RETRIES", "3"))
+    # OpenWeather quota: sustained calls per minute plus a short burst (0 turns the limiter off);
+    # the defaults keep any one minute at or under the free plan's 60 calls
+    calls_per_minute = float(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "55"))
+    call_burst = int(os.getenv("OPENWEATHER_BURST", "5"))
+    # Let in-flight requests adapt between 1 and EXTRACT_MAX_WORKERS (0 = always use every worker)
+    adaptive_concurrency = os.getenv("EXTRACT_ADAPTIVE_CONCURRENCY", "1") == "1"
+    # Send a duplicate of any request slower than the recent p95, and keep the first answer
+    hedge = os.getenv("EXTRACT_HEDGE", "0") == "1"
+    # Seconds the whole extract may take (0 = no limit), and one city's call including retries
+    extract_deadline = float(os.getenv("EXTRACT_DEADLINE", "0"))
+    call_deadline = float(os.getenv("EXTRACT_CALL_DEADLINE", "0")) or None
+    # Extra seconds for one last try at cities the deadline cut off (0 = drop them)
+    final_pass_seconds = float(os.getenv("EXTRACT_FINAL_PASS_SECONDS", "30"))
+    # Where resolved city IDs are remembered between runs
+    registry_path = os.getenv("CITY_REGISTRY_PATH", DEFAULT_REGISTRY_PATH)
+    # Optional on-disk cache of recent answers, so re-runs skip fresh cities
+    cache_path = os.getenv("RESPONSE_CACHE_PATH")
+    cache_ttl = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+    # Cities extracted, transformed and loaded together; bounds peak memory
+    chunk_size = int(os.getenv("ETL_CHUNK_SIZE", "500"))
+    # Chunks allowed to wait for the background loader; 0 loads each chunk in line
+    load_queue_depth = int(os.getenv("ETL_LOAD_QUEUE_DEPTH", "2"))
+    # Rows per Supabase insert request, and how many requests run in parallel
+    load_chunk_size = int(os.getenv("LOAD_CHUNK_SIZE", "500"))
+    load_max_workers = int(os.getenv("LOAD_MAX_WORKERS", "4"))
+    # Optional JSONL file collecting rows the database rejected
+    dead_letter_path = os.getenv("LOAD_DEAD_LETTER_PATH")
+    # "insert" (default) always appends; "upsert" and "skip" never store the same observation
+    # twice, but need a unique constraint on the conflict key (see README)
+    load_mode = os.getenv("LOAD_MODE", "insert")
+    conflict_key = [c.strip() for c in os.getenv("LOAD_CONFLICT_KEY", "city_id,data_timestamp").split(",")]
+    # Optional local write-ahead buffer; rows wait here until the database takes them
+    staging_dir = os.getenv("STAGING_DIR")
+    if staging_dir is None and (replay_only or stage_only):
+        staging_dir = DEFAULT_STAGING_DIR
+    replay_batch_rows = int(os.getenv("STAGING_REPLAY_BATCH_ROWS", "5000"))
+    # Where rows are loaded: "supabase" (REST), "postgres" (COPY), "sqlite" or "duckdb"
+    sink_kind = os.getenv("LOAD_SINK", "supabase")
+    postgres_dsn = os.getenv("POSTGRES_DSN")
+    sink_path = os.getenv("SINK_PATH")
+    # Optional Parquet history for analytics, plus the raw extracts if LAKE_RAW=1
+    lake_dir = os.getenv("LAKE_DIR")
+    lake_raw = os.getenv("LAKE_RAW", "0") == "1"
+    # Optional compressed archive of every raw API answer, exactly as received
+    archive_dir = os.getenv("RAW_ARCHIVE_DIR")
+    # Worker processes used to reprocess the archive (default: one per CPU)
+    reprocess_workers = int(os.getenv("REPROCESS_WORKERS", "0")) or None
+    # Cities come from a CSV/Parquet catalog if one is given, else from cities.py
+    catalog = catalog or os.getenv("CITY_CATALOG")
+    # Only this shard's cities (e.g. "2/8"); every shard is a separate process or machine
+    shard_index, shard_count = shard or parse_shard(os.getenv("CITY_SHARD", "0/1"))
+
+    cities = load_catalog(catalog) if catalog else CANADIAN_CITIES
+    if shard_count > 1:
+        cities = shard_cities(cities, shard_index, shard_count)
+        # Shards must not overwrite each other's state files...
+        registry_path = shard_path(registry_path, shard_index, shard_count)
+        cache_path = shard_path(cache_path, shard_index, shard_count)
+        staging_dir = shard_path(staging_dir, shard_index, shard_count)
+        # ...and together must stay within the one API quota
+        calls_per_minute /= shard_count
+        call_burst = max(1, call_burst // shard_count)
+        print(f"Shard {shard_index}/{shard_count}: {len(cities)} cities")
     
     print(f"Using table: {table_name}")
 
-    # Validate required environment variables
-    if not api_key:
+    # Validate required environment variables (replays need no API key,
+    # staging-only runs and local sinks need no Supabase)
+    if not api_key and not (replay_only or reprocess):
         raise ValueError("Please set WEATHER_API_KEY in .env")
-    if not supabase_url:
-        raise ValueError("Please set SUPABASE_URL in .env")
-    if not supabase_key:
-        raise ValueError("Please set SUPABASE_KEY in .env")
+    if sink_kind == "supabase" and not stage_only:
+        if not supabase_url:
+            raise ValueError("Please set SUPABASE_URL in .env")
+        if not supabase_key:
+            raise ValueError("Please set SUPABASE_KEY in .env")
 
-    # Collect all weather data
-    all_data = []
-    
-    for city in CANADIAN_CITIES:
-        print(f"Fetching weather for {city}...")
-        raw_df = extract(api_key, city)
-        
-        if not raw_df.empty:
-            transformed_df = transform_data(raw_df)
-            if transformed_df is not None and not transformed_df.empty:
-                all_data.append(transformed_df)
-    
-    # Combine all city data
-    if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
-        print(f"\nLoading {len(combined_df)} records to Supabase...")
-        
-        # Load to Supabase
-        result = load_to_supabase(combined_df, supabase_url, supabase_key, table_name)
+    registry = warm("registry", lambda: CityRegistry(registry_path))
+    cache = warm("cache", lambda: ResponseCache(ttl=cache_ttl, path=cache_path)) if cache_path else None
+    staging = StagingArea(staging_dir) if staging_dir else None
+
+    # One sink (and so one client or connection) for the whole run
+    loader = None
+    if not stage_only:
+        loader = warm("loader", lambda: create_sink(
+            sink_kind, table_name, supabase_url=supabase_url, supabase_key=supabase_key,
+            dsn=postgres_dsn, path=sink_path, mode=load_mode, conflict_key=conflict_key,
+            chunk_size=load_chunk_size, max_workers=load_max_workers,
+            dead_letter_path=dead_letter_path))
+
+    if reprocess:
+        # History goes straight to the sink (an upsert sink replaces the old rows),
+        # or with --stage-only into the staging area for a later --replay
+        store = staging.stage if stage_only else loader.load
+        result = reprocess_archive(RawArchive(archive_dir or DEFAULT_ARCHIVE_DIR),
+                                   lambda df: load_chunk(store, df, metrics, profiler=profiler),
+                                   max_workers=reprocess_workers, since=since, until=until)
+        if loader is not None and context is None:
+            loader.close()
+        if stage_only:
+            print(f"Reprocessing complete. {staging.pending_rows()} rows staged in "
+                  f"{staging.directory}; run with --replay to load them.")
+            return result
+        print(f"Reprocessing complete. Status: {result['status']}, "
+              f"Loaded: {result['loaded']}, Failed: {result['failed']}")
+        return result
+
+    # With staging, chunks are written locally first and drained afterwards
+    load_fn = staging.stage if staging is not None else loader.load
+    raw_fn = None
+
+    if lake_dir:
+        lake = ParquetLake(lake_dir)
+
+        def write_to_lake(df, table):
+            # The lake is a side output: a failed write must not stop the load
+            try:
+                with metrics.stage("lake"):
+                    lake.append(df, table=table)
+            except Exception as e:
+                print(f"Could not write to the Parquet lake ({table}): {e}")
+
+        def lake_then_load(df, load=load_fn):
+            write_to_lake(df, "weather")
+            return load(df)
+
+        load_fn = lake_then_load
+        if lake_raw:
+            raw_fn = lambda df: write_to_lake(df, "raw")
+
+    result = None
+    if not replay_only:
+        print(f"Fetching weather for {len(cities)} cities "
+              f"({max_workers} at a time, {chunk_size} per chunk)...")
+        # One pooled session for the whole run, sized so every worker gets a connection
+        archive = warm("archive", lambda: RawArchive(archive_dir)) if archive_dir else None
+        # Limiters are shared across runs in serve mode, so the quota holds between runs too
+        rate_limiter = (warm("rate_limiter", lambda: TokenBucket(calls_per_minute, call_burst))
+                        if calls_per_minute > 0 else None)
+        # Start at half the workers and let healthy answers ramp it up
+        concurrency = (warm("concurrency", lambda: AdaptiveConcurrency(initial=max(1, max_workers // 2),
+                                                                        max_limit=max_workers))
+                       if adaptive_concurrency else None)
+        deadline = Deadline(extract_deadline) if extract_deadline > 0 else None
+        stragglers = []  # Cities the deadline cut off
+        # A hedged request may briefly hold two connections
+        extractor = warm("extractor", lambda: WeatherExtractor(
+            api_key, pool_size=max_workers * (2 if hedge else 1), max_retries=max_retries,
+            cache=cache, archive=archive, rate_limiter=rate_limiter, concurrency=concurrency,
+            hedge=hedge, call_deadline=call_deadline))
+        extractor.deadline = deadline
+        extractor.metrics = metrics
+        try:
+            # A warm extractor stays open for the next run; otherwise it is closed afterwards
+            with nullcontext(extractor) if context is not None else extractor:
+                def fetch_chunk(cities):
+                    if extractor.deadline is not None and extractor.deadline.expired():
+                        # Out of time: don't ask at all, so the registry doesn't record
+                        # "no data" for every city; the first pass's go to the final pass
+                        if extractor.deadline is deadline:
+                            stragglers.extend(cities)
+                        return []
+                    records = fetch_city_records(cities, extractor, registry, max_workers)
+                    if extractor.deadline is deadline and deadline is not None and deadline.expired():
+                        fetched = {record["query_city"] for record in records}
+                        stragglers.extend(city for city in cities if city not in fetched)
+                    return records
+
+                def run_chunks(cities, load):
+                    # While profiling, stages run one at a time so each profile only holds its own stage
+                    if load_queue_depth > 0 and profiler is None:
+                        # Loading one chunk overlaps with extracting the next
+                        return run_pipelined(cities, fetch_chunk, load, chunk_size=chunk_size,
+                                             queue_depth=load_queue_depth, raw_fn=raw_fn, metrics=metrics)
+                    # Chunks flow through extract -> transform -> load one at a time
+                    return run_streaming(cities, fetch_chunk, load, chunk_size=chunk_size, raw_fn=raw_fn,
+                                         metrics=metrics, profiler=profiler)
+
+                result = run_chunks(cities, load_fn)
+
+                if stragglers and final_pass_seconds > 0:
+                    print(f"Extract deadline passed; retrying {len(stragglers)} cities "
+                          f"for up to {final_pass_seconds:.0f}s...")
+                    extractor.deadline = Deadline(final_pass_seconds)
+
+                    def load_into_result(df):
+                        # Count the final pass's chunks in the same run summary
+                        chunk_result = load_fn(df)
+                        merge_load_results(result, chunk_result)
+                        return chunk_result
+
+                    run_chunks(stragglers, load_into_result)
+                elif stragglers:
+                    print(f"Extract deadline passed; dropped {len(stragglers)} cities")
+
+                print(f"Extract latency: {extractor.latency.summary()}")
+        finally:
+            # Save what was fetched even when the run fails, so a re-run skips those cities
+            if cache is not None:
+                cache.save()
+
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses")
+
+        if concurrency is not None:
+            print(f"Adaptive concurrency settled at {concurrency.stats()['limit']} requests in flight")
+
+        for city, reason in registry.unresolved(cities).items():
+            print(f"Could not resolve {city}: {reason}")
+
+    if staging is not None:
+        if stage_only:
+            print(f"{staging.pending_rows()} rows staged in {staging.directory}; "
+                  f"run with --replay to load them.")
+            return result
+        # Drain everything staged so far, including rows left over by earlier runs
+        result = staging.replay(lambda df: load_chunk(loader.load, df, metrics, stage="replay",
+                                                      profiler=profiler),
+                                batch_rows=replay_batch_rows)
+
+    if loader is not None and context is None:
+        loader.close()
+
+    if result["chunks"]:
         print(f"ETL complete. Status: {result['status']}, Loaded: {result['loaded']}, Failed: {result['failed']}")
     else:
         print("No data to load.")
+    return result
+
+def check_config(catalog=None, replay_only=False, stage_only=False, reprocess=False):
+    """
+    Checks the settings a run would use, without running anything.
+
+    Reads .env, then checks required keys, numbers, choices, files and
+    optional packages, all without importing pandas or the database
+    clients or calling any API, so it is quick enough for a pre-flight
+    check before every scheduled run.
+
+    Returns:
+        list: Problems found (empty if the configuration looks good).
+    """
+    from importlib.util import find_spec
+
+    problems = []
+    if find_spec("dotenv") is None:
+        problems.append("python-dotenv is not installed (pip install python-dotenv)")
+    else:
+        from dotenv import load_dotenv
+        load_dotenv(ENV_PATH, override=True)
+
+    def installed(*modules):
+        return any(find_spec(module) is not None for module in modules)
+
+    if not os.getenv("WEATHER_API_KEY") and not (replay_only or reprocess):
+        problems.append("WEATHER_API_KEY is not set")
+
+    sink_kind = os.getenv("LOAD_SINK", "supabase")
+    if sink_kind not in SINK_KINDS:
+        problems.append(f"LOAD_SINK must be one of {SINK_KINDS}, got {sink_kind!r}")
+    elif not stage_only:
+        if sink_kind == "supabase":
+            problems += [f"{name} is not set" for name in ("SUPABASE_URL", "SUPABASE_KEY")
+                         if not os.getenv(name)]
+            if not installed("supabase"):
+                problems.append("LOAD_SINK=supabase needs supabase (pip install supabase)")
+        elif sink_kind == "postgres":
+            if not os.getenv("POSTGRES_DSN"):
+                problems.append("LOAD_SINK=postgres needs POSTGRES_DSN")
+            if not installed("psycopg", "psycopg2"):
+                problems.append("LOAD_SINK=postgres needs psycopg (pip install psycopg)")
+        elif sink_kind == "duckdb" and not installed("duckdb"):
+            problems.append("LOAD_SINK=duckdb needs duckdb (pip install duckdb)")
+
+    load_mode = os.getenv("LOAD_MODE", "insert")
+    if load_mode not in LOAD_MODES:
+        problems.append(f"LOAD_MODE must be one of {LOAD_MODES}, got {load_mode!r}")
+
+    for name, kind in NUMERIC_SETTINGS.items():
+        value = os.getenv(name)
+        if value is None:
+            continue
+        try:
+            if kind(value) < 0:
+                problems.append(f"{name} must not be negative, got {value!r}")
+        except ValueError:
+            problems.append(f"{name} must be a{'n integer' if kind is int else ' number'}, got {value!r}")
+
+    for name in ("SERVE_INTERVAL", "SERVE_JITTER"):
+        if os.getenv(name):
+            try:
+                parse_interval(os.getenv(name))
+            except ValueError as e:
+                problems.append(f"{name}: {e}")
+    try:
+        parse_shard(os.getenv("CITY_SHARD", "0/1"))
+    except ValueError as e:
+        problems.append(f"CITY_SHARD: {e}")
+    if os.getenv("ETL_PROFILE"):
+        from Profiling import parse_stages
+        try:
+            parse_stages(os.getenv("ETL_PROFILE"))
+        except ValueError as e:
+            problems.append(f"ETL_PROFILE: {e}")
+
+    catalog = catalog or os.getenv("CITY_CATALOG")
+    if catalog and not os.path.isfile(catalog):
+        problems.append(f"City catalog {catalog} does not exist")
+    parquet_catalog = bool(catalog) and catalog.lower().endswith((".parquet", ".pq"))
+    if (os.getenv("LAKE_DIR") or parquet_catalog) and not installed("pyarrow"):
+        problems.append("LAKE_DIR and Parquet catalogs need pyarrow (pip install pyarrow)")
+
+    return problems
+
+
+def _run_shard(shard, options):
+    """Worker process entry point: runs one shard with its own sessions and loader."""
+    return run_etl(shard=shard, **options)
+
+
+def run_sharded(shard_count, processes=None, **options):
+    """
+    Runs every shard of the cities, one worker process per shard.
+
+    Each process builds its own HTTP session, rate limiter (with its share
+    of the quota) and loader, so nothing is shared between them. To spread
+    shards over several machines instead, start `runETL.py --shard I/N` on
+    each.
+
+    Args:
+        shard_count (int): Number of shards.
+        processes (int): Shards run at the same time (default: all).
+        **options: Passed on to run_etl (e.g. catalog, stage_only).
+
+    Returns:
+        dict: The shards' results combined.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from Pipeline import merge_run_results, empty_load_result
+
+    shards = [(index, shard_count) for index in range(shard_count)]
+    processes = max(1, min(processes or shard_count, shard_count))
+    total = empty_load_result()
+    if processes == 1:
+        for shard in shards:
+            merge_run_results(total, _run_shard(shard, options))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for result in executor.map(_run_shard, shards, [options] * shard_count):
+                merge_run_results(total, result)
+    print(f"All {shard_count} shards done. Status: {total['status']}, "
+          f"Loaded: {total['loaded']}, Failed: {total['failed']}")
+    return total
+
 
 if __name__ == "__main__":
-    run_etl()
+    parser = argparse.ArgumentParser(description="Run the weather ETL.")
+    parser.add_argument("--replay", action="store_true",
+                        help="Only load rows waiting in the staging area.")
+    parser.add_argument("--stage-only", action="store_true",
+                        help="Extract and stage rows without loading them.")
+    parser.add_argument("--reprocess", action="store_true",
+                        help="Rebuild rows from the raw response archive instead of calling the API.")
+    parser.add_argument("--since", help="With --reprocess, first day to include (YYYY-MM-DD, UTC).")
+    parser.add_argument("--until", help="With --reprocess, first day to leave out (YYYY-MM-DD, UTC).")
+    parser.add_argument("--catalog", help="CSV or Parquet file listing the cities to fetch.")
+    parser.add_argument("--shard", type=parse_shard, metavar="INDEX/COUNT",
+                        help="Only run one shard of the cities, e.g. 2/8 (one per machine).")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("ETL_SHARDS", "1")),
+                        help="Split the cities into this many shards, one worker process each.")
+    parser.add_argument("--processes", type=int, help="With --shards, how many run at once.")
+    parser.add_argument("--profile", default=os.getenv("ETL_PROFILE"), metavar="STAGES",
+                        help="Profile CPU and memory of these stages: all, or any of "
+                             "extract,transform,load (files go to PROFILE_DIR).")
+    parser.add_argument("--check-config", action="store_true",
+                        help="Only check the settings (fast: no API calls, no heavy imports).")
+    parser.add_argument("--serve", action="store_true",
+                        help="Keep running and start a run every --interval, reusing warm clients.")
+    parser.add_argument("--interval", type=parse_interval, default=os.getenv("SERVE_INTERVAL", "10m"),
+                        help="With --serve, time between runs, e.g. 90s, 10m or 1h.")
+    parser.add_argument("--jitter", type=parse_interval, default=os.getenv("SERVE_JITTER", "0"),
+                        help="With --serve, random extra delay of up to this long before each run.")
+    args = parser.parse_args()
+    lock_path = os.getenv("RUN_LOCK_PATH", DEFAULT_LOCK_PATH)
+
+    def unix_day(day):
+        if not day:
+            return None
+        midnight = datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time(),
+                                             tzinfo=datetime.timezone.utc)
+        return int(midnight.timestamp())
+
+    options = dict(replay_only=args.replay, stage_only=args.stage_only, reprocess=args.reprocess,
+                   since=unix_day(args.since), until=unix_day(args.until), catalog=args.catalog,
+                   profile=args.profile)
+    if args.check_config:
+        problems = check_config(catalog=args.catalog, replay_only=args.replay,
+                                stage_only=args.stage_only, reprocess=args.reprocess)
+        for problem in problems:
+            print(f"  - {problem}")
+        print(f"Configuration has {len(problems)} problem(s)." if problems else "Configuration OK.")
+        sys.exit(1 if problems else 0)
+
+    if args.serve:
+        # One warm context for the daemon's lifetime; closed once on shutdown
+        context = WarmContext()
+        print(f"Serving: one run every {args.interval:.0f}s (jitter up to {args.jitter:.0f}s). "
+              f"Press Ctrl+C to stop.")
+        try:
+            serve(lambda: run_etl(shard=args.shard, context=context, **options),
+                  args.interval, jitter=args.jitter, lock_path=lock_path)
+        finally:
+            context.close()
+        sys.exit(0)
+
+    with RunLock(lock_path) as acquired:
+        if not acquired:
+            sys.exit(f"Another ETL run holds {lock_path}; not starting a second one.")
+        # Reprocessing already fans out over processes, so it is never sharded
+        if args.shards > 1 and args.shard is None and not args.reprocess:
+            run_sharded(args.shards, processes=args.processes, **options)
+        else:
+            run_etl(shard=args.shard, **options)
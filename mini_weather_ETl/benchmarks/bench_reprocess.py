@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rebuilding history from the raw response archive.
+
+Archives `observations` pretend group answers (20 cities each, as a live
+run fetches them), then reprocesses the whole archive into an in-memory
+SQLite sink, first in this process and then with one worker per CPU.
+
+Usage:
+    python benchmarks/bench_reprocess.py [observations]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ETL'))
+
+from Archive import RawArchive
+from Reprocess import reprocess_archive
+from Sinks import SQLiteSink
+
+
+def fill_archive(archive, observations):
+    """Archives group answers covering `observations` city readings."""
+    for start in range(0, observations, 20):
+        items = [{
+            "id": 1_000_000 + (i % 2_000), "dt": 1_700_000_000 + (i // 2_000) * 600,
+            "name": f"City{i % 2_000}", "sys": {"country": "CA", "sunrise": 1, "sunset": 2},
+            "coord": {"lon": -79.4, "lat": 43.7},
+            "main": {"temp": (i % 40) - 10.5, "feels_like": (i % 40) - 12.0, "humidity": i % 100},
+            "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+            "wind": {"speed": (i % 14) * 1.1, "deg": 200}, "clouds": {"all": 0},
+            "rain": {"1h": 0.4} if i % 7 == 0 else None, "visibility": 10000,
+        } for i in range(start, min(start + 20, observations))]
+        body = {"cnt": len(items), "list": items}
+        archive.put(json.dumps(body).encode(), body)
+
+
+def run(archive, workers):
+    with SQLiteSink(":memory:", "Weather_data", mode="upsert") as sink:
+        start = time.perf_counter()
+        result = reprocess_archive(archive, lambda df: sink.load(df), max_workers=workers)
+        elapsed = time.perf_counter() - start
+    print(f"{workers} worker(s): {result['loaded']:,} rows in {elapsed:.2f}s "
+          f"({result['loaded'] / elapsed:,.0f} rows/sec)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    observations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = RawArchive(tmp_dir)
+        start = time.perf_counter()
+        fill_archive(archive, observations)
+        print(f"Archived {observations:,} observations in {time.perf_counter() - start:.2f}s "
+              f"[{archive.codec}]\n")
+
+        single = run(archive, 1)
+        cpus = os.cpu_count() or 1
+        if cpus > 1:
+            parallel = run(archive, cpus)
+            print(f"\nSpeed-up with {cpus} processes: {single / parallel:.1f}x")
+        else:
+            print("\nOnly one CPU available: skipping the multi-process run")
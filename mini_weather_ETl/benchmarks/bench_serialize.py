@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: turning a transformed DataFrame into insert records.
+
+Compares the old per-cell loop (_prepare_records_rowwise) with the
+column-wise serialize_records, and times JSON encoding of the result.
+
+Usage:
+    python benchmarks/bench_serialize.py [rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ETL'))
+
+from Load import _prepare_records_rowwise, serialize_records, encode_records, orjson
+
+
+def make_frame(rows):
+    """A transformed-looking frame with text, numbers, nulls and timestamps."""
+    rng = np.random.default_rng(42)
+    temperature = rng.normal(10, 8, rows).round(1)
+    temperature[::50] = np.nan
+    return pd.DataFrame({
+        "city_name": [f"City{i}" for i in range(rows)],
+        "country_code": "CA",
+        "city_id": rng.integers(1, 10_000_000, rows),
+        "temperature": temperature,
+        "feels_like": rng.normal(8, 8, rows).round(1),
+        "humidity_label": rng.choice(["Dry", "Comfortable", "Humid"], rows),
+        "precip_type": rng.choice(["None", "Rain", "Snow", "Mixed"], rows),
+        "precip_chance": rng.choice(["Low", "Medium", "High"], rows),
+        "wind_label": rng.choice(["Calm", "Light breeze", "Windy", "Strong"], rows),
+        "snapshot": "City (CA): 10.0°C (feels 8.0°C), Clear Sky. No precipitation expected.",
+        "data_timestamp": pd.to_datetime(1_700_000_000 + np.arange(rows), unit="s", utc=True),
+    })
+
+
+def timed(label, rows, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.3f}s  {rows / elapsed:>12,.0f} rows/sec")
+    return result, elapsed
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_frame(rows)
+    print(f"Serializing {rows:,} rows\n")
+
+    _, before = timed("per-cell loop (before)", rows, _prepare_records_rowwise, df)
+    records, after = timed("column-wise serialize_records", rows, serialize_records, df)
+    print(f"\nSpeed-up: {before / after:.1f}x")
+
+    encoder = "orjson" if orjson is not None else "json (install orjson for faster encoding)"
+    timed(f"encode_records [{encoder}]", rows, encode_records, records)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading a transformed DataFrame into the local sinks.
+
+Compares one INSERT + commit per row (the shape of row-at-a-time loading)
+with the bulk sinks from Sinks.py. SQLite always runs; DuckDB runs when
+duckdb is installed and Postgres COPY when POSTGRES_DSN is set and psycopg
+(or psycopg2) is installed. Everything runs offline.
+
+Usage:
+    python benchmarks/bench_sinks.py [rows]
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ETL'))
+
+from bench_serialize import make_frame, timed
+from Load import serialize_columns
+from Sinks import SQLiteSink, DuckDBSink, PostgresCopySink
+
+
+def row_at_a_time(path, df):
+    """One INSERT and one commit per row, like one request per row."""
+    sink = SQLiteSink(path, "weather_rows")
+    columns = serialize_columns(df)
+    names = list(columns)
+    placeholders = ", ".join("?" for _ in names)
+    with sink.connection:
+        sink.connection.execute(sink.create_table_sql(df))
+    sql = sink.insert_sql(names, f"VALUES ({placeholders})")
+    for row in zip(*columns.values()):
+        with sink.connection:
+            sink.connection.execute(sql, row)
+    sink.close()
+
+
+def bulk_load(sink, df):
+    with sink:
+        result = sink.load(df)
+    assert result["status"] == "success", result
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_frame(rows)
+    # Row-at-a-time is slow enough that a slice gives a stable rows/sec figure
+    slow_rows = min(rows, 5_000)
+    print(f"Loading {rows:,} rows ({slow_rows:,} for the row-at-a-time baseline)\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, before = timed("SQLite, one commit per row", slow_rows,
+                          row_at_a_time, os.path.join(tmp_dir, "rows.db"), df.iloc[:slow_rows])
+        before_rate = slow_rows / before
+
+        path = os.path.join(tmp_dir, "bulk.db")
+        _, after = timed("SQLiteSink insert (bulk)", rows, bulk_load,
+                         SQLiteSink(path, "Weather_data"), df)
+        timed("SQLiteSink upsert (new keys)", rows, bulk_load,
+              SQLiteSink(os.path.join(tmp_dir, "upsert.db"), "Weather_data", mode="upsert",
+                         conflict_key=("city_id", "data_timestamp")), df)
+        print(f"\nSQLite bulk speed-up: {(rows / after) / before_rate:.1f}x")
+
+        # Quick sanity check that the bulk path stored every row
+        with sqlite3.connect(path) as connection:
+            stored = connection.execute('SELECT COUNT(*) FROM "Weather_data"').fetchone()[0]
+        print(f"SQLite bulk table holds {stored:,} rows\n")
+
+        try:
+            timed("DuckDBSink insert (native append)", rows, bulk_load,
+                  DuckDBSink(os.path.join(tmp_dir, "bulk.duckdb"), "Weather_data"), df)
+        except ImportError as e:
+            print(f"DuckDB skipped: {e}")
+
+    dsn = os.getenv("POSTGRES_DSN")
+    if not dsn:
+        print("Postgres COPY skipped: set POSTGRES_DSN to a scratch database")
+    else:
+        try:
+            timed("PostgresCopySink insert (COPY)", rows, bulk_load,
+                  PostgresCopySink(dsn, "weather_bench"), df)
+        except ImportError as e:
+            print(f"Postgres COPY skipped: {e}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: how long the CLI takes to start.
+
+Uses `python -X importtime` in fresh interpreters to compare importing
+runETL (what --help, --check-config and every cron start pay) with
+importing every pipeline stage (what a real run pays once it begins), and
+lists the heaviest imports of each. Also times `runETL.py --check-config`
+end to end. Everything runs offline.
+
+Usage:
+    python benchmarks/bench_startup.py [repeats]
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+ETL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ETL')
+
+# Every stage run_etl imports once a run starts
+STAGE_MODULES = ("Extract", "Pipeline", "Sinks", "Load", "CityRegistry", "Cache", "RateLimit",
+                 "Latency", "Staging", "Lake", "Archive", "Reprocess")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_times(statement):
+    """
+    Runs `statement` in a fresh interpreter under -X importtime.
+
+    Returns:
+        dict: top-level module -> cumulative import time in microseconds.
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ETL_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    times = {}
+    for match in _LINE.finditer(output):
+        _, cumulative, indent, module = match.groups()
+        if len(indent) == 1:  # Imported directly by the statement, not by another module
+            times[module] = int(cumulative)
+    return times
+
+
+def report(label, modules, repeats):
+    """Prints and returns the best-of-`repeats` time to import `modules` (seconds)."""
+    statement = "import " + ", ".join(modules)
+    # Interpreter start-up (site, encodings) is the same for every row, so only
+    # the requested modules are counted; each module's time includes what it imports
+    totals = []
+    for _ in range(repeats):
+        times = import_times(statement)
+        totals.append((sum(times.get(m, 0) for m in modules) / 1e6, times))
+    total, times = min(totals, key=lambda item: item[0])
+    print(f"{label:<48} {total:7.3f} s")
+    heaviest = sorted(((times.get(m, 0), m) for m in modules), reverse=True)[:3]
+    for micros, module in heaviest:
+        if micros and len(modules) > 1:
+            print(f"    {module:<44} {micros / 1e6:7.3f} s")
+    return total
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    cli = report("import runETL (CLI start)", ["runETL"], repeats)
+    stages = report("import every pipeline stage (run start)", list(STAGE_MODULES), repeats)
+    supabase = report("import supabase (only for LOAD_SINK=supabase)", ["supabase"], repeats)
+    print(f"\nEager imports would add {stages + supabase:.3f} s to every CLI start; "
+          f"the lazy CLI is {(stages + supabase) / max(cli, 1e-6):.0f}x faster to import")
+
+    wall = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "runETL.py", "--check-config"], cwd=ETL_DIR,
+                       capture_output=True, text=True)
+        wall.append(time.perf_counter() - start)
+    print(f"runETL.py --check-config, end to end: {min(wall):.3f} s (best of {repeats})")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+These are our raw archive tests!
+The archive is like a scrapbook: we glue in every weather answer exactly as
+it arrived, and write in the index which page it's on so we can find it fast.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Archive import RawArchive
+
+
+def make_payload(city_id, dt=1700000000, name="Toronto"):
+    """A pretend single-city weather answer."""
+    return {"id": city_id, "dt": dt, "name": name, "sys": {"country": "CA"},
+            "main": {"temp": 3.5, "humidity": 50}, "weather": [{"description": "clear sky"}]}
+
+
+class TestRawArchive(unittest.TestCase):
+    """Our scrapbook playground!"""
+
+    def setUp(self):
+        """Give every test its own empty scrapbook."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive = RawArchive(self.tmp_dir.name, codec="gzip")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_body_is_kept_byte_for_byte(self):
+        """What we read back is exactly what the website sent, spaces and all."""
+        payload = make_payload(1)
+        content = json.dumps(payload, indent=3).encode()
+        self.archive.put(content, payload)
+
+        self.assertEqual(self.archive.get_bytes(1, 1700000000), content)
+        self.assertEqual(self.archive.get(1, 1700000000), payload)
+        self.assertIsNone(self.archive.get(1, 42))
+
+    def test_group_answer_is_stored_once_and_found_per_city(self):
+        """A group answer is glued in once, but every city in it gets its own index line."""
+        group = {"cnt": 2, "list": [make_payload(1), make_payload(2, name="Ottawa")]}
+        indexed = self.archive.put(json.dumps(group).encode(), group)
+
+        self.assertEqual(indexed, 2)
+        self.assertEqual(self.archive.get(2, 1700000000)["name"], "Ottawa")
+        entries = self.archive.entries()
+        self.assertEqual(entries[0]["offset"], entries[1]["offset"])  # Same page
+
+    def test_new_scrapbook_reads_old_pages(self):
+        """Another run (a fresh archive object) finds what earlier runs wrote, across segments."""
+        small = RawArchive(self.tmp_dir.name, segment_bytes=1, codec="gzip")
+        for city_id in (1, 2, 3):
+            payload = make_payload(city_id)
+            small.put(json.dumps(payload).encode(), payload)
+
+        reopened = RawArchive(self.tmp_dir.name)
+        self.assertEqual(len({e["segment"] for e in reopened.entries()}), 3)
+        self.assertEqual(reopened.get(3, 1700000000)["id"], 3)
+
+    def test_extractor_archives_what_it_fetches(self):
+        """The extractor glues in the answer it downloaded, not a re-written copy."""
+        from ETL.Extract import WeatherExtractor
+
+        payload = make_payload(6167865)
+        response = MagicMock(status_code=200, headers={}, content=json.dumps(payload).encode())
+        response.json.return_value = payload
+
+        with WeatherExtractor("test_api_key", archive=self.archive) as extractor:
+            with patch.object(extractor.session, 'get', return_value=response):
+                record = extractor.fetch_record("Toronto,CA")
+
+        self.assertNotIn("raw_api_response", record)
+        self.assertEqual(self.archive.get_bytes(6167865, 1700000000), response.content)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+These are our city catalog tests!
+The catalog is a big list of cities in a file. When the list is huge, we
+cut it into slices (shards) so several helpers can each take one slice.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+import pandas as pd
+
+from ETL.Catalog import load_catalog, shard_of, shard_cities, parse_shard, shard_path
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+
+class TestLoadCatalog(unittest.TestCase):
+    """Reading the city list from a file!"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_city_and_country_columns(self):
+        """City and country are glued together, blanks and repeats are skipped."""
+        path = self.write("cities.csv", "City,Country_Code\nToronto,CA\nLyon,fr\n,\nToronto,CA\nWindhoek,NA\n")
+        self.assertEqual(load_catalog(path), ["Toronto,CA", "Lyon,FR", "Windhoek,NA"])
+
+    def test_query_column(self):
+        """A ready-made query column is used as it is."""
+        path = self.write("cities.csv", "query,country\nToronto,CA\n")
+        self.assertEqual(load_catalog(path), ["Toronto"])
+
+    def test_missing_city_column(self):
+        """A file without any city column is a clear error."""
+        path = self.write("cities.csv", "population\n100\n")
+        with self.assertRaises(ValueError):
+            load_catalog(path)
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_parquet(self):
+        """Parquet catalogs work too."""
+        path = os.path.join(self.tmp_dir.name, "cities.parquet")
+        pd.DataFrame({"city": ["Oslo", "Bergen"], "country_code": ["NO", "NO"]}).to_parquet(path)
+        self.assertEqual(load_catalog(path), ["Oslo,NO", "Bergen,NO"])
+
+
+class TestSharding(unittest.TestCase):
+    """Cutting the list into fair slices!"""
+
+    def setUp(self):
+        self.cities = [f"Town{i},CA" for i in range(1000)]
+
+    def test_shards_cover_everything_once(self):
+        """Every city is in exactly one slice."""
+        shards = [shard_cities(self.cities, i, 4) for i in range(4)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(self.cities))
+        # crc32 spreads them roughly evenly
+        for shard in shards:
+            self.assertGreater(len(shard), 150)
+
+    def test_shard_is_stable(self):
+        """A city's slice doesn't change between runs or when the list grows."""
+        self.assertEqual(shard_of("Toronto,CA", 8), 4111841252 % 8)  # zlib.crc32(b"Toronto,CA")
+        grown = shard_cities(self.cities + ["Extra,CA"], 1, 4)
+        self.assertEqual([c for c in grown if c != "Extra,CA"], shard_cities(self.cities, 1, 4))
+
+    def test_parse_shard(self):
+        """'2/8' means slice 2 of 8, and nonsense is refused."""
+        self.assertEqual(parse_shard("2/8"), (2, 8))
+        for bad in ("8/8", "-1/4", "two/8", "3"):
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_shard_path(self):
+        """Each slice gets its own state file, and unsharded runs keep the old name."""
+        self.assertEqual(shard_path("data/city_registry.json", 2, 8), "data/city_registry.shard-2-of-8.json")
+        self.assertEqual(shard_path("staging/", 0, 2), "staging.shard-0-of-2")
+        self.assertEqual(shard_path("city_registry.json", 0, 1), "city_registry.json")
+        self.assertIsNone(shard_path(None, 1, 2))
+
+
+class TestRunSharded(unittest.TestCase):
+    """Every slice gets its own run, and the results add up!"""
+
+    def test_results_are_combined(self):
+        """Running all shards adds their loaded rows together."""
+        import ETL.runETL as runETL
+
+        seen = []
+
+        def fake_run_etl(shard=None, **options):
+            seen.append(shard)
+            return {"status": "success", "loaded": 10 + shard[0], "failed": 0, "duplicates": 0, "chunks": 1}
+
+        with patch.object(runETL, "run_etl", side_effect=fake_run_etl):
+            total = runETL.run_sharded(3, processes=1, catalog="cities.csv")
+
+        self.assertEqual(seen, [(0, 3), (1, 3), (2, 3)])
+        self.assertEqual(total["loaded"], 33)
+        self.assertEqual(total["chunks"], 3)
+        self.assertEqual(total["status"], "success")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+These are our city registry tests!
+The registry is like an address book: once we learn where a city lives,
+we write it down so we never have to ask for directions again.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.CityRegistry import CityRegistry
+
+
+def make_record(city_id, name, lat, lon):
+    """Build a pretend extracted weather record for a city."""
+    return {
+        "city_id": city_id, "city_name": name, "country_code": "CA",
+        "latitude": lat, "longitude": lon,
+    }
+
+
+class TestCityRegistry(unittest.TestCase):
+    """Our address book playground!"""
+
+    def setUp(self):
+        """Give every test its own empty address book file."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "registry.json")
+        self.extractor = MagicMock()
+        self.extractor.extract_records.side_effect = lambda cities, max_workers=8: [
+            make_record(6167865, "Toronto", 43.65, -79.38) if city == "Toronto,CA" else None
+            for city in cities
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resolve_saves_ids_and_coordinates(self):
+        """Resolved cities are written down and remembered by a brand new registry."""
+        registry = CityRegistry(self.path)
+        records = registry.resolve(["Toronto,CA"], self.extractor)
+
+        self.assertIn("Toronto,CA", records)  # The lookup is handed back for reuse
+
+        reloaded = CityRegistry(self.path)
+        self.assertEqual(reloaded.get("Toronto,CA")["city_id"], 6167865)
+        self.assertEqual(reloaded.coordinates("Toronto,CA"), (43.65, -79.38))
+
+    def test_resolve_only_looks_up_new_cities(self):
+        """Once a city is known, we don't ask the API about it again."""
+        registry = CityRegistry(self.path)
+        registry.resolve(["Toronto,CA"], self.extractor)
+        registry.resolve(["Toronto,CA"], self.extractor)
+
+        self.assertEqual(self.extractor.extract_records.call_count, 1)
+        ids, missing = registry.city_ids(["Toronto,CA"])
+        self.assertEqual(ids, {6167865: ["Toronto,CA"]})
+        self.assertEqual(missing, [])
+
+    def test_two_names_for_one_city(self):
+        """Two spellings of the same city both keep getting their weather on later runs."""
+        from ETL.runETL import fetch_city_records
+
+        self.extractor.extract_records.side_effect = lambda cities, max_workers=8: [
+            make_record(6077243, "Montreal", 45.5, -73.59) for _ in cities
+        ]
+        self.extractor.extract_bulk_records.side_effect = lambda ids, queries=None, max_workers=4: [
+            dict(make_record(city_id, "Montreal", 45.5, -73.59), query_city=queries[city_id])
+            for city_id in ids
+        ]
+        registry = CityRegistry(self.path)
+        cities = ["Montreal,CA", "Montréal,CA"]
+        registry.resolve(cities, self.extractor)
+
+        self.assertEqual(registry.city_ids(cities)[0], {6077243: cities})
+        records = fetch_city_records(cities, self.extractor, registry)
+
+        self.assertEqual([r["query_city"] for r in records], cities)
+        self.assertEqual(self.extractor.extract_bulk_records.call_args.args[0], [6077243])  # Asked once
+        self.assertEqual(registry.unresolved(cities), {})
+
+    def test_unresolved_report(self):
+        """Cities the API couldn't find show up in the unresolved report."""
+        registry = CityRegistry(self.path)
+        registry.resolve(["Toronto,CA", "Atlantis,CA"], self.extractor)
+
+        report = registry.unresolved(["Toronto,CA", "Atlantis,CA", "Gotham,CA"])
+        self.assertEqual(set(report), {"Atlantis,CA", "Gotham,CA"})
+        self.assertEqual(report["Gotham,CA"], "not resolved yet")
+
+    def test_invalidate_forgets_cities(self):
+        """Invalidating a city means it gets looked up again next time."""
+        registry = CityRegistry(self.path)
+        registry.resolve(["Toronto,CA"], self.extractor)
+        registry.invalidate(["Toronto,CA"])
+
+        self.assertIsNone(CityRegistry(self.path).get("Toronto,CA"))
+        registry.resolve(["Toronto,CA"], self.extractor)
+        self.assertEqual(self.extractor.extract_records.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -185,7 +185,7 @@ class TestExtractFunction(unittest.TestCase):
             'weather_main', 'weather_description', 'weather_icon', 'weather_id',
             'wind_speed', 'wind_direction', 'wind_gust',
             'cloudiness', 'rain_1h', 'rain_3h', 'snow_1h', 'snow_3h', 'visibility',
-            'sunrise', 'sunset', 'data_timestamp', 'extraction_timestamp', 'raw_api_response'
+            'sunrise', 'sunset', 'data_timestamp', 'extraction_timestamp'
         ]
         
         # Let's pretend to get weather info so we can check the table structure
@@ -206,6 +206,165 @@ class TestExtractFunction(unittest.TestCase):
             self.assertFalse(result.empty)  # Make sure the table has something in it
             for column in expected_columns:  # Check each column one by one
                 self.assertIn(column, result.columns)  # Make sure each column is there!
+            # The raw answer is archived separately, not carried in every row
+            self.assertNotIn('raw_api_response', result.columns)
+
+    def test_extract_many_keeps_city_order(self):
+        """
+        This test checks that asking about lots of cities at once still
+        gives the answers back in the same order we asked!
+        Like a teacher handing back homework in alphabetical order,
+        even if some kids finished faster than others.
+        """
+        from ETL.Extract import extract_many
+        import time
+
+        cities = ["Toronto,CA", "Montreal,CA", "Vancouver,CA", "Calgary,CA", "Halifax,CA"]
+
+        def pretend_get(url, params=None, **kwargs):
+            # The first cities answer the slowest, so they finish last
+            time.sleep(0.01 * (len(cities) - cities.index(params["q"])))
+            data = dict(self.mock_response_data, name=params["q"].split(",")[0])
+            mock_response = MagicMock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.json.return_value = data
+            return mock_response
+
+        with patch('ETL.Extract.requests.get', side_effect=pretend_get):
+            results = extract_many(self.api_key, cities, max_workers=4)
+
+        # One table per city, in the order we asked
+        self.assertEqual(len(results), len(cities))
+        self.assertEqual([df.iloc[0]['query_city'] for df in results], cities)
+
+    def make_response(self, status_code=200, data=None):
+        """Builds a pretend HTTP answer with the given status code."""
+        import requests
+        mock_response = MagicMock()
+        mock_response.status_code = status_code
+        mock_response.headers = {}
+        mock_response.json.return_value = data if data is not None else self.mock_response_data
+        if status_code >= 400:
+            mock_response.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error")
+        else:
+            mock_response.raise_for_status.return_value = None
+        return mock_response
+
+    @patch('ETL.Extract.time.sleep')
+    def test_extractor_retries_server_errors(self, mock_sleep):
+        """
+        This test checks that our reusable extractor tries again when the
+        weather website has a hiccup (like a 503), instead of giving up!
+        Like knocking on a friend's door again if they didn't hear you.
+        """
+        from ETL.Extract import WeatherExtractor
+
+        with WeatherExtractor(self.api_key, max_retries=2) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=[
+                self.make_response(503), self.make_response(502), self.make_response(200),
+            ]) as mock_get:
+                result = extractor.extract(self.city)
+
+        self.assertEqual(mock_get.call_count, 3)  # Two hiccups, then success
+        self.assertEqual(mock_sleep.call_count, 2)  # We waited before each retry
+        self.assertEqual(result.iloc[0]['city_name'], 'Toronto')
+
+    @patch('ETL.Extract.time.sleep')
+    def test_extractor_gives_up_after_max_retries(self, mock_sleep):
+        """When every try fails, we get an empty table (and stop knocking!)."""
+        from ETL.Extract import WeatherExtractor
+
+        with WeatherExtractor(self.api_key, max_retries=1) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=[
+                self.make_response(500), self.make_response(500),
+            ]) as mock_get:
+                result = extractor.extract(self.city)
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertTrue(result.empty)
+
+    def test_extractor_does_not_retry_client_errors(self):
+        """A 404 means the city doesn't exist, so trying again won't help."""
+        from ETL.Extract import WeatherExtractor
+
+        with WeatherExtractor(self.api_key, max_retries=3) as extractor:
+            with patch.object(extractor.session, 'get', return_value=self.make_response(404)) as mock_get:
+                result = extractor.extract("Atlantis,CA")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(result.empty)
+
+    def test_extract_bulk_uses_group_requests(self):
+        """
+        This test checks that asking about 25 cities by ID only needs
+        2 group requests (20 + 5), and gives back the same columns as extract!
+        Like carrying groceries in two big bags instead of 25 trips.
+        """
+        from ETL.Extract import WeatherExtractor, GROUP_MAX_IDS
+
+        city_ids = list(range(1, 26))
+
+        def pretend_get(url, params=None, **kwargs):
+            ids = [int(i) for i in params["id"].split(",")]
+            self.assertLessEqual(len(ids), GROUP_MAX_IDS)  # Never more than the API allows
+            items = [dict(self.mock_response_data, id=i, name=f"City{i}") for i in ids]
+            return self.make_response(200, {"cnt": len(items), "list": items})
+
+        with WeatherExtractor(self.api_key) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=pretend_get) as mock_get:
+                result = extractor.extract_bulk(city_ids, queries={1: "Toronto,CA"})
+
+            with patch.object(extractor.session, 'get', return_value=self.make_response(200)):
+                single = extractor.extract(self.city)
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(result['city_id'].tolist(), city_ids)  # Same order we asked in
+        self.assertEqual(result.iloc[0]['query_city'], "Toronto,CA")
+        self.assertEqual(result.iloc[1]['query_city'], "2")  # No query given, so we use the ID
+        self.assertEqual(list(result.columns), list(single.columns))
+
+    def test_group_request_with_text_ids(self):
+        """
+        This test checks that city IDs written as text (like "6167865" from a
+        settings file) still find their city, instead of quietly going missing.
+        """
+        from ETL.Extract import WeatherExtractor
+
+        items = [dict(self.mock_response_data, id=i, name=f"City{i}") for i in (1, 2)]
+        with WeatherExtractor(self.api_key) as extractor:
+            with patch.object(extractor.session, 'get',
+                              return_value=self.make_response(200, {"cnt": 2, "list": items})):
+                records = extractor.fetch_group_records(["1", "2"], queries={"1": "Toronto,CA"})
+
+        self.assertEqual([r["city_id"] for r in records], [1, 2])
+        self.assertEqual([r["query_city"] for r in records], ["Toronto,CA", "2"])
+
+    def test_extract_frame_builds_one_table(self):
+        """
+        This test checks that fetching a whole batch of cities gives us ONE
+        table with a row per city, with proper timestamps, instead of lots of
+        tiny tables. Like one big photo album instead of a pile of loose photos!
+        """
+        from ETL.Extract import WeatherExtractor
+
+        cities = ["Toronto,CA", "Atlantis,CA", "Halifax,CA"]
+
+        def pretend_get(url, params=None, **kwargs):
+            if params["q"] == "Atlantis,CA":
+                return self.make_response(404)  # This city doesn't exist
+            return self.make_response(200, dict(self.mock_response_data, name=params["q"].split(",")[0]))
+
+        with WeatherExtractor(self.api_key) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=pretend_get):
+                records = extractor.extract_records(cities, max_workers=3)
+                frame = extractor.extract_frame(cities, max_workers=3)
+
+        self.assertIsNone(records[1])  # The missing city keeps its place as None
+        self.assertIsInstance(records[0], dict)
+        self.assertEqual(frame['query_city'].tolist(), ["Toronto,CA", "Halifax,CA"])
+        self.assertIsInstance(frame.iloc[0]['data_timestamp'], pd.Timestamp)
+        self.assertEqual(frame.iloc[0]['data_timestamp'], pd.Timestamp(1696867200, unit='s', tz='UTC'))
+        self.assertIsInstance(frame.iloc[1]['extraction_timestamp'], pd.Timestamp)
 
 if __name__ == '__main__':
     # Time to start all our tests! Like pressing the "start" button on your favorite game!
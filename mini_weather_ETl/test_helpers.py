@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+These are our shared test helpers!
+Like a box of spare LEGO bricks that every playground borrows from:
+pretend weather rows, pretend website answers and a pretend clock.
+"""
+
+from unittest.mock import MagicMock
+import pandas as pd
+
+
+def make_base_row(**overrides):
+    """
+    Build a single weather record with sensible defaults that we can override.
+    Like a base LEGO structure we can tweak with different bricks.
+    """
+    row = {
+        "city_name": "TestCity",
+        "country_code": "TC",
+        "temperature": 12.345,
+        "feels_like": 11.678,
+        "humidity": 50,
+        "weather_description": "clear sky",
+        "rain_1h": 0,
+        "rain_3h": 0,
+        "snow_1h": 0,
+        "snow_3h": 0,
+        "wind_speed": 1.5,
+        "wind_direction": 0,
+        "cloudiness": 0,
+        "visibility": 10000,
+    }
+    row.update(overrides)
+    return row
+
+
+def make_snapshot_frame(cities, **columns):
+    """
+    Build a pretend transformed table, one row per city.
+
+    `cities` is how many cities to make (City0, City1, ...) or a list of
+    their names; any keyword replaces that whole column.
+    """
+    names = [f"City{i}" for i in range(cities)] if isinstance(cities, int) else list(cities)
+    df = pd.DataFrame({
+        "city_name": names,
+        "country_code": "CA",
+        "temperature": [float(i) for i in range(len(names))],
+        "feels_like": 1.5,
+        "humidity_label": "Comfortable",
+        "precip_type": "None",
+        "precip_chance": "Low",
+        "wind_label": "Calm",
+        "snapshot": "A nice day.",
+    })
+    for name, value in columns.items():
+        df[name] = value
+    return df
+
+
+def make_observations(city_ids, temperature=1.0, wind_label=None, **columns):
+    """A pretend transformed table where every row also knows its city ID and observation time."""
+    df = make_snapshot_frame([f"City{i}" for i in city_ids])
+    df.insert(0, "city_id", list(city_ids))
+    df.insert(1, "data_timestamp", pd.to_datetime(1696867200, unit="s", utc=True))
+    for name, value in dict(columns, temperature=temperature, wind_label=wind_label).items():
+        df[name] = value
+    return df
+
+
+def weather_response(name="Toronto", status=200):
+    """A pretend answer from the weather website."""
+    response = MagicMock(status_code=status, headers={}, content=b'{"id": 1}')
+    response.json.return_value = {"id": 1, "name": name, "sys": {"country": "CA"}}
+    return response
+
+
+class FakeClock:
+    """A pretend clock we can move forward by hand; sleeping just moves it forward."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+These are our Parquet lake tests!
+The lake is like a big cupboard of labelled drawers: every day and every
+country gets its own drawer, so finding old weather means opening one drawer.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import tempfile
+import pandas as pd
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Lake import ParquetLake, NULL_PARTITION
+from test_helpers import make_observations
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+
+def make_readings(temperature=1.0, wind_label=None):
+    """Three pretend readings: two countries on one day, and a mystery country the next."""
+    return make_observations([1, 2, 3], temperature, wind_label,
+                             city_name=["Toronto", "Boston", "Nowhere"], country_code=["CA", "US", None],
+                             data_timestamp=pd.to_datetime([1696867200, 1696867200, 1696967200],
+                                                           unit="s", utc=True))
+
+
+class TestParquetLake(unittest.TestCase):
+    """Our cupboard playground!"""
+
+    def setUp(self):
+        """Give every test its own empty cupboard."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lake = ParquetLake(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rows_are_sorted_into_drawers(self):
+        """Each day and country gets its own folder, and a missing country gets the 'unknown' drawer."""
+        parts = self.lake.partition_frames(make_readings())
+
+        self.assertEqual(sorted(parts), [
+            os.path.join("date=2023-10-09", "country_code=CA"),
+            os.path.join("date=2023-10-09", "country_code=US"),
+            os.path.join("date=2023-10-10", f"country_code={NULL_PARTITION}"),
+        ])
+        # The drawer label already says the country, so the rows don't repeat it
+        self.assertNotIn("country_code", parts[os.path.join("date=2023-10-09", "country_code=CA")].columns)
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_append_and_read_back_one_drawer(self):
+        """Reading with a filter only looks in the matching drawer."""
+        self.lake.append(make_readings())
+        self.lake.append(make_readings(temperature=5.0, wind_label="Calm"))
+
+        canada = self.lake.read(filters=[("country_code", "=", "CA")])
+        self.assertEqual(len(canada), 2)
+        self.assertEqual(set(canada["city_name"]), {"Toronto"})
+        self.assertEqual(set(self.lake.read()["date"]), {"2023-10-09", "2023-10-10"})
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_compaction_merges_small_files(self):
+        """Many little bags in a drawer become one, and repeated readings keep the newest."""
+        self.lake.append(make_readings())
+        self.lake.append(make_readings(temperature=5.0))
+        self.assertTrue(all(len(files) == 2 for files in self.lake.partitions().values()))
+
+        result = self.lake.compact()
+
+        self.assertEqual(result["partitions"], 3)
+        self.assertTrue(all(len(files) == 1 for files in self.lake.partitions().values()))
+        everything = self.lake.read()
+        self.assertEqual(len(everything), 3)
+        self.assertEqual(set(everything["temperature"]), {5.0})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+These are our latency tests!
+Sometimes the weather website is slow to answer. We can ask twice and take
+the first answer (hedging), and we can stop waiting when time is up (deadlines).
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import time
+from unittest.mock import patch, MagicMock
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Latency import Deadline, LatencyTracker
+from ETL.Extract import WeatherExtractor
+from test_helpers import weather_response
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """Our stopwatch playground!"""
+
+    def test_percentiles(self):
+        """The p95 of 1..100 is 95, and the slowest is 100."""
+        tracker = LatencyTracker()
+        for ms in range(100, 0, -1):
+            tracker.record(ms / 1000)
+        stats = tracker.stats()
+        self.assertEqual(stats["requests"], 100)
+        self.assertAlmostEqual(stats["p50"], 0.050)
+        self.assertAlmostEqual(stats["p95"], 0.095)
+        self.assertAlmostEqual(stats["max"], 0.100)
+
+    def test_empty(self):
+        """No requests means no percentiles yet."""
+        self.assertIsNone(LatencyTracker().percentile(95))
+        self.assertEqual(LatencyTracker().summary(), "no requests")
+
+    def test_deadline(self):
+        """A deadline counts down and the earliest one wins."""
+        now = [0.0]
+        clock = lambda: now[0]
+        soon, later = Deadline(5, clock=clock), Deadline(10, clock=clock)
+        self.assertIs(Deadline.earliest(later, None, soon), soon)
+        self.assertIsNone(Deadline.earliest(None))
+        now[0] = 6
+        self.assertTrue(soon.expired())
+        self.assertEqual(later.remaining(), 4)
+
+
+class TestHedging(unittest.TestCase):
+    """Asking twice when the first answer is slow!"""
+
+    def test_duplicate_wins_when_first_is_slow(self):
+        """A slow first answer gets a duplicate, and the quick duplicate wins."""
+        calls = []
+
+        def fake_get(url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.5)  # The first request is a straggler
+            return weather_response()
+
+        with WeatherExtractor("test_api_key", hedge=True, hedge_initial_delay=0.05) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=fake_get):
+                start = time.perf_counter()
+                record = extractor.fetch_record("Toronto,CA")
+                elapsed = time.perf_counter() - start
+
+        self.assertEqual(record["city_name"], "Toronto")
+        self.assertEqual(len(calls), 2)
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(extractor.latency.hedged, 1)
+        self.assertEqual(extractor.latency.hedge_wins, 1)
+
+    def test_fast_answers_are_not_hedged(self):
+        """Quick answers never get a duplicate."""
+        with WeatherExtractor("test_api_key", hedge=True, hedge_initial_delay=1.0) as extractor:
+            with patch.object(extractor.session, 'get', return_value=weather_response()) as mock_get:
+                extractor.fetch_record("Toronto,CA")
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(extractor.latency.hedged, 0)
+
+    def test_no_duplicate_without_spare_quota(self):
+        """If the ticket jar is empty, we just wait for the first answer."""
+        bucket = MagicMock()
+        bucket.try_acquire.return_value = False
+
+        def slow_get(url, **kwargs):
+            time.sleep(0.1)
+            return weather_response()
+
+        with WeatherExtractor("test_api_key", hedge=True, hedge_initial_delay=0.01,
+                              rate_limiter=bucket) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=slow_get) as mock_get:
+                record = extractor.fetch_record("Toronto,CA")
+        self.assertEqual(record["city_name"], "Toronto")
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TestDeadlines(unittest.TestCase):
+    """Stopping when time is up!"""
+
+    def test_expired_deadline_skips_the_request(self):
+        """Once the run deadline has passed, no more requests are sent."""
+        with WeatherExtractor("test_api_key", deadline=Deadline(0)) as extractor:
+            with patch.object(extractor.session, 'get') as mock_get:
+                self.assertIsNone(extractor.fetch_record("Toronto,CA"))
+        mock_get.assert_not_called()
+
+    def test_expired_deadline_does_not_wait_for_the_rate_limiter(self):
+        """After time is up, cities don't queue for tickets they will never use."""
+        from ETL.RateLimit import TokenBucket
+
+        sleeps = []
+        bucket = TokenBucket(calls_per_minute=1, burst=1, sleep=sleeps.append)
+        with WeatherExtractor("test_api_key", deadline=Deadline(0), rate_limiter=bucket) as extractor:
+            with patch.object(extractor.session, 'get') as mock_get:
+                for _ in range(5):
+                    self.assertIsNone(extractor.fetch_record("Toronto,CA"))
+        mock_get.assert_not_called()
+        self.assertEqual(sleeps, [])
+        self.assertTrue(bucket.try_acquire())  # The ticket is still there for the final pass
+
+    def test_no_waiting_for_a_token_past_the_deadline(self):
+        """If the next ticket comes after the deadline, we stop instead of waiting for it."""
+        from ETL.RateLimit import TokenBucket
+
+        sleeps = []
+        bucket = TokenBucket(calls_per_minute=1, burst=1, sleep=sleeps.append)
+        bucket.acquire()  # The next ticket is a minute away
+        with WeatherExtractor("test_api_key", deadline=Deadline(5), rate_limiter=bucket) as extractor:
+            with patch.object(extractor.session, 'get') as mock_get:
+                self.assertIsNone(extractor.fetch_record("Toronto,CA"))
+        mock_get.assert_not_called()
+        self.assertEqual(sleeps, [])
+
+    def test_timeout_shrinks_to_the_deadline(self):
+        """A request never waits longer than the time left."""
+        with WeatherExtractor("test_api_key", timeout=10, deadline=Deadline(2)) as extractor:
+            with patch.object(extractor.session, 'get', return_value=weather_response()) as mock_get:
+                extractor.fetch_record("Toronto,CA")
+        self.assertLessEqual(mock_get.call_args.kwargs["timeout"], 2)
+
+    def test_no_retries_after_the_call_deadline(self):
+        """Retries stop once a city has used up its own time budget."""
+        import requests
+
+        def slow_timeout(url, **kwargs):
+            time.sleep(0.06)
+            raise requests.Timeout("too slow")
+
+        with WeatherExtractor("test_api_key", max_retries=5, call_deadline=0.05) as extractor:
+            # No need to skip the backoff: it never sleeps past the deadline
+            with patch.object(extractor.session, 'get', side_effect=slow_timeout) as mock_get:
+                self.assertIsNone(extractor.fetch_record("Toronto,CA"))
+        self.assertEqual(mock_get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+These are our load tests!
+Loading is like putting toys back on the shelf: we carry a few at a time,
+and if one doesn't fit we figure out which one without dropping the rest.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import threading
+import tempfile
+import json
+from unittest.mock import MagicMock
+import pandas as pd
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Load import SupabaseLoader, MissingConflictConstraint, serialize_records, _prepare_records_rowwise, encode_records
+import numpy as np
+from test_helpers import make_snapshot_frame, make_observations
+
+
+class RowRejected(Exception):
+    """Like postgrest's APIError for a row that breaks a CHECK constraint."""
+    code = "23514"
+
+
+class FakeClient:
+    """
+    A pretend Supabase client that remembers every insert and upsert.
+    Rows whose city is in `bad_cities` make the whole request fail, like a real
+    database would when one row breaks a constraint. `down` makes every
+    request fail, like a database that cannot be reached.
+    """
+
+    def __init__(self, bad_cities=(), down=None):
+        self.bad_cities = set(bad_cities)
+        self.down = down
+        self.requests = []
+        self.rows = []
+        self.stored = {}  # conflict key -> row, for upserts
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        client = self
+
+        class Query:
+            def insert(self, payload):
+                rows = payload if isinstance(payload, list) else [payload]
+
+                def execute():
+                    with client._lock:
+                        client.requests.append(len(rows))
+                        if client.down is not None:
+                            raise client.down
+                        if any(r["city_name"] in client.bad_cities for r in rows):
+                            raise RowRejected("bad row")
+                        client.rows.extend(rows)
+                    return MagicMock()
+
+                return MagicMock(execute=execute)
+
+            def upsert(self, payload, on_conflict="", ignore_duplicates=False):
+                rows = payload if isinstance(payload, list) else [payload]
+                key_columns = on_conflict.split(",")
+
+                def execute():
+                    with client._lock:
+                        client.requests.append(len(rows))
+                        if client.down is not None:
+                            raise client.down
+                        keys = [tuple(r[c] for c in key_columns) for r in rows]
+                        if len(set(keys)) < len(keys):
+                            raise ValueError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+                        for key, row in zip(keys, rows):
+                            if not (ignore_duplicates and key in client.stored):
+                                client.stored[key] = row
+                    return MagicMock()
+
+                return MagicMock(execute=execute)
+
+        return Query()
+
+
+class TestSupabaseLoader(unittest.TestCase):
+    """Our shelf-stacking playground!"""
+
+    def test_records_are_sent_in_chunks(self):
+        """1,050 rows with 500 per trip means 3 trips, and every row arrives."""
+        client = FakeClient()
+        loader = SupabaseLoader("url", "key", "Weather_data", chunk_size=500, max_workers=3, client=client)
+
+        result = loader.load(make_snapshot_frame(1050))
+
+        self.assertEqual(sorted(client.requests), [50, 500, 500])
+        self.assertEqual(len(client.rows), 1050)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["loaded"], 1050)
+        self.assertEqual([b["rows"] for b in result["batches"]], [500, 500, 50])
+        self.assertTrue(all("seconds" in b for b in result["batches"]))
+
+    def test_records_are_json_friendly(self):
+        """Rows get an ISO timestamp and plain Python numbers."""
+        client = FakeClient()
+        loader = SupabaseLoader("url", "key", "Weather_data", client=client)
+        loader.load(make_snapshot_frame(1))
+
+        row = client.rows[0]
+        self.assertIsInstance(row["temperature"], float)
+        self.assertIsInstance(row["extraction_timestamp"], str)
+
+    def test_one_client_for_many_loads(self):
+        """The same loader keeps using the same client."""
+        client = FakeClient()
+        loader = SupabaseLoader("url", "key", "Weather_data", client=client)
+        loader.load(make_snapshot_frame(3))
+        loader.load(make_snapshot_frame(4))
+        self.assertEqual(len(client.rows), 7)
+
+    def test_bad_row_is_reported(self):
+        """A row the database refuses is counted as failed; the rest still load."""
+        client = FakeClient(bad_cities={"City7"})
+        loader = SupabaseLoader("url", "key", "Weather_data", chunk_size=5, client=client)
+
+        result = loader.load(make_snapshot_frame(10))
+
+        self.assertEqual(result["status"], "partial")
+        self.assertEqual(result["loaded"], 9)
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(result["failed_records"][0]["record"]["city_name"], "City7")
+        self.assertIn("bad row", result["failed_records"][0]["error"])
+
+    def test_bisection_needs_few_requests(self):
+        """
+        With one bad row in 1,024, splitting in halves finds it in about
+        2 * log2(1024) = 20 requests, not 1,024 single inserts!
+        """
+        client = FakeClient(bad_cities={"City300"})
+        loader = SupabaseLoader("url", "key", "Weather_data", chunk_size=1024, client=client)
+
+        result = loader.load(make_snapshot_frame(1024))
+
+        self.assertEqual(result["loaded"], 1023)
+        self.assertEqual(result["failed"], 1)
+        self.assertLessEqual(len(client.requests), 1 + 2 * 10)
+        self.assertEqual(len(client.rows), 1023)
+
+    def test_dead_letters_are_written_to_file(self):
+        """Rejected rows land in the dead-letter file with their error messages."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "dead_letter.jsonl")
+            client = FakeClient(bad_cities={"City1", "City6"})
+            loader = SupabaseLoader("url", "key", "Weather_data", client=client, dead_letter_path=path)
+            loader.load(make_snapshot_frame(8))
+
+            with open(path, encoding="utf-8") as f:
+                letters = [json.loads(line) for line in f]
+
+        self.assertEqual(sorted(l["record"]["city_name"] for l in letters), ["City1", "City6"])
+        self.assertTrue(all(l["error"] == "bad row" for l in letters))
+        self.assertEqual(letters[0]["table"], "Weather_data")
+
+    def test_database_down_fails_the_chunk(self):
+        """If the shelf room is locked, we try each box once and keep every toy, no splitting."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "dead_letter.jsonl")
+            client = FakeClient(down=ConnectionError("connection refused"))
+            loader = SupabaseLoader("url", "key", "Weather_data", chunk_size=50, max_workers=1,
+                                    client=client, dead_letter_path=path)
+
+            result = loader.load(make_snapshot_frame(100))
+
+            self.assertFalse(os.path.exists(path))  # Good rows are never dead-lettered
+        self.assertEqual(client.requests, [50, 50])
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["loaded"], 0)
+        self.assertEqual(result["failed"], 100)
+        self.assertFalse(any(r.get("dead_lettered") for r in result["failed_records"]))
+
+    def test_server_errors_are_not_split(self):
+        """A 5xx answer is the server's fault, not a row's, so it isn't split either."""
+        error = Exception("Bad gateway")
+        error.code = 502
+        client = FakeClient(down=error)
+        loader = SupabaseLoader("url", "key", "Weather_data", chunk_size=100, client=client)
+
+        result = loader.load(make_snapshot_frame(100))
+
+        self.assertEqual(client.requests, [100])
+        self.assertEqual(result["status"], "failed")
+
+
+class TestUpsertLoads(unittest.TestCase):
+    """Putting a toy back where it already is shouldn't give us two of them!"""
+
+    def test_rerun_updates_instead_of_duplicating(self):
+        """Loading the same observations twice keeps one row each, with the newest values."""
+        client = FakeClient()
+        loader = SupabaseLoader("url", "key", "Weather_data", client=client, mode="upsert")
+
+        loader.load(make_observations([1, 2, 3]))
+        result = loader.load(make_observations([1, 2, 3], temperature=5.0))
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(len(client.stored), 3)
+        self.assertTrue(all(row["temperature"] == 5.0 for row in client.stored.values()))
+
+    def test_insert_sends_only_the_original_columns(self):
+        """A plain insert fits a table made from the README schema; upserts also send the keys."""
+        baseline = {"city_name", "country_code", "temperature", "feels_like", "humidity_label",
+                    "precip_type", "precip_chance", "wind_label", "snapshot", "extraction_timestamp"}
+        client = FakeClient()
+        SupabaseLoader("url", "key", "Weather_data", client=client).load(make_observations([1, 2]))
+        self.assertEqual([set(row) for row in client.rows], [baseline, baseline])
+
+        SupabaseLoader("url", "key", "Weather_data", client=client,
+                       mode="upsert").load(make_observations([1, 2]))
+        self.assertEqual([set(row) for row in client.stored.values()],
+                         [baseline | {"city_id", "data_timestamp"}] * 2)
+
+    def test_skip_mode_keeps_stored_rows(self):
+        """In skip mode, the row already on the shelf stays as it was."""
+        client = FakeClient()
+        loader = SupabaseLoader("url", "key", "Weather_data", client=client, mode="skip")
+
+        loader.load(make_observations([1]))
+        loader.load(make_observations([1], temperature=5.0))
+
+        self.assertEqual(list(client.stored.values())[0]["temperature"], 1.0)
+
+    def test_missing_constraint_stops_the_load(self):
+        """Without the 'one of each' rule on the shelf, upserting stops right away with a clear message."""
+        error = Exception("there is no unique or exclusion constraint matching the ON CONFLICT specification")
+        error.code = "42P10"
+        client = FakeClient(down=error)
+        loader = SupabaseLoader("url", "key", "Weather_data", client=client, mode="upsert")
+
+        with self.assertRaisesRegex(MissingConflictConstraint, "LOAD_MODE=insert"):
+            loader.load(make_observations([1, 2, 3]))
+        self.assertEqual(client.requests, [3])  # No splitting, no retries
+
+    def test_repeats_in_one_batch_are_dropped(self):
+        """The same observation twice in one batch is sent once (the last copy wins)."""
+        client = FakeClient()
+        loader = SupabaseLoader("url", "key", "Weather_data", client=client, mode="upsert")
+        df = make_observations([1, 2, 1])
+        df["temperature"] = [1.0, 2.0, 3.0]
+
+        result = loader.load(df)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["duplicates"], 1)
+        self.assertEqual(client.requests, [2])
+        self.assertEqual(client.stored[(1, "2023-10-09T16:00:00.000000+00:00")]["temperature"], 3.0)
+
+    def test_upsert_needs_key_columns(self):
+        """Without the key columns there is nothing to match on, so we say so."""
+        loader = SupabaseLoader("url", "key", "Weather_data", client=FakeClient(), mode="upsert")
+        with self.assertRaises(ValueError):
+            loader.load(make_snapshot_frame(2))
+
+    def test_unknown_mode(self):
+        """A made-up mode is refused straight away."""
+        with self.assertRaises(ValueError):
+            SupabaseLoader("url", "key", "Weather_data", client=FakeClient(), mode="merge")
+
+
+class TestSerializeRecords(unittest.TestCase):
+    """Checking that the fast, column-at-a-time packing matches the old one."""
+
+    def make_mixed_frame(self):
+        """Text, numbers, nulls of every kind and timestamps, all in one table."""
+        df = make_snapshot_frame(6)
+        df["city_id"] = np.arange(6, dtype="int64")
+        df["feels_like"] = [1.5, np.nan, 2.0, None, 3.25, 4.0]
+        df["wind_label"] = ["Calm", None, "Windy", "Calm", None, "Strong"]
+        df["data_timestamp"] = pd.to_datetime([1696867200, None, 1696867260, 1696867320, 1696867380, 1696867440],
+                                              unit="s", utc=True)
+        df["is_daytime"] = [True, False, True, True, False, True]
+        return df
+
+    @staticmethod
+    def normalized(records):
+        """Same values, with timestamps compared as instants instead of text."""
+        out = []
+        for record in records:
+            record = dict(record)
+            record.pop("extraction_timestamp")
+            if record["data_timestamp"] is not None:
+                record["data_timestamp"] = pd.Timestamp(record["data_timestamp"])
+            out.append(record)
+        return out
+
+    def test_matches_rowwise(self):
+        """Both ways of packing give the same values, with the same Python types."""
+        df = self.make_mixed_frame()
+        fast = serialize_records(df)
+        slow = _prepare_records_rowwise(df)
+
+        self.assertEqual(self.normalized(fast), self.normalized(slow))
+        for fast_row, slow_row in zip(fast, slow):
+            for key in fast_row:
+                self.assertIs(type(fast_row[key]), type(slow_row[key]), key)
+
+    def test_nulls_become_none(self):
+        """NaN, None and NaT all turn into a plain None."""
+        records = serialize_records(self.make_mixed_frame())
+        self.assertIsNone(records[1]["feels_like"])
+        self.assertIsNone(records[3]["feels_like"])
+        self.assertIsNone(records[1]["wind_label"])
+        self.assertIsNone(records[1]["data_timestamp"])
+        self.assertIsInstance(records[0]["city_id"], int)
+
+    def test_encode_records(self):
+        """Packed records turn into JSON bytes that read back the same."""
+        records = serialize_records(self.make_mixed_frame())
+        self.assertEqual(json.loads(encode_records(records)), records)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+These are our metrics tests!
+Metrics are like a report card for every run: how long each step took,
+how many rows went in and out, and how fast the weather website answered.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import json
+import tempfile
+import urllib.request
+from unittest.mock import patch, MagicMock
+
+import pandas as pd
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Metrics import Metrics, MetricsServer, stage_timer
+from ETL.Pipeline import run_streaming, load_chunk
+from ETL.Extract import WeatherExtractor
+from test_helpers import weather_response
+
+
+class TestMetrics(unittest.TestCase):
+    """Our report card playground!"""
+
+    def test_counters_and_stages(self):
+        """Counting things and timing stages ends up in the run report."""
+        metrics = Metrics()
+        metrics.inc("responses", status=200)
+        metrics.inc("responses", status=200)
+        metrics.inc("bytes_fetched", 512)
+        with metrics.stage("extract"):
+            pass
+        metrics.rows("extract", 3, 2, failed=1)
+        metrics.finish({"status": "success"})
+
+        report = metrics.report()
+        self.assertEqual(report["status"], "success")
+        self.assertEqual(report["stages"]["extract"]["calls"], 1)
+        self.assertEqual(report["stages"]["extract"]["rows_in"], 3)
+        self.assertEqual(report["stages"]["extract"]["rows_failed"], 1)
+        self.assertEqual(report["counters"]["responses"], {"status=200": 2})
+        self.assertEqual(report["counters"]["bytes_fetched"], 512)
+        json.dumps(report)  # Everything in it can be saved as JSON
+
+    def test_percentiles(self):
+        """The report shows the middle and the slow end of request times."""
+        metrics = Metrics()
+        for ms in range(1, 101):
+            metrics.observe("request_seconds", ms / 1000, endpoint="weather")
+
+        latency = metrics.report()["latency"]["request_seconds{endpoint=weather}"]
+        self.assertEqual(latency["count"], 100)
+        self.assertAlmostEqual(latency["p50"], 0.050)
+        self.assertAlmostEqual(latency["p95"], 0.095)
+        self.assertAlmostEqual(latency["max"], 0.100)
+
+    def test_prometheus_text(self):
+        """Prometheus gets counters, buckets that add up, and safely quoted labels."""
+        metrics = Metrics(buckets=(0.1, 1.0))
+        metrics.inc("retries", reason='say "hi"')
+        metrics.observe("request_seconds", 0.05)
+        metrics.observe("request_seconds", 0.5)
+        metrics.observe("request_seconds", 5.0)
+
+        text = metrics.to_prometheus()
+        self.assertIn('etl_retries_total{reason="say \\"hi\\""} 1', text)
+        self.assertIn("# TYPE etl_retries_total counter", text)
+        self.assertIn("# HELP etl_retries_total ", text)
+        self.assertIn("# TYPE etl_request_seconds histogram", text)
+        self.assertIn('etl_request_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('etl_request_seconds_bucket{le="1"} 2', text)
+        self.assertIn('etl_request_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("etl_request_seconds_count 3", text)
+
+    def test_report_files(self):
+        """Each run adds one line to the report file; the Prometheus file is replaced."""
+        with tempfile.TemporaryDirectory() as folder:
+            report_path = os.path.join(folder, "metrics", "runs.jsonl")
+            prom_path = os.path.join(folder, "etl.prom")
+            for _ in range(2):
+                metrics = Metrics()
+                metrics.finish({"status": "success"})
+                metrics.append_report(report_path)
+                metrics.write_prometheus(prom_path)
+
+            with open(report_path) as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(json.loads(lines[0])["status"], "success")
+            with open(prom_path) as f:
+                self.assertIn("etl_run_success 1", f.read())
+
+    def test_no_metrics_is_fine(self):
+        """Without a report card, timing a stage does nothing at all."""
+        with stage_timer(None, "extract"):
+            pass
+        result = load_chunk(lambda df: {"status": "success", "loaded": len(df), "failed": 0},
+                            pd.DataFrame({"a": [1]}))
+        self.assertEqual(result["loaded"], 1)
+
+    def test_server(self):
+        """The metrics page can be read over HTTP while a daemon runs."""
+        metrics = Metrics()
+        metrics.inc("cache_hits", 4)
+        server = MetricsServer(0)
+        try:
+            server.publish(metrics)
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as r:
+                body = r.read().decode()
+            self.assertIn("etl_cache_hits_total 4", body)
+        finally:
+            server.close()
+
+
+class TestShardedMetrics(unittest.TestCase):
+    """Every slice of a sharded run keeps its own report card!"""
+
+    def test_each_shard_writes_its_own_prometheus_file(self):
+        """Shards do not overwrite each other's file, and each series says which shard it is."""
+        import ETL.runETL as runETL
+
+        def fake_run_etl(replay_only, stage_only, reprocess, since, until, catalog, shard,
+                         context, metrics, profiler):
+            metrics.inc("cache_hits", 10 + shard[0])
+            return {"status": "success", "loaded": 1, "failed": 0, "duplicates": 0, "chunks": 1}
+
+        with tempfile.TemporaryDirectory() as folder:
+            prom_path = os.path.join(folder, "etl.prom")
+            with patch.dict(os.environ, {"METRICS_PROM_PATH": prom_path}), \
+                    patch.object(runETL, "_run_etl", side_effect=fake_run_etl):
+                runETL.run_sharded(2, processes=1)
+
+            self.assertEqual(sorted(os.listdir(folder)), ["etl.shard-0-of-2.prom", "etl.shard-1-of-2.prom"])
+            for index in range(2):
+                with open(os.path.join(folder, f"etl.shard-{index}-of-2.prom")) as f:
+                    self.assertIn(f'etl_cache_hits_total{{shard="{index}/2"}} {10 + index}', f.read())
+
+    def test_unsharded_runs_keep_the_plain_file(self):
+        """A normal run writes the file it was told to, without a shard label."""
+        from ETL.runETL import export_metrics
+
+        metrics = Metrics()
+        metrics.inc("cache_hits", 4)
+        metrics.finish({"status": "success"})
+        with tempfile.TemporaryDirectory() as folder:
+            prom_path = os.path.join(folder, "etl.prom")
+            with patch.dict(os.environ, {"METRICS_PROM_PATH": prom_path}):
+                export_metrics(metrics)
+            with open(prom_path) as f:
+                self.assertIn("etl_cache_hits_total 4", f.read())
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    """Our 'every step fills in its own line' playground!"""
+
+    def test_streaming_records_each_stage(self):
+        """Extract, transform and load each report their rows for every chunk."""
+        def fetch(chunk):
+            # Pretend one city per chunk could not be found
+            return [{"city_name": city, "country": "CA"} for city in chunk[1:]]
+
+        def load(df):
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        metrics = Metrics()
+        with patch('ETL.Pipeline.transform_data', side_effect=lambda df: df):
+            run_streaming(["A", "B", "C", "D"], fetch, load, chunk_size=2, metrics=metrics)
+
+        stages = metrics.report()["stages"]
+        self.assertEqual(stages["extract"]["calls"], 2)
+        self.assertEqual(stages["extract"]["rows_in"], 4)
+        self.assertEqual(stages["extract"]["rows_out"], 2)
+        self.assertEqual(stages["transform"]["calls"], 2)
+        self.assertEqual(stages["load"]["rows_out"], 2)
+
+
+class TestExtractorMetrics(unittest.TestCase):
+    """Our 'how did the weather website do?' playground!"""
+
+    def test_requests_bytes_and_retries(self):
+        """Every answer is timed and counted, and retries say why they happened."""
+        metrics = Metrics()
+        with WeatherExtractor("test_api_key", metrics=metrics, backoff_factor=0) as extractor:
+            with patch.object(extractor.session, 'get',
+                              side_effect=[weather_response(status=503), weather_response()]):
+                record = extractor.fetch_record("Toronto,CA")
+
+        self.assertEqual(record["city_name"], "Toronto")
+        self.assertEqual(metrics.counter("responses", status=503), 1)
+        self.assertEqual(metrics.counter("responses", status=200), 1)
+        self.assertEqual(metrics.counter("retries", reason="http_503"), 1)
+        self.assertEqual(metrics.counter("bytes_fetched"), 2 * len(b'{"id": 1}'))
+        self.assertEqual(metrics.report()["latency"]["request_seconds{endpoint=weather}"]["count"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
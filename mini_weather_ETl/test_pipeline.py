@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+These are our pipeline tests!
+The pipeline is like a conveyor belt: cities go in at one end in small
+boxes (chunks), get fetched, cleaned up and packed away one box at a time.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import threading
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Pipeline import chunked, run_streaming, run_pipelined, merge_load_results, empty_load_result
+
+
+def make_record(city):
+    """Build a pretend extracted weather record for a city."""
+    return {
+        "city_name": city.split(",")[0], "country_code": "CA",
+        "temperature": 10.0, "feels_like": 9.0, "humidity": 50,
+        "weather_description": "clear sky", "rain_1h": None, "rain_3h": None,
+        "snow_1h": None, "snow_3h": None, "wind_speed": 3.0, "wind_direction": 0,
+        "cloudiness": 0, "visibility": 10000, "data_timestamp": 1696867200,
+    }
+
+
+class TestPipeline(unittest.TestCase):
+    """Our conveyor belt playground!"""
+
+    def test_chunked_splits_generators(self):
+        """Items are packed into boxes of the right size, even from a generator."""
+        chunks = list(chunked((i for i in range(7)), 3))
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_streaming_loads_each_chunk(self):
+        """Every box is loaded on its own, in order, and the totals add up."""
+        cities = [f"City{i},CA" for i in range(10)]
+        loaded = []
+
+        def load(df):
+            loaded.append(df["city_name"].tolist())
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        result = run_streaming(iter(cities), lambda chunk: [make_record(c) for c in chunk], load, chunk_size=4)
+
+        self.assertEqual([len(names) for names in loaded], [4, 4, 2])
+        self.assertEqual(loaded[0][0], "City0")
+        self.assertEqual(result["loaded"], 10)
+        self.assertEqual(result["chunks"], 3)
+        self.assertEqual(result["status"], "success")
+
+    def test_earlier_chunks_survive_a_crash(self):
+        """If the belt breaks halfway, the boxes already packed stay packed."""
+        loaded = []
+
+        def fetch(chunk):
+            if "City4,CA" in chunk:
+                raise RuntimeError("API went away")
+            return [make_record(c) for c in chunk]
+
+        def load(df):
+            loaded.extend(df["city_name"].tolist())
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        with self.assertRaises(RuntimeError):
+            run_streaming([f"City{i},CA" for i in range(6)], fetch, load, chunk_size=2)
+        self.assertEqual(loaded, ["City0", "City1", "City2", "City3"])
+
+    def test_raw_frames_can_be_kept(self):
+        """We can peek at each box before it's cleaned up, e.g. to keep a copy."""
+        raw_sizes = []
+        run_streaming([f"City{i},CA" for i in range(5)], lambda chunk: [make_record(c) for c in chunk],
+                      lambda df: {"status": "success", "loaded": len(df), "failed": 0},
+                      chunk_size=2, raw_fn=lambda df: raw_sizes.append(len(df)))
+        self.assertEqual(raw_sizes, [2, 2, 1])
+
+    def test_merge_load_results_status(self):
+        """Some good and some bad chunks make a partial run."""
+        total = empty_load_result()
+        merge_load_results(total, {"status": "success", "loaded": 5, "failed": 0})
+        self.assertEqual(total["status"], "success")
+        merge_load_results(total, {"status": "partial", "loaded": 1, "failed": 2,
+                                   "failed_records": [{}, {}]})
+        self.assertEqual(total["status"], "partial")
+        self.assertEqual(total["loaded"], 6)
+        self.assertEqual(len(total["failed_records"]), 2)
+
+    def test_pipelined_overlaps_extract_and_load(self):
+        """
+        While one box is being packed away, the next one is already being filled.
+        So the whole job takes about as long as the slower step, not both added up!
+        """
+        cities = [f"City{i},CA" for i in range(8)]
+        loaded = []
+        next_chunk_fetched = threading.Event()
+        overlapped = []
+
+        def fetch(chunk):
+            if chunk[0] == "City2,CA":
+                next_chunk_fetched.set()
+            return [make_record(c) for c in chunk]
+
+        def load(df):
+            if not loaded:
+                # The first load only finishes once the second chunk has been fetched,
+                # which can only happen if fetching carries on in the meantime
+                overlapped.append(next_chunk_fetched.wait(timeout=5))
+            loaded.extend(df["city_name"].tolist())
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        result = run_pipelined(cities, fetch, load, chunk_size=2, queue_depth=1)
+
+        self.assertEqual(overlapped, [True])
+        self.assertEqual(loaded, [c.split(",")[0] for c in cities])  # Same order as asked
+        self.assertEqual(result["loaded"], 8)
+        self.assertEqual(result["chunks"], 4)
+
+    def test_pipelined_loads_queued_chunks_before_raising(self):
+        """If fetching breaks, boxes already on the belt are still packed away."""
+        loaded = []
+
+        def fetch(chunk):
+            if "City4,CA" in chunk:
+                raise RuntimeError("API went away")
+            return [make_record(c) for c in chunk]
+
+        def load(df):
+            loaded.extend(df["city_name"].tolist())
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        with self.assertRaises(RuntimeError):
+            run_pipelined([f"City{i},CA" for i in range(6)], fetch, load, chunk_size=2)
+        self.assertEqual(loaded, ["City0", "City1", "City2", "City3"])
+
+    def test_pipelined_stops_when_loading_fails(self):
+        """If the packing machine breaks, we stop filling boxes and say why."""
+        fetched = []
+
+        def fetch(chunk):
+            fetched.append(chunk)
+            return [make_record(c) for c in chunk]
+
+        def load(df):
+            raise ConnectionError("database is down")
+
+        with self.assertRaises(ConnectionError):
+            run_pipelined([f"City{i},CA" for i in range(40)], fetch, load, chunk_size=2, queue_depth=1)
+        self.assertLess(len(fetched), 20)  # We didn't keep fetching everything
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+These are our profiling tests!
+A profiler is like a coach with a stopwatch and a notebook: it writes down
+which steps of the run took the longest and which ones used the most memory.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import glob
+import pstats
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Profiling import (StageProfiler, parse_stages, profile_stage, PROFILE_STAGES,
+                           DEFAULT_PROFILE_DIR)
+from ETL.Pipeline import run_streaming
+
+
+def busy_work(n=20000):
+    """Something slow enough for the stopwatch to notice."""
+    return sum(i * i for i in range(n))
+
+
+def hungry_work():
+    """Something that keeps a good chunk of memory."""
+    return [bytearray(1024) for _ in range(500)]
+
+
+class TestParseStages(unittest.TestCase):
+    """Our 'which steps should the coach watch?' playground!"""
+
+    def test_choices(self):
+        """'all' means every step, a list keeps pipeline order, empty means none."""
+        self.assertEqual(parse_stages("all"), PROFILE_STAGES)
+        self.assertEqual(parse_stages("load, extract"), ("extract", "load"))
+        self.assertEqual(parse_stages(""), ())
+        self.assertEqual(parse_stages(None), ())
+
+    def test_unknown_stage(self):
+        """A step we do not have is a mistake, not silently ignored."""
+        with self.assertRaises(ValueError):
+            parse_stages("transfrom")
+
+
+class TestStageProfiler(unittest.TestCase):
+    """Our coach playground!"""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def test_only_chosen_stages(self):
+        """The coach only watches the steps we asked about."""
+        with StageProfiler(["transform"], output_dir=self.folder.name, memory=False) as profiler:
+            with profiler.stage("extract"):
+                busy_work()
+            with profiler.stage("transform"):
+                busy_work()
+
+        self.assertIsNone(profiler.stats("extract"))
+        functions = {name for (_, _, name) in profiler.stats("transform").stats}
+        self.assertIn("busy_work", functions)
+
+    def test_worker_threads_count(self):
+        """Helpers started during a step are watched as part of that step."""
+        with StageProfiler(["extract"], output_dir=self.folder.name, memory=False) as profiler:
+            with profiler.stage("extract"):
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    list(executor.map(lambda n: busy_work(n), [1000, 2000]))
+
+        functions = {name for (_, _, name) in profiler.stats("extract").stats}
+        self.assertIn("busy_work", functions)
+        self.assertIsNone(threading.getprofile())  # The hook is gone afterwards
+
+    @unittest.skipIf(sys.version_info < (3, 12), "cProfile uses sys.monitoring from Python 3.12")
+    def test_worker_threads_do_not_hang(self):
+        """On newer Pythons the helpers still finish, and each step keeps one notebook."""
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown, wait=False, cancel_futures=True)
+        with StageProfiler(["load"], output_dir=self.folder.name, memory=False) as profiler:
+            for _ in range(2):
+                with profiler.stage("load"):
+                    # A timeout, so a helper that died shows up as a failure, not a hang
+                    results = list(executor.map(busy_work, [1000, 2000], timeout=30))
+
+        self.assertEqual(results, [busy_work(1000), busy_work(2000)])
+        self.assertEqual(len(profiler._profiles["load"]), 1)
+        self.assertEqual(profiler._calls["load"], 2)
+        functions = {name for (_, _, name) in profiler.stats("load").stats}
+        self.assertIn("busy_work", functions)
+        self.assertIsNone(threading.getprofile())
+
+    def test_memory(self):
+        """The notebook shows the peak and the line that kept the memory."""
+        with StageProfiler(["transform"], output_dir=self.folder.name) as profiler:
+            with profiler.stage("transform"):
+                kept = hungry_work()
+        self.assertFalse(tracemalloc.is_tracing())  # Tracing stops with the profiler
+
+        self.assertGreater(profiler._peaks["transform"], 500 * 1024)
+        site, size, count = profiler.top_allocations("transform")[0]
+        self.assertIn("test_profiling.py", site)
+        self.assertGreaterEqual(size, 500 * 1024)
+        self.assertEqual(len(kept), 500)
+
+    def test_files_named_per_run(self):
+        """Every run gets its own .prof and .txt files, so runs never overwrite each other."""
+        for run_id in ("first", "second"):
+            with StageProfiler(["load"], output_dir=self.folder.name, run_id=run_id) as profiler:
+                with profiler.stage("load"):
+                    busy_work()
+            profiler.write()
+
+        self.assertEqual(len(glob.glob(os.path.join(self.folder.name, "*-load.prof"))), 2)
+        report = glob.glob(os.path.join(self.folder.name, "*-second-load.txt"))[0]
+        with open(report) as f:
+            text = f.read()
+        self.assertIn("busy_work", text)
+        self.assertIn("== Memory: peak", text)
+        pstats.Stats(report.replace(".txt", ".prof"))  # Readable by the standard tools
+
+    def test_default_folder_is_in_the_project(self):
+        """Profiles land in the project folder, wherever we start the run from."""
+        project = os.path.dirname(os.path.abspath(__file__))
+        self.assertEqual(DEFAULT_PROFILE_DIR, os.path.join(project, "profiles"))
+
+    def test_no_profiler_is_fine(self):
+        """Without a coach, steps just run."""
+        with profile_stage(None, "extract"):
+            self.assertEqual(busy_work(3), 5)
+
+
+class TestPipelineProfiling(unittest.TestCase):
+    """Our 'coach at every step of the pipeline' playground!"""
+
+    def test_streaming_profiles_each_stage(self):
+        """Extract, transform and load each end up in their own profile."""
+        def fetch(chunk):
+            busy_work()
+            return [{"city_name": city} for city in chunk]
+
+        def load(df):
+            busy_work()
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        with tempfile.TemporaryDirectory() as folder:
+            with StageProfiler(PROFILE_STAGES, output_dir=folder, memory=False) as profiler:
+                with patch('ETL.Pipeline.transform_data', side_effect=lambda df: df):
+                    run_streaming(["A", "B", "C"], fetch, load, chunk_size=2, profiler=profiler)
+            reports = profiler.write()
+
+        self.assertEqual(len(reports), 3)
+        self.assertEqual(profiler._calls, {"extract": 2, "transform": 4, "load": 2})
+        self.assertIn("fetch", {name for (_, _, name) in profiler.stats("extract").stats})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
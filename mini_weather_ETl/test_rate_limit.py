@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+These are our rate limit tests!
+The token bucket is like a jar of tickets that refills slowly: every call
+to the weather website costs one ticket, and when the jar is empty we wait.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.RateLimit import TokenBucket, AdaptiveConcurrency
+from test_helpers import FakeClock
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Our ticket jar playground!"""
+
+    def test_burst_then_steady_rate(self):
+        """A full jar lets a few calls straight through, then one per refill."""
+        clock = FakeClock()
+        bucket = TokenBucket(calls_per_minute=60, burst=3, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(6)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(clock.now, 3.0)  # 3 more tickets at 1 per second
+        self.assertFalse(bucket.try_acquire())
+
+    def test_never_over_quota_in_a_minute(self):
+        """However hard we ask, a minute never holds more than rate + burst calls."""
+        clock = FakeClock()
+        bucket = TokenBucket(calls_per_minute=55, burst=5, clock=clock, sleep=clock.sleep)
+        calls = 0
+        while clock.now < 60:
+            bucket.acquire()
+            if clock.now < 60:
+                calls += 1
+        self.assertLessEqual(calls, 60)
+
+    def test_shared_between_threads(self):
+        """Many helpers share one jar, so together they still wait their turn."""
+        bucket = TokenBucket(calls_per_minute=6000, burst=1)  # 100 per second
+        start = time.monotonic()
+        threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 20 calls with one free ticket need at least 19 refills of 10ms each
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """Our 'how many at once?' playground!"""
+
+    def test_grows_when_healthy(self):
+        """Quick, happy answers let more requests go at once."""
+        limiter = AdaptiveConcurrency(initial=2, max_limit=8)
+        for _ in range(30):
+            limiter.acquire()
+            limiter.release(latency=0.1)
+        self.assertGreater(limiter.stats()["limit"], 2)
+        self.assertLessEqual(limiter.stats()["limit"], 8)
+
+    def test_halves_on_429_once_per_cooldown(self):
+        """A 'slow down!' answer halves the limit, and a pile of them only counts once."""
+        clock = FakeClock()
+        limiter = AdaptiveConcurrency(initial=8, max_limit=8, cooldown=1.0, clock=clock)
+        for _ in range(3):
+            limiter.acquire()
+            limiter.release(latency=0.1, throttled=True)
+        self.assertEqual(limiter.stats()["limit"], 4)
+
+        clock.now += 2
+        limiter.acquire()
+        limiter.release(throttled=True)
+        self.assertEqual(limiter.stats()["limit"], 2)
+
+    def test_backs_off_when_latency_rises(self):
+        """Answers getting much slower means the website is busy, so we ease off."""
+        clock = FakeClock()
+        limiter = AdaptiveConcurrency(initial=10, max_limit=10, clock=clock)
+        limiter.acquire()
+        limiter.release(latency=0.1)  # Sets the baseline
+        limiter.acquire()
+        limiter.release(latency=1.0)  # 10x slower
+        self.assertEqual(limiter.stats()["limit"], 9)
+
+    def test_extractor_reports_429s(self):
+        """The extractor tells the limiter about 'slow down!' answers and waits for tickets."""
+        from ETL.Extract import WeatherExtractor
+
+        throttled = MagicMock(status_code=429, headers={})
+        ok = MagicMock(status_code=200, headers={})
+        ok.json.return_value = {"id": 1, "name": "Toronto", "sys": {"country": "CA"}}
+        bucket = MagicMock()
+        limiter = AdaptiveConcurrency(initial=4, max_limit=4)
+
+        with WeatherExtractor("test_api_key", rate_limiter=bucket, concurrency=limiter) as extractor:
+            with patch.object(extractor.session, 'get', side_effect=[throttled, ok]), \
+                    patch('ETL.Extract.time.sleep'):
+                record = extractor.fetch_record("Toronto,CA")
+
+        self.assertEqual(record["city_name"], "Toronto")
+        self.assertEqual(bucket.acquire.call_count, 2)  # The retry costs a ticket too
+        self.assertEqual(limiter.stats()["limit"], 2)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
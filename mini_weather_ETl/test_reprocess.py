@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+These are our reprocessing tests!
+Reprocessing is like re-reading old diary pages with new glasses: we don't
+ask anyone again, we just look at what we wrote down back then.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import patch
+import pandas as pd
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Archive import RawArchive
+from ETL.Reprocess import reprocess_archive, plan_tasks
+from ETL.Staging import StagingArea
+
+
+def make_payload(city_id, dt, temp=3.5, name=None):
+    """A pretend single-city weather answer."""
+    return {"id": city_id, "dt": dt, "name": name or f"City{city_id}", "sys": {"country": "CA"},
+            "main": {"temp": temp, "feels_like": temp - 1, "humidity": 50},
+            "weather": [{"description": "clear sky"}], "wind": {"speed": 3}}
+
+
+class TestReprocess(unittest.TestCase):
+    """Our diary re-reading playground!"""
+
+    def setUp(self):
+        """Fill a fresh archive with one single answer, one group answer and one re-fetch."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive = RawArchive(self.tmp_dir.name, codec="gzip")
+        self.put(make_payload(1, 1000))
+        self.put({"cnt": 2, "list": [make_payload(2, 1000), make_payload(3, 2000)]})
+        self.put(make_payload(1, 1000, temp=9.0))  # Same observation fetched again: the newest copy wins
+        self.loaded = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def put(self, data):
+        self.archive.put(json.dumps(data).encode(), data)
+
+    def load(self, df):
+        self.loaded.append(df)
+        return {"status": "success", "loaded": len(df), "failed": 0}
+
+    def test_history_is_rebuilt_without_the_api(self):
+        """Every archived observation comes back once, cleaned up like a live run."""
+        result = reprocess_archive(self.archive, self.load, max_workers=1)
+
+        rows = pd.concat(self.loaded, ignore_index=True).sort_values("city_id")
+        self.assertEqual(result["loaded"], 3)
+        self.assertEqual(rows["city_id"].tolist(), [1, 2, 3])
+        self.assertEqual(rows.iloc[0]["temperature"], 9.0)
+        self.assertIn("snapshot", rows.columns)
+
+    def test_rows_keep_when_they_were_fetched(self):
+        """Old pages keep their old dates instead of getting today's."""
+        reprocess_archive(self.archive, self.load, max_workers=1)
+        fetched = {e["fetched_at"] for e in self.archive.entries()}
+        stamps = pd.concat(self.loaded)["extraction_timestamp"]
+        for stamp in stamps:
+            self.assertAlmostEqual(min(abs(stamp.timestamp() - f) for f in fetched), 0, places=3)
+
+    def test_time_window(self):
+        """We can re-read just a few pages."""
+        reprocess_archive(self.archive, self.load, max_workers=1, since=1500)
+        self.assertEqual(pd.concat(self.loaded)["city_id"].tolist(), [3])
+
+    def test_worker_processes_give_the_same_rows(self):
+        """Sharing the pages out between helpers gives the same answer as reading alone."""
+        self.assertEqual(len(plan_tasks(self.archive, task_entries=1)), 3)
+        reprocess_archive(self.archive, self.load, max_workers=2, task_entries=1)
+
+        rows = pd.concat(self.loaded, ignore_index=True).sort_values("city_id")
+        self.assertEqual(rows["city_id"].tolist(), [1, 2, 3])
+        self.assertEqual(rows.iloc[0]["temperature"], 9.0)
+
+    def test_stage_only_puts_history_in_staging(self):
+        """With --stage-only, re-read pages wait in staging instead of needing a database."""
+        import ETL.runETL as runETL
+
+        staging_dir = os.path.join(self.tmp_dir.name, "staging")
+        settings = {"RAW_ARCHIVE_DIR": self.tmp_dir.name, "STAGING_DIR": staging_dir,
+                    "REPROCESS_WORKERS": "1", "LOAD_SINK": "supabase"}
+        with patch.dict(os.environ, settings), patch("dotenv.load_dotenv"):
+            runETL.run_etl(reprocess=True, stage_only=True)
+
+        self.assertEqual(StagingArea(staging_dir).pending_rows(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+These are our response cache tests!
+The cache is like a sticky note on the fridge: if we checked the weather
+a few minutes ago, we just read the note instead of asking again.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import patch, MagicMock
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Cache import ResponseCache
+from test_helpers import FakeClock
+
+
+class TestResponseCache(unittest.TestCase):
+    """Our sticky-note playground!"""
+
+    def setUp(self):
+        self.clock = FakeClock(1_700_000_000)
+
+    def test_fresh_hit_then_expired_miss(self):
+        """A note is good until `ttl` seconds after the observation, then it's thrown away."""
+        cache = ResponseCache(ttl=600, clock=self.clock)
+        cache.put("Toronto,CA", {"dt": self.clock.now, "name": "Toronto"})
+
+        self.clock.now += 599
+        self.assertEqual(cache.get("Toronto,CA")["name"], "Toronto")
+
+        self.clock.now += 2
+        self.assertIsNone(cache.get("Toronto,CA"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_old_observation_is_kept_for_min_ttl(self):
+        """Even an old observation isn't fetched again right away."""
+        cache = ResponseCache(ttl=600, min_ttl=60, clock=self.clock)
+        cache.put("Toronto,CA", {"dt": self.clock.now - 3600})
+
+        self.clock.now += 30
+        self.assertIsNotNone(cache.get("Toronto,CA"))
+        self.clock.now += 31
+        self.assertIsNone(cache.get("Toronto,CA"))
+
+    def test_lru_eviction(self):
+        """When the fridge is full, the note we looked at longest ago comes off first."""
+        cache = ResponseCache(max_entries=2, clock=self.clock)
+        cache.put("a", {"dt": self.clock.now})
+        cache.put("b", {"dt": self.clock.now})
+        cache.get("a")  # "a" is now the most recently used
+        cache.put("c", {"dt": self.clock.now})
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_disk_round_trip(self):
+        """Notes saved to disk are still there for the next run."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache.json")
+            cache = ResponseCache(path=path, clock=self.clock)
+            cache.put("Toronto,CA", {"dt": self.clock.now, "name": "Toronto"})
+            cache.save()
+
+            reloaded = ResponseCache(path=path, clock=self.clock)
+            self.assertEqual(reloaded.get("Toronto,CA")["name"], "Toronto")
+
+    def test_extractor_skips_network_on_fresh_hit(self):
+        """The extractor reads the sticky note instead of asking the website twice."""
+        from ETL.Extract import WeatherExtractor
+
+        payload = {"dt": self.clock.now, "id": 6167865, "name": "Toronto", "sys": {"country": "CA"}}
+        response = MagicMock(status_code=200, headers={})
+        response.json.return_value = payload
+
+        cache = ResponseCache(clock=self.clock)
+        with WeatherExtractor("test_api_key", cache=cache) as extractor:
+            with patch.object(extractor.session, 'get', return_value=response) as mock_get:
+                first = extractor.extract("Toronto,CA")
+                second = extractor.extract("Toronto,CA")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first.iloc[0]['city_name'], second.iloc[0]['city_name'])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_cache_is_saved_when_the_run_fails(self):
+        """Even if the run trips over later, the notes we already wrote stay on the fridge."""
+        import ETL.runETL as runETL
+
+        def fake_get(session, url, params=None, **kwargs):
+            query = params["q"]
+            body = {"id": abs(hash(query)) % 100000, "name": query.split(",")[0], "dt": time.time(),
+                    "sys": {"country": "CA"}, "main": {"temp": 1.0}, "weather": [{"description": "clear"}]}
+            response = MagicMock(status_code=200, headers={}, content=b"{}")
+            response.json.return_value = body
+            return response
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, "cache.json")
+            settings = {
+                "WEATHER_API_KEY": "test_api_key", "LOAD_SINK": "sqlite",
+                "SINK_PATH": os.path.join(tmp_dir, "weather.db"), "RESPONSE_CACHE_PATH": cache_path,
+                "CITY_REGISTRY_PATH": os.path.join(tmp_dir, "registry.json"),
+                "OPENWEATHER_CALLS_PER_MINUTE": "0", "ETL_LOAD_QUEUE_DEPTH": "0",
+            }
+            with patch.dict(os.environ, settings), \
+                    patch("requests.Session.get", fake_get), \
+                    patch("Pipeline.transform_data", side_effect=RuntimeError("transform broke")):
+                with self.assertRaises(RuntimeError):
+                    runETL.run_etl()
+
+            self.assertTrue(os.path.exists(cache_path))
+            self.assertGreater(len(ResponseCache(path=cache_path)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
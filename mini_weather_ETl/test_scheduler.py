@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+These are our scheduler tests!
+The scheduler is like an alarm clock that wakes the ETL up every few
+minutes, makes sure two runs never happen at once, and lets it go to bed
+nicely when we say stop.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Scheduler import parse_interval, RunLock, WarmContext, serve
+
+
+class TestParseInterval(unittest.TestCase):
+    """Reading '10m' the way people write it!"""
+
+    def test_units(self):
+        """Seconds, minutes, hours and mixes all work."""
+        self.assertEqual(parse_interval("90"), 90)
+        self.assertEqual(parse_interval("30s"), 30)
+        self.assertEqual(parse_interval("10m"), 600)
+        self.assertEqual(parse_interval("1h30m"), 5400)
+        self.assertEqual(parse_interval("0.5m"), 30)
+
+    def test_nonsense(self):
+        """Words that aren't durations are refused."""
+        for bad in ("", "soon", "10x", "m"):
+            with self.assertRaises(ValueError):
+                parse_interval(bad)
+
+
+class TestRunLock(unittest.TestCase):
+    """Only one run at a time!"""
+
+    def test_second_holder_is_refused(self):
+        """While one run holds the lock, another can't take it."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "etl.lock")
+            first, second = RunLock(path), RunLock(path)
+            self.assertTrue(first.acquire())
+            self.assertFalse(second.acquire())
+            first.release()
+            self.assertTrue(second.acquire())
+            second.release()
+
+
+class TestWarmContext(unittest.TestCase):
+    """Keeping things warm between runs!"""
+
+    def test_built_once_and_closed_once(self):
+        """The same object comes back every time, and it's closed at the end."""
+        class Thing:
+            closed = 0
+
+            def close(self):
+                self.closed += 1
+
+        context = WarmContext()
+        made = []
+        first = context.get("thing", lambda: made.append(1) or Thing())
+        second = context.get("thing", lambda: made.append(1) or Thing())
+        self.assertIs(first, second)
+        self.assertEqual(len(made), 1)
+        context.close()
+        self.assertEqual(first.closed, 1)
+
+
+class TestServe(unittest.TestCase):
+    """The alarm clock itself!"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lock_path = os.path.join(self.tmp_dir.name, "etl.lock")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_runs_on_schedule_and_survives_failures(self):
+        """It keeps going after a run crashes."""
+        calls = []
+
+        def run():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+
+        runs = serve(run, 0.05, lock_path=self.lock_path, max_runs=3, handle_signals=False)
+        self.assertEqual(runs, 3)
+        self.assertEqual(len(calls), 3)
+        # Starts follow the schedule, roughly one interval apart
+        self.assertGreaterEqual(calls[2] - calls[0], 0.09)
+
+    def test_slow_runs_never_overlap(self):
+        """A run slower than the interval makes the next one wait, not pile up."""
+        active, overlaps = [0], []
+
+        def slow_run():
+            active[0] += 1
+            overlaps.append(active[0] > 1)
+            time.sleep(0.12)
+            active[0] -= 1
+
+        start = time.monotonic()
+        serve(slow_run, 0.05, lock_path=self.lock_path, max_runs=2, handle_signals=False)
+        self.assertFalse(any(overlaps))
+        # The second run starts at the next free tick, not right after the first
+        self.assertGreaterEqual(time.monotonic() - start, 0.27)
+
+    def test_skips_while_another_process_runs(self):
+        """If someone else holds the lock, we skip our turn."""
+        holder = RunLock(self.lock_path)
+        self.assertTrue(holder.acquire())
+        stop = threading.Event()
+        threading.Timer(0.2, stop.set).start()
+        try:
+            runs = serve(lambda: None, 0.05, lock_path=self.lock_path, stop_event=stop,
+                         handle_signals=False)
+        finally:
+            holder.release()
+        self.assertEqual(runs, 0)
+
+    def test_stop_event_wakes_the_sleeper(self):
+        """Asking it to stop doesn't wait for the next alarm."""
+        stop = threading.Event()
+        threading.Timer(0.1, stop.set).start()
+        start = time.monotonic()
+        runs = serve(lambda: None, 60, lock_path=self.lock_path, stop_event=stop, handle_signals=False)
+        self.assertEqual(runs, 1)  # The first run starts straight away
+        self.assertLess(time.monotonic() - start, 5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
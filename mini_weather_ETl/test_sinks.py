@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+These are our sink tests!
+A sink is the shelf the weather ends up on. Whatever shelf we pick
+(Supabase, a local database file, ...), putting toys away works the same way.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import csv
+from unittest.mock import patch, MagicMock
+import pandas as pd
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Sinks import (Sink, SQLiteSink, DuckDBSink, PostgresCopySink, create_sink,
+                       copy_buffer, COPY_NULL)
+from test_helpers import make_observations
+
+try:  # DuckDB is optional; its tests are skipped without it
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+class TestSQLiteSink(unittest.TestCase):
+    """Our local shelf playground!"""
+
+    def rows(self, sink):
+        return sink.connection.execute(
+            'SELECT city_name, temperature, wind_label, extraction_timestamp FROM "Weather_data" ORDER BY city_name'
+        ).fetchall()
+
+    def test_bulk_insert_creates_the_table(self):
+        """The first load builds the table, and every row lands with its nulls and timestamp."""
+        with SQLiteSink(":memory:", "Weather_data") as sink:
+            result = sink.load(make_observations([1, 2, 3]))
+            rows = self.rows(sink)
+            columns = sink.connection.execute('PRAGMA table_info("Weather_data")').fetchall()
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["loaded"], 3)
+        self.assertEqual([r[0] for r in rows], ["City1", "City2", "City3"])
+        # Plain inserts leave out the upsert keys, like a table made from the README schema
+        self.assertNotIn("city_id", {c[1] for c in columns})
+        self.assertIsNone(rows[0][2])
+        self.assertIsNotNone(rows[0][3])
+
+    def test_upsert_and_skip_modes(self):
+        """Upsert swaps in the newest reading; skip keeps the first one."""
+        for mode, expected in (("upsert", 5.0), ("skip", 1.0)):
+            with SQLiteSink(":memory:", "Weather_data", mode=mode) as sink:
+                sink.load(make_observations([1, 2]))
+                result = sink.load(make_observations([1, 2, 1], temperature=5.0))
+                rows = self.rows(sink)
+
+            self.assertEqual(result["duplicates"], 1)
+            self.assertEqual(len(rows), 2)
+            self.assertEqual({r[1] for r in rows}, {expected})
+
+    def test_failed_write_stores_nothing(self):
+        """If the database says no, the whole batch is reported failed and nothing half-lands."""
+        with SQLiteSink(":memory:", "Weather_data") as sink:
+            sink.load(make_observations([1]))
+            result = sink.load(make_observations([2]).assign(surprise_column="?"))
+            rows = self.rows(sink)
+
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(len(rows), 1)
+
+
+@unittest.skipIf(duckdb is None, "duckdb is not installed")
+class TestDuckDBSink(unittest.TestCase):
+    """Our speedy local shelf playground!"""
+
+    def rows(self, sink):
+        # Reading TIMESTAMPTZ values back needs pytz, so just ask whether each one is set
+        return sink.connection.execute(
+            'SELECT city_name, temperature, wind_label, extraction_timestamp IS NOT NULL '
+            'FROM "Weather_data" ORDER BY city_name'
+        ).fetchall()
+
+    def test_round_trip(self):
+        """What we put on the shelf comes back the same, nulls and timestamp included."""
+        with DuckDBSink(":memory:", "Weather_data") as sink:
+            result = sink.load(make_observations([1, 2, 3]))
+            rows = self.rows(sink)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(rows, [(f"City{i}", 1.0, None, True) for i in (1, 2, 3)])
+
+    def test_upsert_and_skip_modes(self):
+        """Upsert swaps in the newest reading; skip keeps the first one."""
+        for mode, expected in (("upsert", 5.0), ("skip", 1.0)):
+            with DuckDBSink(":memory:", "Weather_data", mode=mode) as sink:
+                sink.load(make_observations([1, 2]))
+                result = sink.load(make_observations([1, 2, 1], temperature=5.0))
+                rows = self.rows(sink)
+
+            self.assertEqual(result["duplicates"], 1)
+            self.assertEqual(len(rows), 2)
+            self.assertEqual({r[1] for r in rows}, {expected})
+
+
+def fake_psycopg():
+    """A pretend psycopg that remembers every SQL statement and COPY payload."""
+    statements, payloads = [], []
+    cursor = MagicMock()
+    cursor.execute.side_effect = statements.append
+
+    def copy(sql):
+        statements.append(sql)
+        copier = MagicMock()
+        copier.__enter__.return_value = MagicMock(write=payloads.append)
+        return copier
+
+    cursor.copy.side_effect = copy
+    connection = MagicMock()
+    connection.cursor.return_value.__enter__.return_value = cursor
+    return MagicMock(connect=MagicMock(return_value=connection)), statements, payloads
+
+
+class TestPostgresCopySink(unittest.TestCase):
+    """Our big-database shelf playground, with a pretend database!"""
+
+    def setUp(self):
+        psycopg, self.statements, self.payloads = fake_psycopg()
+        self.connection = psycopg.connect.return_value
+        modules = patch.dict(sys.modules, {"psycopg": psycopg})
+        modules.start()
+        self.addCleanup(modules.stop)
+
+    def test_insert_copies_the_rows(self):
+        """One COPY carries every row as CSV, with missing values marked as NULL."""
+        sink = PostgresCopySink("postgresql://db", "Weather_data")
+        result = sink.load(make_observations([1, 2]))
+
+        columns = ["city_name", "country_code", "temperature", "feels_like", "humidity_label",
+                   "precip_type", "precip_chance", "wind_label", "snapshot", "extraction_timestamp"]
+        self.assertEqual(result["loaded"], 2)
+        self.assertTrue(self.statements[0].startswith('CREATE TABLE IF NOT EXISTS "Weather_data"'))
+        self.assertEqual(self.statements[1],
+                         'COPY "Weather_data" (' + ", ".join(f'"{c}"' for c in columns) + ") "
+                         f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')")
+        rows = [dict(zip(columns, row)) for row in csv.reader(self.payloads[0].splitlines())]
+        self.assertEqual([(r["city_name"], r["temperature"], r["wind_label"]) for r in rows],
+                         [("City1", "1.0", COPY_NULL), ("City2", "1.0", COPY_NULL)])
+        self.connection.commit.assert_called_once()
+
+    def test_upsert_merges_through_a_temporary_table(self):
+        """Upserts copy into a side table first, then merge it on the observation key."""
+        sink = PostgresCopySink("postgresql://db", "Weather_data", mode="upsert")
+        sink.load(make_observations([1, 2]))
+
+        self.assertTrue(self.statements[1].startswith("CREATE TEMP TABLE weather_incoming"))
+        self.assertTrue(self.statements[2].startswith('COPY weather_incoming ("city_id", "data_timestamp"'))
+        self.assertIn('ON CONFLICT ("city_id", "data_timestamp") DO UPDATE SET', self.statements[3])
+        self.assertEqual(len(list(csv.reader(self.payloads[0].splitlines()))), 2)
+
+    def test_failed_copy_rolls_back(self):
+        """If the database says no, nothing is committed and the batch is reported failed."""
+        sink = PostgresCopySink("postgresql://db", "Weather_data")
+        self.connection.cursor.return_value.__enter__.return_value.copy.side_effect = RuntimeError("no")
+        result = sink.load(make_observations([1]))
+
+        self.assertEqual(result["status"], "failed")
+        self.connection.rollback.assert_called_once()
+        self.connection.commit.assert_not_called()
+
+
+class TestSinkHelpers(unittest.TestCase):
+    """The little helpers around the shelves."""
+
+    def test_copy_buffer_keeps_none_and_empty_text_apart(self):
+        """For COPY, a missing value and an empty word must look different."""
+        buffer = copy_buffer([(1, None, ""), (2, "x,y", "z")])
+        rows = list(csv.reader(buffer))
+        self.assertEqual(rows, [["1", COPY_NULL, ""], ["2", "x,y", "z"]])
+
+    def test_sinks_must_know_how_to_write(self):
+        """A shelf without a way to put things on it cannot be built."""
+        with self.assertRaises(TypeError):
+            Sink("Weather_data")
+
+    def test_create_sink(self):
+        """Asking for a shelf by name gives the right one, and made-up names are refused."""
+        with create_sink("sqlite", "Weather_data", path=":memory:") as sink:
+            self.assertIsInstance(sink, SQLiteSink)
+        with self.assertRaises(ValueError):
+            create_sink("carrier-pigeon", "Weather_data")
+        with self.assertRaises(ValueError):
+            create_sink("supabase", "Weather_data")  # No URL or key
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
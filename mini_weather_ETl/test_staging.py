@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+These are our staging tests!
+Staging is like a toy box by the door: everything goes in the box first,
+and we carry it to the shelf whenever the shelf is ready for it.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import tempfile
+from unittest.mock import MagicMock
+import pandas as pd
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+from ETL.Staging import StagingArea
+from test_helpers import make_snapshot_frame
+
+
+class RecordingLoader:
+    """A pretend loader that remembers every batch, and can be told to be 'down'."""
+
+    def __init__(self):
+        self.batches = []
+        self.down = False
+
+    def load(self, df):
+        if self.down:
+            return {"status": "failed", "loaded": 0, "failed": len(df)}
+        self.batches.append(df["city_name"].tolist())
+        return {"status": "success", "loaded": len(df), "failed": 0}
+
+
+class TestStagingArea(unittest.TestCase):
+    """Our toy box playground!"""
+
+    def setUp(self):
+        """Give every test its own empty toy box."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.staging = StagingArea(self.tmp_dir.name)
+        self.loader = RecordingLoader()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_replay_drains_segments_in_bulk(self):
+        """Small boxes from several runs are carried to the shelf together, oldest first."""
+        self.staging.stage(make_snapshot_frame(["A", "B"]))
+        self.staging.stage(make_snapshot_frame(["C"]))
+        self.assertEqual(self.staging.pending_rows(), 3)
+
+        result = self.staging.replay(self.loader.load)
+
+        self.assertEqual(self.loader.batches, [["A", "B", "C"]])
+        self.assertEqual(result["loaded"], 3)
+        self.assertEqual(result["pending"], 0)
+        self.assertEqual(self.staging.pending(), [])
+
+    def test_rows_keep_their_extraction_time(self):
+        """Replayed rows still say when they were really fetched, and nulls stay empty."""
+        seen = []
+        self.staging.stage(make_snapshot_frame(["A"], wind_label=None))
+        staged_at = self.staging._read_segment(self.staging.pending()[0])[0]["extraction_timestamp"]
+
+        def load(df):
+            seen.append(df)
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        self.staging.replay(load)
+        self.assertEqual(seen[0].loc[0, "extraction_timestamp"], staged_at)
+        self.assertIsNone(seen[0].loc[0, "wind_label"])
+
+    def test_rows_wait_while_the_database_is_down(self):
+        """If the shelf isn't ready, nothing is thrown away and the next try picks it up."""
+        self.staging.stage(make_snapshot_frame(["A", "B"]))
+        self.loader.down = True
+
+        result = self.staging.replay(self.loader.load)
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["pending"], 2)
+
+        self.loader.down = False
+        self.staging.replay(self.loader.load)
+        self.assertEqual(self.loader.batches, [["A", "B"]])
+        self.assertEqual(self.staging.pending_rows(), 0)
+
+    def test_checkpoint_resumes_after_a_crash(self):
+        """A crash halfway through only repeats the batch that was in flight."""
+        self.staging.stage(make_snapshot_frame(["A", "B", "C", "D", "E"]))
+        calls = []
+
+        def flaky_load(df):
+            calls.append(df["city_name"].tolist())
+            if len(calls) == 2:
+                raise ConnectionError("database went away")
+            return {"status": "success", "loaded": len(df), "failed": 0}
+
+        with self.assertRaises(ConnectionError):
+            self.staging.replay(flaky_load, batch_rows=2)
+        self.assertEqual(self.staging.pending_rows(), 3)
+
+        # A fresh staging area (like the next run) resumes from the checkpoint
+        StagingArea(self.tmp_dir.name).replay(self.loader.load, batch_rows=2)
+        self.assertEqual(self.loader.batches, [["C", "D"], ["E"]])
+
+
+    def test_real_loader_keeps_rows_when_supabase_is_down(self):
+        """With the real loader and a locked shelf room, all 100 toys stay in the box."""
+        from ETL.Load import SupabaseLoader
+
+        client = MagicMock()
+        client.table.return_value.insert.return_value.execute.side_effect = \
+            ConnectionError("connection refused")
+        loader = SupabaseLoader("url", "key", "Weather_data", chunk_size=50, max_workers=1,
+                                client=client)
+        self.staging.stage(make_snapshot_frame(100))
+
+        result = self.staging.replay(loader.load)
+
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["pending"], 100)
+        self.assertEqual(client.table.return_value.insert.return_value.execute.call_count, 2)
+
+    def test_refused_rows_stay_unless_dead_lettered(self):
+        """Rows the database refused come back next time, unless they went to the dead-letter file."""
+        self.staging.stage(make_snapshot_frame(["A", "B", "C"]))
+
+        def load(df):
+            letters = [{"record": {"city_name": "B"}, "error": "bad row"},
+                       {"record": {"city_name": "C"}, "error": "bad row", "dead_lettered": True}]
+            return {"status": "partial", "loaded": 1, "failed": 2, "failed_records": letters}
+
+        self.staging.replay(load)
+
+        self.assertEqual(self.staging.pending_rows(), 1)
+        self.staging.replay(self.loader.load)
+        self.assertEqual(self.loader.batches, [["B"]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
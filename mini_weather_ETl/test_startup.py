@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+These are our quick-start tests!
+Starting the ETL should be like turning on a flashlight: instant. The big
+helpers (pandas, requests, supabase) only get woken up when a real run needs them.
+"""
+
+import unittest  # Our helpful test runner
+import sys
+import os
+import subprocess
+
+# Make sure Python can find our ETL package (mirrors the extract tests' pattern)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+from bench_startup import ETL_DIR, import_times
+
+# Most runETL may take to import, in microseconds. It takes about 0.04 s;
+# eager imports took about 2 s, so this still catches a heavy import creeping back.
+IMPORT_BUDGET_US = 500_000
+
+# Modules a plain `import runETL` must not load
+HEAVY_MODULES = ("pandas", "numpy", "requests", "supabase", "pyarrow")
+
+
+def fresh_python(statement, env=None):
+    """Runs a statement in a brand-new Python inside ETL/ and returns the result."""
+    return subprocess.run([sys.executable, "-c", statement], cwd=ETL_DIR, capture_output=True,
+                          text=True, env=env, timeout=60)
+
+
+class TestStartup(unittest.TestCase):
+    """Is the flashlight instant?"""
+
+    def test_cli_import_is_light(self):
+        """Importing runETL doesn't wake up any of the big helpers."""
+        result = fresh_python(
+            "import sys, runETL; print(' '.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_import_time_budget(self):
+        """Importing runETL stays within its time budget."""
+        # Best of three, so one slow disk read doesn't fail the test
+        best = min(import_times("import runETL")["runETL"] for _ in range(3))
+        self.assertLess(best, IMPORT_BUDGET_US, f"import runETL took {best / 1e6:.3f}s")
+
+    def test_load_does_not_import_supabase(self):
+        """supabase is only imported when a Supabase client is really made."""
+        result = fresh_python("import sys, Load; print('supabase' in sys.modules)")
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
+
+    def test_extract_has_no_import_side_effects(self):
+        """Importing Extract doesn't change urllib3's warning settings."""
+        result = fresh_python("import warnings, Extract; print(any(f[2].__name__ == "
+                              "'InsecureRequestWarning' for f in warnings.filters))")
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
+
+    def test_check_config(self):
+        """--check-config lists problems quickly and without a run."""
+        env = dict(os.environ, WEATHER_API_KEY="k", LOAD_SINK="sqlite", LOAD_MODE="sometimes",
+                   ETL_CHUNK_SIZE="lots", CITY_SHARD="5/2")
+        result = subprocess.run([sys.executable, "runETL.py", "--check-config"], cwd=ETL_DIR,
+                                capture_output=True, text=True, env=env, timeout=60)
+        self.assertEqual(result.returncode, 1, result.stdout + result.stderr)
+        for name in ("LOAD_MODE", "ETL_CHUNK_SIZE", "CITY_SHARD"):
+            self.assertIn(name, result.stdout)
+        self.assertNotIn("SUPABASE_URL", result.stdout)  # Not needed for the sqlite sink
+
+    def test_check_config_choices_match_the_stages(self):
+        """The quick checker knows the same sinks and load modes as the real code."""
+        import ETL.runETL as runETL
+        from ETL.Sinks import SINK_KINDS
+        from ETL.Load import LOAD_MODES
+        self.assertEqual(set(runETL.SINK_KINDS), set(SINK_KINDS))
+        self.assertEqual(set(runETL.LOAD_MODES), set(LOAD_MODES))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -15,32 +15,8 @@ import pandas as pd
 # Make sure Python can find our ETL package (mirrors the extract tests' pattern)
 sys.path.append(os.path.join(os.path.dirname(__file__), 'ETL'))
 
-from ETL.Transform import transform_data
-
-
-def make_base_row(**overrides):
-    """
-    Build a single weather record with sensible defaults that we can override.
-    Like a base LEGO structure we can tweak with different bricks.
-    """
-    row = {
-        "city_name": "TestCity",
-        "country_code": "TC",
-        "temperature": 12.345,
-        "feels_like": 11.678,
-        "humidity": 50,
-        "weather_description": "clear sky",
-        "rain_1h": 0,
-        "rain_3h": 0,
-        "snow_1h": 0,
-        "snow_3h": 0,
-        "wind_speed": 1.5,
-        "wind_direction": 0,
-        "cloudiness": 0,
-        "visibility": 10000,
-    }
-    row.update(overrides)
-    return row
+from ETL.Transform import transform_data, transform_data_rowwise
+from test_helpers import make_base_row
 
 
 class TestTransformFunction(unittest.TestCase):
@@ -141,6 +117,57 @@ class TestTransformFunction(unittest.TestCase):
         self.assertIn(out.loc[0, "wind_label"].lower(), snapshot)  # wind label lowercased in text
 
 
+    def test_vectorized_matches_rowwise(self):
+        """
+        The fast, whole-column transform must give exactly the same table as
+        the original row-by-row one, for every mix of rain, snow, humidity and wind.
+        Like two different recipes that have to bake the very same cake!
+        """
+        rows = []
+        for i in range(120):
+            rows.append(make_base_row(
+                city_name=f"City{i}",
+                temperature=-20 + i * 0.37,
+                feels_like=-25 + i * 0.41,
+                humidity=(i * 7) % 101,
+                weather_description=["clear sky", "light rain", "heavy snow"][i % 3],
+                rain_1h=[None, 0, 0.3, 2.5][i % 4],
+                rain_3h=[0, None, 0.6][i % 3],
+                snow_1h=[None, 0.2, 0, 1.5, None][i % 5],
+                snow_3h=None,
+                wind_speed=(i * 0.13) % 14,
+            ))
+        # One big table, so missing amounts show up as NaN instead of None
+        df = pd.DataFrame(rows)
+
+        fast = transform_data(df.copy())
+        slow = transform_data_rowwise(df.copy())
+        pd.testing.assert_frame_equal(fast, slow)
+
+    def test_vectorized_handles_missing_wind(self):
+        """A missing wind speed gives no wind label instead of breaking the snapshot."""
+        df = pd.DataFrame([make_base_row(), make_base_row(wind_speed=None)])
+        out = transform_data(df)
+        self.assertTrue(pd.isna(out.loc[1, "wind_label"]))
+        self.assertIn("unknown winds", out.loc[1, "snapshot"])
+
+    def test_vectorized_does_not_change_input(self):
+        """Transforming shouldn't scribble on the table we handed in."""
+        df = pd.DataFrame([make_base_row()]).rename(columns={"city_name": "City_Name"})
+        transform_data(df)
+        self.assertIn("City_Name", df.columns)
+
+    def test_key_columns_are_carried_through(self):
+        """City ID and observation time come out the other side, so loads can match rows."""
+        stamp = pd.Timestamp("2023-10-09 16:00", tz="UTC")
+        df = pd.DataFrame([make_base_row(city_id=6167865, data_timestamp=stamp)])
+
+        for transform in (transform_data, transform_data_rowwise):
+            out = transform(df.copy())
+            self.assertEqual(list(out.columns[:2]), ["city_id", "data_timestamp"])
+            self.assertEqual(out.loc[0, "city_id"], 6167865)
+            self.assertEqual(out.loc[0, "data_timestamp"], stamp)
+
 if __name__ == '__main__':
     # Run our transform tests with a chatty output, just like in the extract unittest file
     unittest.main(verbosity=2)